@@ -0,0 +1,122 @@
+"""
+Benchmark: cost of polling a table for changes.
+
+Polls TICKETS once per interval while a writer updates a few records
+between polls and re-saves some of the previous round's records with the
+values they already have (no-op writes that still bump Airtable's
+last-modified time). Compares re-listing the whole table on every poll
+with ``changes_since``, reporting upstream requests, records transferred
+and records handed to the caller per poll.
+
+Usage:
+    python benchmarks/bench_change_feed.py --records 5000 --polls 8 --updates 5 --noop 3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "bench-token")
+os.environ.setdefault("AIRTABLE_SCHEMA_SOURCE", "static")
+
+from stub_server import running_stub  # noqa: E402
+
+import main  # noqa: E402
+
+
+async def write_changes(rng: random.Random, records: int, updates: int, noop: int, recent: List[str]):
+    """No-op writes resending the status of last round's records, then real updates."""
+    table_id = main.TABLES["TICKETS"]
+    for record_id in rng.sample(recent, min(noop, len(recent))):
+        record = await main.airtable.get_record(table_id, record_id, use_cache=False)
+        await main.airtable.update_record(table_id, record_id, {"status": record["fields"]["status"]})
+    recent.clear()
+    for _ in range(updates):
+        record_id = f"rec{rng.randrange(records):014d}"
+        await main.airtable.update_record(table_id, record_id, {"status": rng.choice(["open", "closed", "in_progress"])})
+        recent.append(record_id)
+
+
+async def poll(strategy: str, state: Dict[str, Any]) -> int:
+    """One poll; returns the number of records handed to the caller."""
+    if strategy == "list_records":
+        records, _ = await main.airtable.collect_records(main.TABLES["TICKETS"], max_records=100000, use_cache=False)
+        return len(records)
+
+    text = (await main.call_tool(
+        "changes_since", {"table": "TICKETS", "since": state.get("cursor"), "output": "json", "max_records": 1000}
+    ))[0].text
+    result = json.loads(text)
+    state["cursor"] = result["cursor"]
+    return len(result["created"]) + len(result["modified"])
+
+
+async def run(strategy: str, args: argparse.Namespace) -> Dict[str, float]:
+    rng = random.Random(args.seed)
+    state: Dict[str, Any] = {}
+    recent: List[str] = []
+    # Start the feed before the first batch of writes
+    await poll(strategy, state)
+    totals = {"requests": 0.0, "returned": 0.0, "seconds": 0.0}
+    scanned_before = main.change_hashes.metrics["scanned"]
+    for _ in range(args.polls):
+        await write_changes(rng, args.records, args.updates, args.noop, recent)
+        await asyncio.sleep(args.interval)
+        requests_before = main.airtable.metrics["requests"]
+        start = time.perf_counter()
+        totals["returned"] += await poll(strategy, state)
+        totals["seconds"] += time.perf_counter() - start
+        totals["requests"] += main.airtable.metrics["requests"] - requests_before
+    if strategy == "changes_since":
+        totals["scanned"] = main.change_hashes.metrics["scanned"] - scanned_before
+    else:
+        totals["scanned"] = totals["returned"]
+    return totals
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Change feed polling benchmark")
+    parser.add_argument("--records", type=int, default=5000, help="Records in the stub TICKETS table")
+    parser.add_argument("--polls", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=1.1, help="Seconds between polls")
+    parser.add_argument("--updates", type=int, default=5, help="Real updates between polls")
+    parser.add_argument("--noop", type=int, default=3, help="No-op updates between polls")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub latency per request (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(
+        f"{args.records} records, {args.polls} polls, {args.updates} updates + "
+        f"{args.noop} no-op writes between polls\n"
+    )
+    print(f"{'strategy':<14} {'requests/poll':>14} {'scanned/poll':>13} {'returned/poll':>14} {'ms/poll':>8}")
+
+    async def run_all(url: str):
+        main.airtable.base_url = f"{url}/{main.settings.airtable_base_id}"
+        main.airtable.limiter = main.RateLimiter(200, burst=20)
+        try:
+            for strategy in ("list_records", "changes_since"):
+                totals = await run(strategy, args)
+                print(
+                    f"{strategy:<14} {totals['requests'] / args.polls:>14.1f} "
+                    f"{totals['scanned'] / args.polls:>13.1f} {totals['returned'] / args.polls:>14.1f} "
+                    f"{totals['seconds'] / args.polls * 1000:>8.1f}"
+                )
+        finally:
+            await main.airtable.aclose()
+
+    with running_stub(records_per_table=args.records, latency=args.latency) as url:
+        asyncio.run(run_all(url))
+
+
+if __name__ == "__main__":
+    # Per-call log lines would dominate the run time
+    logging.disable(logging.INFO)
+    main_cli()
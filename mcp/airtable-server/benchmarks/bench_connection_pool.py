@@ -0,0 +1,86 @@
+"""
+Benchmark: pooled AirtableClient vs. one httpx.AsyncClient per request.
+
+Runs against the local stub server, so no Airtable quota is used. The
+stub's ``--connect-latency`` simulates the TCP/TLS handshake that a new
+client pays on every call.
+
+Usage:
+    python benchmarks/bench_connection_pool.py --requests 200 --connect-latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import running_stub  # noqa: E402
+
+
+def summarize(label: str, samples: List[float]):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"{label:<24} mean={statistics.mean(samples) * 1000:7.2f}ms  "
+        f"p50={statistics.median(samples) * 1000:7.2f}ms  p95={p95 * 1000:7.2f}ms"
+    )
+
+
+async def bench_per_request(main, count: int) -> List[float]:
+    """Previous behaviour: a fresh AsyncClient for every call."""
+    url = f"{main.settings.airtable_api_url}/{main.settings.airtable_base_id}/{main.TABLES['TICKETS']}/rec00000000000001"
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        async with main.httpx.AsyncClient(timeout=main.settings.request_timeout) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+            response.json()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def bench_pooled(main, count: int) -> List[float]:
+    """Current behaviour: one long-lived pooled client."""
+    client = main.AirtableClient()
+    # Measure connection cost only, not the 5 req/s throttle
+    client.limiter = main.RateLimiter(rate=1e9, burst=1000)
+    samples = []
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            await client._request("GET", f"{main.TABLES['TICKETS']}/rec00000000000001")
+            samples.append(time.perf_counter() - start)
+    finally:
+        await client.aclose()
+    return samples
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Connection pool latency benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--connect-latency", type=float, default=0.02)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with running_stub(latency=args.latency, connect_latency=args.connect_latency) as url:
+        os.environ["AIRTABLE_AIRTABLE_API_TOKEN"] = "bench-token"
+        os.environ["AIRTABLE_AIRTABLE_API_URL"] = url
+        import main
+
+        per_request = asyncio.run(bench_per_request(main, args.requests))
+        pooled = asyncio.run(bench_pooled(main, args.requests))
+
+    print(f"{args.requests} sequential GETs, simulated handshake {args.connect_latency * 1000:.0f}ms\n")
+    summarize("new client per request", per_request)
+    summarize("pooled client", pooled)
+    print(f"\nSpeedup (mean): {statistics.mean(per_request) / statistics.mean(pooled):.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()
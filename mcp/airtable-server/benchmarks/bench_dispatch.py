@@ -0,0 +1,134 @@
+"""
+Benchmark: cold start time and per-call tool dispatch overhead.
+
+Times ``import main`` in fresh interpreters, then the ``list_tools`` and
+``call_tool`` paths that run on every request but never reach Airtable:
+cached reads, argument validation errors and schema descriptions, with
+the stub server behind the client for the one priming request. The same
+calls are then timed through the MCP server's request handler, which
+adds mcp's own request parsing and result building.
+
+Usage:
+    python benchmarks/bench_dispatch.py --imports 10 --calls 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "bench-token")
+os.environ.setdefault("AIRTABLE_SCHEMA_SOURCE", "static")
+
+from stub_server import running_stub  # noqa: E402
+
+CALLS = {
+    "get_record (cache hit)": ("get_record", {"table": "TICKETS", "record_id": "rec00000000000001"}),
+    "get_record (invalid id)": ("get_record", {"table": "TICKETS", "record_id": "bad"}),
+    "describe_table": ("describe_table", {"table": "MESSAGES"}),
+    "unknown tool": ("no_such_tool", {}),
+}
+
+
+def cold_start(imports: int) -> List[float]:
+    """Seconds to import the server module in a fresh interpreter."""
+    script = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(imports):
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=ROOT, env=os.environ, capture_output=True, text=True, check=True
+        )
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+async def time_calls(main, name: str, arguments: Dict[str, Any], calls: int) -> List[float]:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await main.call_tool(name, arguments)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def time_server_calls(server, name: str, arguments: Dict[str, Any], calls: int) -> List[float]:
+    from mcp import types
+
+    handler = server.request_handlers[types.CallToolRequest]
+    request = types.CallToolRequest(
+        method="tools/call", params=types.CallToolRequestParams(name=name, arguments=arguments)
+    )
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await handler(request)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def time_list_tools(main, calls: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    await main.list_tools()
+    first = time.perf_counter() - start
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await main.list_tools()
+        samples.append(time.perf_counter() - start)
+    return {"first": first, "median": statistics.median(samples)}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Cold start and dispatch benchmark")
+    parser.add_argument("--imports", type=int, default=10, help="Fresh interpreters to time")
+    parser.add_argument("--calls", type=int, default=5000, help="Calls per dispatch case")
+    args = parser.parse_args()
+
+    samples = cold_start(args.imports)
+    print(
+        f"cold start (import main): median {statistics.median(samples) * 1000:.1f}ms, "
+        f"min {min(samples) * 1000:.1f}ms over {args.imports} runs\n"
+    )
+
+    import main
+
+    async def run_all(url: str):
+        main.airtable.base_url = f"{url}/{main.settings.airtable_base_id}"
+        try:
+            # The first listing imports mcp and builds the tool schemas
+            listing = await time_list_tools(main, args.calls)
+            print(
+                f"{'list_tools':<26} first {listing['first'] * 1000:8.1f}ms   "
+                f"then {listing['median'] * 1e6:7.1f}us/call"
+            )
+            # Prime the read cache so get_record is served without a request
+            await main.call_tool(*CALLS["get_record (cache hit)"])
+            requests_before = main.airtable.metrics["requests"]
+            server = main.create_server()
+            print(f"\n{'':<26} {'call_tool p50':>14} {'via server p50':>15}")
+            for label, (name, arguments) in CALLS.items():
+                direct = await time_calls(main, name, arguments, args.calls)
+                served = await time_server_calls(server, name, arguments, args.calls)
+                print(
+                    f"{label:<26} {statistics.median(direct) * 1e6:12.1f}us "
+                    f"{statistics.median(served) * 1e6:13.1f}us"
+                )
+            assert main.airtable.metrics["requests"] == requests_before, "dispatch cases hit the network"
+        finally:
+            await main.airtable.aclose()
+
+    with running_stub(records_per_table=10) as url:
+        asyncio.run(run_all(url))
+
+
+if __name__ == "__main__":
+    # Per-call log lines, including the expected validation errors, would dominate the run time
+    logging.disable(logging.ERROR)
+    main_cli()
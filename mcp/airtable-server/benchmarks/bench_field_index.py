@@ -0,0 +1,89 @@
+"""
+Benchmark: hash-indexed equality lookups vs. a full formula scan.
+
+Fills a temporary local replica with fake TICKETS and compares
+``{tenant_email}='...'`` answered through the in-memory index against the
+same formula evaluated over every record.
+
+Usage:
+    python benchmarks/bench_field_index.py --sizes 10000 50000 100000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "bench-token")
+
+import main  # noqa: E402
+from stub_server import make_record  # noqa: E402
+
+
+class _OfflineClient:
+    """Stands in for AirtableClient; the replica only needs its write hooks."""
+
+    def __init__(self):
+        self.write_hooks = []
+
+
+def time_call(fn: Callable[[], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_size(size: int, repeat: int):
+    table_id = main.TABLES["TICKETS"]
+    with tempfile.TemporaryDirectory() as tmp:
+        replica = main.LocalReplica(
+            _OfflineClient(),
+            path=os.path.join(tmp, "bench.sqlite3"),
+            tables=main.TABLES,
+            max_staleness=3600,
+            sync_interval=3600,
+            reconcile_interval=3600
+        )
+        for start in range(0, size, 1000):
+            replica._upsert(table_id, [make_record(i) for i in range(start, min(start + 1000, size))])
+        replica.db.commit()
+
+        start = time.perf_counter()
+        replica.index(table_id, "tenant_email")
+        build = time.perf_counter() - start
+
+        formula = f"{{tenant_email}}='tenant{size // 2}@example.com'"
+        predicate = main.compile_formula(formula, "TICKETS")
+
+        scan = time_call(lambda: replica._scan(table_id, formula, predicate, 100, 0), max(1, repeat // 10))
+        indexed = time_call(lambda: replica.search(table_id, formula), repeat)
+        replica.close()
+
+    print(
+        f"{size:>7} records  build={build * 1000:8.1f}ms  "
+        f"scan={statistics.median(scan) * 1000:9.2f}ms  "
+        f"index={statistics.median(indexed) * 1000:7.3f}ms  "
+        f"({statistics.median(scan) / statistics.median(indexed):,.0f}x)"
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Field index lookup benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print("Median latency of {tenant_email}='...' on TICKETS\n")
+    for size in args.sizes:
+        bench_size(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,164 @@
+"""
+Benchmark: several agents on stdio processes versus one shared HTTP server.
+
+Starts N MCP clients that each read a run of TICKETS records with
+``no_cache``. With ``--transport stdio`` every client launches its own
+server process, as each agent session does today, so every process has
+its own rate limiter; with ``--transport http`` all clients talk to one
+``serve --transport http`` process. The stub enforces Airtable's per-base
+rate limit, and the report shows wall time, time until every client was
+ready, upstream requests and the 429s the servers received.
+
+Usage:
+    python benchmarks/bench_http_clients.py --clients 4 --calls 20 --stub-rate-limit 5
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_server import stub_process  # noqa: E402
+
+
+def server_env(url: str, port: int = 0) -> Dict[str, str]:
+    env = dict(
+        os.environ,
+        AIRTABLE_AIRTABLE_API_TOKEN="bench-token",
+        AIRTABLE_AIRTABLE_API_URL=url,
+        AIRTABLE_SCHEMA_SOURCE="static",
+    )
+    if port:
+        env["AIRTABLE_HTTP_PORT"] = str(port)
+    return env
+
+
+def stat(text: str, label: str) -> int:
+    match = re.search(rf"{re.escape(label)}: (\d+)", text)
+    return int(match.group(1)) if match else 0
+
+
+async def read_records(session, client: int, calls: int):
+    for i in range(calls):
+        record_id = f"rec{client * calls + i:014d}"
+        await session.call_tool("get_record", {"table": "TICKETS", "record_id": record_id, "no_cache": True})
+
+
+async def run_clients(sessions: List, args: argparse.Namespace) -> Dict[str, float]:
+    start = time.perf_counter()
+    await asyncio.gather(*(read_records(session, i, args.calls) for i, session in enumerate(sessions)))
+    return {"seconds": time.perf_counter() - start}
+
+
+async def open_stdio(stack: AsyncExitStack, url: str):
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(command=sys.executable, args=["main.py"], cwd=ROOT, env=server_env(url))
+    read_stream, write_stream = await stack.enter_async_context(stdio_client(params, errlog=subprocess.DEVNULL))
+    session = await stack.enter_async_context(ClientSession(read_stream, write_stream))
+    await session.initialize()
+    return session
+
+
+async def open_http(stack: AsyncExitStack, endpoint: str):
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    read_stream, write_stream, _ = await stack.enter_async_context(streamablehttp_client(endpoint))
+    session = await stack.enter_async_context(ClientSession(read_stream, write_stream))
+    await session.initialize()
+    return session
+
+
+async def wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def bench(transport: str, url: str, args: argparse.Namespace) -> Dict[str, float]:
+    # Sessions are opened one after another: their streams must be closed
+    # by the task that opened them
+    async with AsyncExitStack() as stack:
+        start = time.perf_counter()
+        if transport == "stdio":
+            sessions = [await open_stdio(stack, url) for _ in range(args.clients)]
+        else:
+            with socket.socket() as probe:
+                probe.bind(("127.0.0.1", 0))
+                port = probe.getsockname()[1]
+            server = subprocess.Popen(
+                [sys.executable, "main.py", "serve", "--transport", "http", "--port", str(port)],
+                cwd=ROOT, env=server_env(url, port), stderr=subprocess.DEVNULL
+            )
+            stack.callback(server.wait, 30)
+            stack.callback(server.terminate)
+            await wait_for_port(port)
+            endpoint = f"http://127.0.0.1:{port}/mcp"
+            sessions = [await open_http(stack, endpoint) for _ in range(args.clients)]
+        result = {"ready": time.perf_counter() - start}
+        result.update(await run_clients(sessions, args))
+
+        # One report per server process
+        reporters = sessions if transport == "stdio" else sessions[:1]
+        result["requests"] = result["rate_limited"] = 0
+        for session in reporters:
+            text = (await session.call_tool("server_stats", {})).content[0].text
+            result["requests"] += stat(text, "• Requests")
+            result["rate_limited"] += stat(text, "Rate limited (429)")
+        return result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="stdio processes vs one shared HTTP server")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--calls", type=int, default=20, help="get_record calls per client")
+    parser.add_argument("--stub-rate-limit", type=float, default=5, help="Stub requests/sec per base before 429")
+    parser.add_argument(
+        "--retry-after", type=float, default=1.0, help="Retry-After sent with 429s (Airtable itself waits 30s)"
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub latency per request (s)")
+    parser.add_argument("--transport", choices=["stdio", "http"], nargs="+", default=["stdio", "http"])
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients x {args.calls} reads, stub limit {args.stub_rate_limit:g} req/s, "
+        f"latency {args.latency * 1000:.0f}ms\n"
+    )
+    print(f"{'transport':<10} {'ready s':>8} {'seconds':>8} {'calls/s':>8} {'requests':>9} {'429s':>6}")
+    records = args.clients * args.calls
+    with stub_process(
+        records_per_table=records,
+        latency=args.latency,
+        rate_limit=args.stub_rate_limit,
+        retry_after=args.retry_after
+    ) as url:
+        for transport in args.transport:
+            # Let the stub's rate window empty between runs
+            time.sleep(1.5)
+            result = asyncio.run(bench(transport, url, args))
+            print(
+                f"{transport:<10} {result['ready']:>8.2f} {result['seconds']:>8.2f} "
+                f"{records / result['seconds']:>8.1f} {result['requests']:>9} {result['rate_limited']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,109 @@
+"""
+Benchmark: throughput when reads are spread over several bases.
+
+Configures extra bases through ``AIRTABLE_BASES`` and issues uncached
+``get_record`` calls round-robin across 1, 2, 4... of them against the
+stub server, which enforces its rate limit per base like Airtable. Each
+base has its own limiter and connection pool, so throughput should grow
+with the number of bases instead of sharing one 5 req/s budget.
+
+Usage:
+    python benchmarks/bench_multi_base.py --bases 1 2 4 --calls 100 --rate 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def run(main, names, calls: int) -> dict:
+    requests_before = sum(main.bases[name].client.metrics["requests"] for name in names)
+    limited_before = sum(main.bases[name].client.metrics["rate_limited"] for name in names)
+    latencies = []
+
+    async def call(index: int):
+        start = time.perf_counter()
+        contents = await main.call_tool("get_record", {
+            "table": "TICKETS",
+            "record_id": f"rec{index:014d}",
+            "no_cache": True,
+            "base": names[index % len(names)],
+        })
+        latencies.append(time.perf_counter() - start)
+        assert not contents[0].text.startswith("❌"), contents[0].text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(calls)))
+    return {
+        "elapsed": time.perf_counter() - start,
+        "latencies": latencies,
+        "requests": sum(main.bases[name].client.metrics["requests"] for name in names) - requests_before,
+        "rate_limited": sum(main.bases[name].client.metrics["rate_limited"] for name in names) - limited_before,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Multi-base throughput benchmark")
+    parser.add_argument("--bases", type=int, nargs="+", default=[1, 2, 4], help="Numbers of bases to spread calls over")
+    parser.add_argument("--calls", type=int, default=100, help="Calls per run")
+    parser.add_argument("--rate", type=int, default=5, help="Client rate limit per base (req/s)")
+    parser.add_argument(
+        "--stub-rate-limit", type=float, default=None,
+        help="Stub rate limit per base (default: one above --rate, so timer jitter alone doesn't cause 429s)"
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub latency per request (s)")
+    args = parser.parse_args()
+
+    extra = max(args.bases) - 1
+    os.environ["AIRTABLE_BASES"] = json.dumps({
+        f"agency{n}": {"base_id": f"appAGENCY{n:08d}", "rate_limit_per_sec": args.rate}
+        for n in range(1, extra + 1)
+    })
+    os.environ["AIRTABLE_RATE_LIMIT_PER_SEC"] = str(args.rate)
+    from stub_server import stub_process
+    import main
+
+    names = list(main.bases)
+    print(f"{args.calls} uncached get_record calls, {args.rate} req/s per base, stub latency {args.latency * 1000:.0f}ms\n")
+    print(f"{'bases':>5} {'calls/s':>8} {'p50 ms':>8} {'max ms':>8} {'requests':>8} {'429s':>5}")
+
+    with stub_process(
+        records_per_table=args.calls,
+        latency=args.latency,
+        rate_limit=args.stub_rate_limit or args.rate + 1,
+        retry_after=1.0
+    ) as url:
+        for base in main.bases.values():
+            base.client.base_url = f"{url}/{base.client.base_url.rsplit('/', 1)[1]}"
+
+        async def run_all():
+            try:
+                for count in args.bases:
+                    # Let the previous run's rate windows expire
+                    await asyncio.sleep(1.0)
+                    result = await run(main, names[:count], args.calls)
+                    print(
+                        f"{count:>5} {args.calls / result['elapsed']:>8.1f} "
+                        f"{statistics.median(result['latencies']) * 1000:>8.0f} "
+                        f"{max(result['latencies']) * 1000:>8.0f} "
+                        f"{result['requests']:>8.0f} {result['rate_limited']:>5.0f}"
+                    )
+            finally:
+                await main.close_clients()
+
+        asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "bench-token")
+    os.environ.setdefault("AIRTABLE_SCHEMA_SOURCE", "static")
+    # Per-call log lines and the occasional 429 retry warning would drown the table
+    logging.disable(logging.WARNING)
+    main_cli()
@@ -0,0 +1,67 @@
+"""
+Benchmark: payload size and formatting time of the read tool output modes.
+
+Renders 1k TICKETS-like records, with long descriptions and image URL
+arrays, as text, json and table, with and without field projection.
+
+Usage:
+    python benchmarks/bench_output_formats.py --records 1000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "bench-token")
+
+import main  # noqa: E402
+from stub_server import make_record  # noqa: E402
+
+
+def make_ticket(index: int):
+    record = make_record(index)
+    record["fields"].update({
+        "description": "Fuite d'eau importante sous l'évier de la cuisine, le placard est inondé. " * 6,
+        "images_urls": [
+            f"https://dl.airtable.com/.attachments/{index:08d}/{n}/photo_{n}.jpg"
+            for n in range(4)
+        ],
+        "PROFESSIONALS": ["recPROF000000001"],
+        "created_at": "2025-11-26T10:00:00.000Z",
+        "resolution_notes": "",
+    })
+    return record
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Output format benchmark")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    records = [make_ticket(i) for i in range(args.records)]
+    projection = ["title", "status", "priority", "unit"]
+
+    print(f"{args.records} TICKETS records\n")
+    print(f"{'mode':<8} {'fields':<10} {'bytes':>12} {'median ms':>10}")
+    baseline = None
+    for fields in (None, projection):
+        for output in ("text", "json", "table"):
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                text = main.render_records(records, output, fields=fields)
+                samples.append(time.perf_counter() - start)
+            size = len(text.encode("utf-8"))
+            baseline = baseline or size
+            print(
+                f"{output:<8} {'4 fields' if fields else 'all':<10} {size:>12,} "
+                f"{statistics.median(samples) * 1000:>10.2f}   ({size / baseline:.0%} of text/all)"
+            )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,71 @@
+"""
+Benchmark: interactive latency while a bulk job saturates the rate limiter.
+
+Queues a burst of bulk requests, then issues interactive requests one at
+a time and measures how long each waits for a token. Run once with
+interactive calls in their own lane and once with everything sharing the
+bulk lane (the old first-come, first-served behaviour).
+
+Usage:
+    python benchmarks/bench_priority_lanes.py --bulk 300 --rate 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "bench-token")
+
+import main  # noqa: E402
+
+
+async def run(bulk: int, interactive: int, rate: float, request_time: float, lanes: bool) -> List[float]:
+    limiter = main.RateLimiter(rate, burst=1, max_in_flight=10, weights=main.settings.priority_weights)
+
+    async def request(lane: str):
+        async with limiter.slot(lane):
+            await asyncio.sleep(request_time)
+
+    bulk_tasks = [asyncio.create_task(request("bulk")) for _ in range(bulk)]
+    await asyncio.sleep(0.2)
+
+    waits = []
+    for _ in range(interactive):
+        start = time.perf_counter()
+        await request("interactive" if lanes else "bulk")
+        waits.append(time.perf_counter() - start - request_time)
+        await asyncio.sleep(0.1)
+
+    for task in bulk_tasks:
+        task.cancel()
+    await asyncio.gather(*bulk_tasks, return_exceptions=True)
+    return waits
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Priority lane benchmark")
+    parser.add_argument("--bulk", type=int, default=300)
+    parser.add_argument("--interactive", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=50)
+    parser.add_argument("--request-time", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(
+        f"{args.bulk} queued bulk requests at {args.rate:g} req/s, "
+        f"{args.interactive} interactive requests\n"
+    )
+    for label, lanes in (("single FIFO lane", False), ("priority lanes", True)):
+        waits = asyncio.run(run(args.bulk, args.interactive, args.rate, args.request_time, lanes))
+        print(
+            f"{label:<18} interactive wait: mean={statistics.mean(waits) * 1000:8.1f}ms  "
+            f"max={max(waits) * 1000:8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
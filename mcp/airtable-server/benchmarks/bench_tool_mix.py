@@ -0,0 +1,205 @@
+"""
+Benchmark: realistic tool-call mix through ``call_tool`` at varying concurrency.
+
+Drives the full MCP tool path (validation, cache, rate limiter, HTTP,
+formatting) with a weighted mix of TICKETS, TENANTS and MESSAGES reads
+and writes against the stub server, running in a separate process.
+Reports throughput, p50/p95/p99 latency, upstream requests, 429s and
+memory for each concurrency level.
+
+Usage:
+    python benchmarks/bench_tool_mix.py --concurrency 1 4 16 --calls 300 --latency 0.05
+    python benchmarks/bench_tool_mix.py --rate 5 --stub-rate-limit 5   # Airtable-like quota
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import make_message, make_record, make_tenant, stub_process  # noqa: E402
+
+Call = Tuple[str, Dict[str, Any]]
+
+
+def build_mix(records: int) -> List[Tuple[int, str, Callable[[random.Random], Call]]]:
+    """(weight, label, call factory) for a support-desk style workload."""
+    def rid(rng: random.Random) -> str:
+        return f"rec{rng.randrange(records):014d}"
+
+    return [
+        (30, "get_record TICKETS", lambda rng: ("get_record", {"table": "TICKETS", "record_id": rid(rng)})),
+        (15, "lookup_by_field TENANTS", lambda rng: (
+            "lookup_by_field",
+            {"table": "TENANTS", "field": "email", "value": f"tenant{rng.randrange(records)}@example.com"}
+        )),
+        (15, "search_records TICKETS", lambda rng: (
+            "search_records",
+            {"table": "TICKETS", "filter_formula": f"{{unit}}='A{rng.randrange(500):03d}'", "max_records": 20}
+        )),
+        (10, "list_records MESSAGES", lambda rng: (
+            "list_records",
+            {"table": "MESSAGES", "max_records": 50, "fields": ["titre", "categorie"], "output": "json"}
+        )),
+        (10, "get_record TENANTS", lambda rng: ("get_record", {"table": "TENANTS", "record_id": rid(rng)})),
+        (10, "update_record TICKETS", lambda rng: (
+            "update_record",
+            {"table": "TICKETS", "record_id": rid(rng), "fields": {"status": rng.choice(["open", "in_progress"])}}
+        )),
+        (5, "create_record MESSAGES", lambda rng: (
+            "create_record",
+            {"table": "MESSAGES", "fields": {"titre": "Benchmark", "message": "Test", "categorie": "general"}}
+        )),
+        (5, "aggregate_records TICKETS", lambda rng: (
+            "aggregate_records",
+            {"table": "TICKETS", "group_by": ["status"]}
+        )),
+    ]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_level(main, mix, concurrency: int, calls: int, seed: int, trace_memory: bool) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    weights = [weight for weight, _, _ in mix]
+    plan = [rng.choices(mix, weights)[0] for _ in range(calls)]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+    requests_before = main.airtable.metrics["requests"]
+    limited_before = main.airtable.metrics["rate_limited"]
+    if main.airtable.cache is not None:
+        main.airtable.cache.clear()
+
+    pending = iter(plan)
+
+    async def worker():
+        nonlocal errors
+        for _, label, make_call in pending:
+            name, arguments = make_call(rng)
+            start = time.perf_counter()
+            contents = await main.call_tool(name, arguments)
+            latencies[label].append(time.perf_counter() - start)
+            if contents[0].text.startswith("❌"):
+                errors += 1
+
+    if trace_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed": elapsed,
+        "latencies": latencies,
+        "errors": errors,
+        "requests": main.airtable.metrics["requests"] - requests_before,
+        "rate_limited": main.airtable.metrics["rate_limited"] - limited_before,
+        "peak_traced": tracemalloc.get_traced_memory()[1] if trace_memory else None,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Tool-call mix benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--calls", type=int, default=300, help="Tool calls per concurrency level")
+    parser.add_argument("--records", type=int, default=2000, help="Records per table in the stub")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub latency per request (s)")
+    parser.add_argument("--latency-jitter", type=float, default=0.02)
+    parser.add_argument("--rate", type=float, default=50, help="Client rate limit (req/s); Airtable allows 5")
+    parser.add_argument("--stub-rate-limit", type=float, default=None, help="Stub answers 429 above this req/s")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of random 429s from the stub")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the read cache")
+    parser.add_argument("--trace-memory", action="store_true", help="Track peak Python allocations (slower)")
+    parser.add_argument("--per-tool", action="store_true", help="Print latency per tool for each level")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    import main as main_module
+    tables = main_module.TABLES
+    factories = {
+        tables["TICKETS"]: make_record,
+        tables["TENANTS"]: make_tenant,
+        tables["MESSAGES"]: make_message,
+    }
+
+    with stub_process(
+        records_per_table=args.records,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        rate_limit=args.stub_rate_limit,
+        fail_rate=args.fail_rate,
+        retry_after=1.0,
+        factories=factories,
+        seed=args.seed
+    ) as url:
+        main_module.airtable.base_url = f"{url}/{main_module.settings.airtable_base_id}"
+        main_module.airtable.limiter = main_module.RateLimiter(
+            args.rate,
+            burst=main_module.settings.rate_limit_burst,
+            max_in_flight=main_module.settings.max_concurrent_requests,
+            weights=main_module.settings.priority_weights
+        )
+        if args.no_cache:
+            main_module.airtable.cache = None
+        if args.trace_memory:
+            tracemalloc.start()
+
+        mix = build_mix(args.records)
+        print(
+            f"{args.calls} calls per level, stub latency {args.latency * 1000:.0f}ms "
+            f"(+{args.latency_jitter * 1000:.0f}ms jitter), client rate {args.rate:g} req/s\n"
+        )
+        print(
+            f"{'conc':>4} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'requests':>8} {'429s':>5} {'errors':>6} {'peak MB':>8}"
+        )
+
+        async def run_all():
+            try:
+                for level in args.concurrency:
+                    result = await run_level(
+                        main_module, mix, level, args.calls, args.seed, args.trace_memory
+                    )
+                    samples = [s for values in result["latencies"].values() for s in values]
+                    peak = result["peak_traced"]
+                    print(
+                        f"{level:>4} {args.calls / result['elapsed']:>8.1f} "
+                        f"{percentile(samples, 0.50) * 1000:>8.1f} {percentile(samples, 0.95) * 1000:>8.1f} "
+                        f"{percentile(samples, 0.99) * 1000:>8.1f} {result['requests']:>8.0f} "
+                        f"{result['rate_limited']:>5.0f} {result['errors']:>6} "
+                        f"{peak / 2**20 if peak is not None else float('nan'):>8.1f}"
+                    )
+                    if args.per_tool:
+                        for label, values in sorted(result["latencies"].items()):
+                            print(
+                                f"       {label:<28} n={len(values):<4} "
+                                f"p50={statistics.median(values) * 1000:7.1f}ms "
+                                f"p95={percentile(values, 0.95) * 1000:7.1f}ms"
+                            )
+            finally:
+                await main_module.airtable.aclose()
+
+        asyncio.run(run_all())
+
+    # ru_maxrss is in KiB on Linux
+    print(f"\nProcess peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "bench-token")
+    # Per-call log lines would dominate the run time
+    logging.disable(logging.INFO)
+    main_cli()
@@ -0,0 +1,104 @@
+"""
+Benchmark: attachment uploads at varying concurrency, and repeat uploads.
+
+Writes a set of random files, then attaches them to one ticket with
+``upload_attachment`` against the stub server for each concurrency level
+(each level with a fresh upload index), and finally attaches the same
+files again to show deduplication. Reports wall time, upload requests,
+MB sent and peak Python allocations during the call, which stay far below
+the file sizes because files are streamed from disk.
+
+Usage:
+    python benchmarks/bench_uploads.py --files 12 --size-mb 2 --concurrency 1 3 6 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import logging
+import mimetypes
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "bench-token")
+os.environ.setdefault("AIRTABLE_SCHEMA_SOURCE", "static")
+
+from stub_server import stub_process  # noqa: E402
+
+import main  # noqa: E402
+
+
+async def attach(directory: str, paths, concurrency: int, fresh: bool) -> dict:
+    if fresh:
+        main.bases[main.DEFAULT_BASE].uploads = main.UploadIndex(
+            main.airtable, os.path.join(directory, f"uploads-{concurrency}.json"), concurrency
+        )
+    uploads = main.bases[main.DEFAULT_BASE].uploads
+    sent_before = uploads.metrics["bytes_sent"]
+    requests_before = main.airtable.metrics["requests"]
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    text = (await main.call_tool(
+        "upload_attachment", {"record_id": "rec00000000000001", "paths": paths, "replace": True}
+    ))[0].text
+    elapsed = time.perf_counter() - start
+    assert text.startswith("✅"), text
+    return {
+        "seconds": elapsed,
+        "requests": main.airtable.metrics["requests"] - requests_before,
+        "sent": uploads.metrics["bytes_sent"] - sent_before,
+        "peak": tracemalloc.get_traced_memory()[1] - baseline,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Attachment upload benchmark")
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--size-mb", type=float, default=2.0, help="Size of each file")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 3, 6])
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub latency per request (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(directory, f"photo-{i:02d}.jpg")
+            with open(path, "wb") as f:
+                f.write(os.urandom(int(args.size_mb * 2**20)))
+            paths.append(path)
+
+        print(f"{args.files} files of {args.size_mb:g} MB, stub latency {args.latency * 1000:.0f}ms\n")
+        print(f"{'run':<20} {'seconds':>8} {'requests':>8} {'MB sent':>8} {'peak MB':>8}")
+
+        async def run_all(url: str):
+            main.airtable.base_url = f"{url}/{main.settings.airtable_base_id}"
+            main.settings.content_url = url
+            main.airtable.limiter = main.RateLimiter(200, burst=20)
+            # Lazy imports (mcp types, the mimetypes table) would count against the first run
+            await main.call_tool("describe_table", {"table": "TICKETS"})
+            mimetypes.guess_type("photo.jpg")
+            tracemalloc.start()
+            try:
+                runs = [(f"concurrency {level}", level, True) for level in args.concurrency]
+                runs.append(("repeat (deduped)", args.concurrency[-1], False))
+                for label, level, fresh in runs:
+                    result = await attach(directory, paths, level, fresh)
+                    print(
+                        f"{label:<20} {result['seconds']:>8.2f} {result['requests']:>8} "
+                        f"{result['sent'] / 2**20:>8.1f} {result['peak'] / 2**20:>8.1f}"
+                    )
+            finally:
+                await main.airtable.aclose()
+
+        with stub_process(records_per_table=10, latency=args.latency) as url:
+            asyncio.run(run_all(url))
+
+
+if __name__ == "__main__":
+    # Per-call log lines would dominate the run time
+    logging.disable(logging.INFO)
+    main_cli()
@@ -0,0 +1,95 @@
+"""
+Benchmark: PATCH requests and agent-visible latency with write-behind.
+
+Simulates agents updating tickets in quick succession (status, then
+assigned professional, then resolution notes) through ``update_record``,
+once with direct writes and once with write-behind mode, against the
+stub server at Airtable's 5 req/s.
+
+Usage:
+    python benchmarks/bench_write_behind.py --tickets 30 --rate 5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "bench-token")
+os.environ.setdefault("AIRTABLE_SCHEMA_SOURCE", "static")
+
+import main  # noqa: E402
+from stub_server import running_stub  # noqa: E402
+
+UPDATES = (
+    {"status": "assigned"},
+    {"PROFESSIONALS": ["recPROF000000001"]},
+    {"status": "resolved", "resolution_notes": "Joint remplacé"},
+)
+
+
+async def run(url: str, tickets: int, rate: float, window: float, journal: str) -> dict:
+    main.airtable.base_url = f"{url}/{main.settings.airtable_base_id}"
+    main.airtable.limiter = main.RateLimiter(rate, burst=1, weights=main.settings.priority_weights)
+    main.airtable.cache = None
+    base = main.bases[main.DEFAULT_BASE]
+    base.write_behind = main.WriteBehindQueue(main.airtable, journal, window) if window else None
+    requests_before = main.airtable.metrics["requests"]
+    latencies = []
+
+    async def agent(index: int):
+        for fields in UPDATES:
+            start = time.perf_counter()
+            contents = await main.call_tool(
+                "update_record",
+                {"table": "TICKETS", "record_id": f"rec{index:014d}", "fields": fields}
+            )
+            latencies.append(time.perf_counter() - start)
+            assert contents[0].text.startswith("✅"), contents[0].text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(agent(i) for i in range(tickets)))
+    acknowledged = time.perf_counter() - start
+    if base.write_behind is not None:
+        await base.write_behind.close()
+    return {
+        "acknowledged": acknowledged,
+        "written": time.perf_counter() - start,
+        "requests": main.airtable.metrics["requests"] - requests_before,
+        "p50": statistics.median(latencies),
+        "max": max(latencies),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Write-behind benchmark")
+    parser.add_argument("--tickets", type=int, default=30, help="Tickets updated concurrently, 3 updates each")
+    parser.add_argument("--rate", type=float, default=5, help="Client rate limit (req/s)")
+    parser.add_argument("--window", type=float, default=2.0, help="Write-behind window (s)")
+    parser.add_argument("--latency", type=float, default=0.1, help="Stub latency per request (s)")
+    args = parser.parse_args()
+
+    print(f"{args.tickets} tickets x {len(UPDATES)} updates at {args.rate:g} req/s\n")
+    print(f"{'mode':<14} {'requests':>8} {'p50 ack ms':>11} {'max ack ms':>11} {'all written s':>14}")
+    with running_stub(records_per_table=args.tickets, latency=args.latency) as url, \
+            tempfile.TemporaryDirectory() as tmp:
+        async def run_all():
+            try:
+                for label, window in (("direct", 0.0), ("write-behind", args.window)):
+                    result = await run(url, args.tickets, args.rate, window, os.path.join(tmp, "journal.jsonl"))
+                    print(
+                        f"{label:<14} {result['requests']:>8.0f} {result['p50'] * 1000:>11.1f} "
+                        f"{result['max'] * 1000:>11.1f} {result['written']:>14.1f}"
+                    )
+            finally:
+                await main.airtable.aclose()
+
+        asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,519 @@
+"""
+Local Airtable stub server for offline benchmarks.
+
+Speaks just enough of the Airtable REST API for ``AirtableClient`` to run
+against it without touching the real base or burning API quota: single
+and batch record endpoints, pagination offsets, ``fields[]``, and
+``filterByFormula`` (evaluated with the server's own formula subset, plus
+``LAST_MODIFIED_TIME()`` for replica syncs), content API uploads, and
+optionally the metadata API's table schema. Latency, a per-base rate
+limit and random 429/5xx responses can be injected.
+
+Usage:
+    python benchmarks/stub_server.py --port 8787 --latency 0.05 --rate-limit 5
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+RecordFactory = Callable[[int], Dict[str, Any]]
+
+LAST_MODIFIED_FIELD = "__last_modified"
+DATETIME_PARSE_CALL = re.compile(r"DATETIME_PARSE\(\s*('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")\s*\)")
+
+
+def make_record(index: int) -> Dict[str, Any]:
+    """Build a fake TICKETS-like record."""
+    return {
+        "id": f"rec{index:014d}",
+        "createdTime": "2025-11-26T10:00:00.000Z",
+        "fields": {
+            "title": f"Ticket {index}",
+            "description": "Fuite dans la salle de bain",
+            "category": "plomberie",
+            "status": "open",
+            "priority": "high",
+            "tenant_email": f"tenant{index}@example.com",
+            "unit": f"A{index % 500:03d}",
+        },
+    }
+
+
+def make_tenant(index: int) -> Dict[str, Any]:
+    """Build a fake TENANTS record."""
+    return {
+        "id": f"rec{index:014d}",
+        "createdTime": "2025-11-20T09:00:00.000Z",
+        "fields": {
+            "email": f"tenant{index}@example.com",
+            "first_name": f"Prénom{index}",
+            "last_name": f"Nom{index}",
+            "unit": f"A{index % 500:03d}",
+            "phone": f"06{index:08d}",
+            "residence_name": f"Résidence {index % 20}",
+            "status": "active",
+            "TICKETS": [f"rec{index:014d}"],
+        },
+    }
+
+
+def make_message(index: int) -> Dict[str, Any]:
+    """Build a fake MESSAGES record."""
+    return {
+        "id": f"rec{index:014d}",
+        "createdTime": "2025-11-25T08:00:00.000Z",
+        "fields": {
+            "titre": f"Information {index}",
+            "message": "Coupure d'eau prévue jeudi de 9h à 12h dans le bâtiment A. " * 3,
+            "categorie": ["intervention", "evenement", "general"][index % 3],
+            "created_at": "2025-11-25T08:00:00.000Z",
+        },
+    }
+
+
+_compile_formula: Optional[Callable[[str], Any]] = None
+
+
+def compile_formula(formula: str) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Compile ``filterByFormula`` with the server's own evaluator.
+
+    ``LAST_MODIFIED_TIME()`` and ``DATETIME_PARSE('...')``, which the local
+    replica sync sends but never evaluates itself, are rewritten first.
+    """
+    global _compile_formula
+    if _compile_formula is None:
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "stub-token")
+        from main import compile_formula as server_compile_formula
+        _compile_formula = server_compile_formula
+
+    formula = formula.replace("LAST_MODIFIED_TIME()", f"{{{LAST_MODIFIED_FIELD}}}")
+    formula = DATETIME_PARSE_CALL.sub(r"\1", formula)
+    return _compile_formula(formula)
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+
+
+class StubAirtable:
+    """In-memory store shared by all request handler threads.
+
+    Every table ID the client asks for is created on first use and seeded
+    with ``records_per_table`` fake records.
+    """
+
+    def __init__(
+        self,
+        records_per_table: int = 100,
+        latency: float = 0.0,
+        connect_latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        rate_limit: Optional[float] = None,
+        fail_rate: float = 0.0,
+        fail_status: int = 429,
+        retry_after: Optional[float] = None,
+        factories: Optional[Dict[str, RecordFactory]] = None,
+        seed: Optional[int] = None,
+        schema: Optional[Dict[str, Any]] = None
+    ):
+        self.records_per_table = records_per_table
+        self.latency = latency
+        # Extra latency drawn uniformly from [0, latency_jitter]
+        self.latency_jitter = latency_jitter
+        # Simulates the TCP/TLS handshake cost paid once per new connection
+        self.connect_latency = connect_latency
+        # Requests per second per base accepted before answering 429, like Airtable's 5/s
+        self.rate_limit = rate_limit
+        # Fraction of requests failing at random with ``fail_status``
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        # Seed data per table ID; other tables get TICKETS-like records
+        self.factories = factories or {}
+        self.random = random.Random(seed)
+        # Served at /v0/meta/bases/{base}/tables; without it that route is a 404
+        self.schema = schema
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.modified: Dict[str, str] = {}
+        self.next_id = records_per_table
+        self.request_count = 0
+        self.connection_count = 0
+        self.rejected_count = 0
+        # Size of every file received by the content upload endpoint
+        self.uploads: List[int] = []
+        self.recent: Dict[str, Deque[float]] = defaultdict(deque)
+        self.lock = threading.Lock()
+
+    def table(self, table_id: str) -> Dict[str, Dict[str, Any]]:
+        if table_id not in self.tables:
+            factory = self.factories.get(table_id, make_record)
+            records = (factory(i) for i in range(self.records_per_table))
+            self.tables[table_id] = {record["id"]: record for record in records}
+        return self.tables[table_id]
+
+    def last_modified(self, record: Dict[str, Any]) -> str:
+        return self.modified.get(record["id"], record["createdTime"])
+
+    def reject(self, base_id: str) -> Optional[int]:
+        """Status code to fail the current request to ``base_id`` with, if any."""
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            return self.fail_status
+        if self.rate_limit:
+            now = time.monotonic()
+            recent = self.recent[base_id]
+            while recent and now - recent[0] >= 1.0:
+                recent.popleft()
+            if len(recent) >= self.rate_limit:
+                return 429
+            recent.append(now)
+        return None
+
+    def create(self, table_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        record = {
+            "id": f"rec{self.next_id:014d}",
+            "createdTime": _now(),
+            "fields": fields,
+        }
+        self.next_id += 1
+        self.table(table_id)[record["id"]] = record
+        return record
+
+    def update(self, table_id: str, record_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        record = self.table(table_id).get(record_id)
+        if record is not None:
+            record["fields"] = {**record["fields"], **fields}
+            self.modified[record_id] = _now()
+        return record
+
+    def select(
+        self,
+        table_id: str,
+        formula: Optional[str],
+        fields: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Records matching ``formula``, projected to ``fields``.
+
+        Raises ValueError for formulas outside the supported subset.
+        """
+        records = list(self.table(table_id).values())
+        if formula:
+            predicate = compile_formula(formula)
+            if predicate is None:
+                raise ValueError(f"Unsupported formula: {formula}")
+            matched = []
+            for record in records:
+                view = {
+                    **record,
+                    "fields": {**record["fields"], LAST_MODIFIED_FIELD: self.last_modified(record)}
+                }
+                try:
+                    if predicate(view):
+                        matched.append(record)
+                except Exception as e:
+                    raise ValueError(f"Unsupported formula: {formula} ({e})")
+            records = matched
+        if fields:
+            records = [
+                {**r, "fields": {f: r["fields"][f] for f in fields if f in r["fields"]}}
+                for r in records
+            ]
+        return records
+
+    def delete(self, table_id: str, record_id: str) -> bool:
+        return self.table(table_id).pop(record_id, None) is not None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Minimal Airtable REST handler (HTTP/1.1 with keep-alive)."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    stub: StubAirtable
+
+    def setup(self):
+        super().setup()
+        with self.stub.lock:
+            self.stub.connection_count += 1
+        if self.stub.connect_latency:
+            time.sleep(self.stub.connect_latency)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _route(self) -> Optional[Tuple[str, Optional[str], Dict[str, List[str]]]]:
+        """Split /v0/{base}/{table}[/{record}] into its parts.
+
+        Returns None, after answering with an error, when the request is
+        rate limited or picked for failure injection.
+        """
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        with self.stub.lock:
+            self.stub.request_count += 1
+            status = self.stub.reject(parts[1] if len(parts) > 1 else "")
+            if status:
+                self.stub.rejected_count += 1
+            delay = self.stub.latency + self.stub.random.uniform(0, self.stub.latency_jitter)
+        if delay:
+            time.sleep(delay)
+
+        if status:
+            # Drain the body so the keep-alive connection stays usable
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            error = "RATE_LIMIT_REACHED" if status == 429 else "SERVICE_UNAVAILABLE"
+            headers = {"Retry-After": f"{self.stub.retry_after:g}"} if self.stub.retry_after is not None else {}
+            self._send_json(status, {"errors": [{"error": error}]}, headers)
+            return None
+
+        table_id = parts[2] if len(parts) > 2 else ""
+        record_id = parts[3] if len(parts) > 3 else None
+        return table_id, record_id, parse_qs(url.query)
+
+    def do_GET(self):
+        route = self._route()
+        if route is None:
+            return
+        table_id, record_id, query = route
+        if self.path.startswith("/v0/meta/"):
+            if self.stub.schema is None:
+                self._send_json(404, {"error": "NOT_FOUND"})
+            else:
+                self._send_json(200, self.stub.schema)
+            return
+        with self.stub.lock:
+            table = self.stub.table(table_id)
+            if record_id:
+                record = table.get(record_id)
+                if record is None:
+                    self._send_json(404, {"error": "NOT_FOUND"})
+                else:
+                    self._send_json(200, record)
+                return
+
+            try:
+                records = self.stub.select(
+                    table_id,
+                    query.get("filterByFormula", [None])[0],
+                    query.get("fields[]", [])
+                )
+            except ValueError as e:
+                self._send_json(422, {"error": {"type": "INVALID_FILTER_BY_FORMULA", "message": str(e)}})
+                return
+
+        page_size = min(int(query.get("pageSize", ["100"])[0]), 100)
+        start = int(query.get("offset", ["itr0"])[0][3:])
+        end = start + page_size
+        payload: Dict[str, Any] = {"records": records[start:end]}
+        if end < len(records):
+            payload["offset"] = f"itr{end}"
+        self._send_json(200, payload)
+
+    def do_POST(self):
+        route = self._route()
+        if route is None:
+            return
+        table_id, _, _ = route
+        if self.path.startswith("/v0/uploads"):
+            self._upload()
+            return
+        body = self._read_json()
+        with self.stub.lock:
+            if "records" in body:
+                created = [self.stub.create(table_id, r["fields"]) for r in body["records"]]
+                self._send_json(200, {"records": created})
+            else:
+                self._send_json(200, self.stub.create(table_id, body["fields"]))
+
+    def _upload(self):
+        """Content API upload: a multipart/form-data body with one file."""
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        boundary = self.headers.get("Content-Type", "").partition("boundary=")[2].encode()
+        head, _, rest = body.partition(b"\r\n\r\n")
+        content = rest[:-len(b"\r\n--" + boundary + b"--\r\n")]
+        filename = re.search(rb'filename="((?:[^"\\]|\\.)*)"', head)
+        with self.stub.lock:
+            self.stub.uploads.append(len(content))
+            attachment_id = f"att{len(self.stub.uploads):014d}"
+        name = filename.group(1).decode() if filename else "file"
+        self._send_json(200, {
+            "id": attachment_id,
+            "filename": name,
+            "size": len(content),
+            "url": f"https://v5.airtableusercontent.com/stub/{attachment_id}/{name}",
+        })
+
+    def do_PATCH(self):
+        route = self._route()
+        if route is None:
+            return
+        table_id, record_id, _ = route
+        body = self._read_json()
+        with self.stub.lock:
+            if record_id:
+                record = self.stub.update(table_id, record_id, body["fields"])
+                if record is None:
+                    self._send_json(404, {"error": "NOT_FOUND"})
+                else:
+                    self._send_json(200, record)
+                return
+
+            merge_on = body.get("performUpsert", {}).get("fieldsToMergeOn")
+            updated, created_ids = [], []
+            for item in body["records"]:
+                target = item.get("id")
+                if target is None and merge_on:
+                    target = next(
+                        (
+                            r["id"] for r in self.stub.table(table_id).values()
+                            if all(r["fields"].get(f) == item["fields"].get(f) for f in merge_on)
+                        ),
+                        None
+                    )
+                record = self.stub.update(table_id, target, item["fields"]) if target else None
+                if record is None:
+                    if not merge_on:
+                        self._send_json(404, {"error": "NOT_FOUND"})
+                        return
+                    record = self.stub.create(table_id, item["fields"])
+                    created_ids.append(record["id"])
+                updated.append(record)
+
+            payload: Dict[str, Any] = {"records": updated}
+            if merge_on:
+                payload["createdRecords"] = created_ids
+                payload["updatedRecords"] = [r["id"] for r in updated if r["id"] not in created_ids]
+            self._send_json(200, payload)
+
+    def do_DELETE(self):
+        route = self._route()
+        if route is None:
+            return
+        table_id, record_id, query = route
+        with self.stub.lock:
+            if record_id:
+                self.stub.delete(table_id, record_id)
+                self._send_json(200, {"id": record_id, "deleted": True})
+                return
+
+            ids = query.get("records[]", [])
+            for rid in ids:
+                self.stub.delete(table_id, rid)
+            self._send_json(200, {"records": [{"id": rid, "deleted": True} for rid in ids]})
+
+
+def _serve_in_process(connection, host: str, port: int, stub_options: Dict[str, Any]):
+    with running_stub(host, port, **stub_options) as url:
+        connection.send(url)
+        connection.recv()
+
+
+@contextmanager
+def stub_process(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    **stub_options: Any
+) -> Iterator[str]:
+    """Run the stub in a child process and yield its API URL.
+
+    Keeps the stub's threads off the benchmark's GIL and out of its memory
+    measurements. ``factories`` must be picklable (module-level functions).
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(
+        target=_serve_in_process,
+        args=(child, host, port, stub_options),
+        daemon=True
+    )
+    process.start()
+    try:
+        yield parent.recv()
+    finally:
+        parent.send("stop")
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+
+@contextmanager
+def running_stub(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    **stub_options: Any
+) -> Iterator[str]:
+    """Run the stub in a background thread and yield its API URL."""
+    stub = StubAirtable(**stub_options)
+    handler = type("BoundStubHandler", (StubHandler,), {"stub": stub})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{httpd.server_address[1]}/v0"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--records", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="Per-request latency in seconds")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="Per-connection latency in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second per base before answering 429")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests failed at random")
+    parser.add_argument("--fail-status", type=int, default=429, choices=[429, 502, 503, 504])
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After header sent with failures")
+    args = parser.parse_args()
+
+    with running_stub(
+        args.host,
+        args.port,
+        records_per_table=args.records,
+        latency=args.latency,
+        connect_latency=args.connect_latency,
+        latency_jitter=args.latency_jitter,
+        rate_limit=args.rate_limit,
+        fail_rate=args.fail_rate,
+        fail_status=args.fail_status,
+        retry_after=args.retry_after
+    ) as url:
+        print(f"Airtable stub listening on {url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
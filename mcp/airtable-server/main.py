@@ -12,18 +12,46 @@ Tables supported:
 - PROFESSIONALS (tblIcANCLun1lb2Ap)
 """
 
+import argparse
 import asyncio
+import base64
+import bisect
+import csv
+import gzip
+import hashlib
+import hmac
+import importlib.util
+import json
 import logging
+import mimetypes
+import operator
 import os
-from typing import Any, Dict, List, Optional
-from datetime import datetime
+import random
+import re
+import sqlite3
+import time
+import weakref
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Deque, Dict, FrozenSet, Iterator, List, Literal, Optional,
+    Set, Tuple, Type, TypeVar
+)
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
 
 import httpx
-from mcp.server import Server
-from mcp.types import Tool, TextContent
 from pydantic import BaseModel, Field, validator
 from pydantic_settings import BaseSettings
 
+# mcp is only imported when the server starts (see create_server)
+if TYPE_CHECKING:
+    from mcp.server import Server
+    from mcp.types import TextContent, Tool
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +64,26 @@ logger = logging.getLogger("airtable-mcp")
 # CONFIGURATION
 # ============================================================================
 
+# Name of the base configured by AIRTABLE_BASE_ID / AIRTABLE_API_TOKEN
+DEFAULT_BASE = "default"
+
+
+class BaseConfig(BaseModel):
+    """One extra Airtable base, served next to the default one."""
+    base_id: str = Field(..., pattern=r"^app\w+$", description="Airtable base ID")
+    api_token: Optional[str] = Field(None, description="Token for this base (default: AIRTABLE_API_TOKEN)")
+    tables: Dict[str, str] = Field(
+        default={},
+        description="Table name -> table ID in this base (default: the table names, which Airtable also accepts)"
+    )
+    rate_limit_per_sec: Optional[int] = Field(
+        None,
+        ge=1,
+        le=10,
+        description="Requests per second to this base (default: AIRTABLE_RATE_LIMIT_PER_SEC)"
+    )
+
+
 class Settings(BaseSettings):
     """Airtable MCP Server configuration."""
 
@@ -48,18 +96,262 @@ class Settings(BaseSettings):
         default="https://api.airtable.com/v0",
         description="Airtable API base URL"
     )
+    content_url: str = Field(
+        default="https://content.airtable.com/v0",
+        description="Airtable content API URL, used for attachment uploads"
+    )
     rate_limit_per_sec: int = Field(
         default=5,
         ge=1,
         le=10,
         description="Rate limit (requests per second)"
     )
+    rate_limit_burst: int = Field(
+        default=1,
+        ge=1,
+        le=10,
+        description="Requests that may start back-to-back before throttling kicks in"
+    )
+    max_concurrent_requests: int = Field(
+        default=10,
+        ge=1,
+        le=50,
+        description="Maximum requests in flight at once (per base)"
+    )
+    priority_weights: Dict[str, float] = Field(
+        default={"interactive": 6.0, "normal": 3.0, "bulk": 1.0},
+        description="Share of the request budget each priority lane gets while others wait"
+    )
     request_timeout: int = Field(
         default=30,
         ge=5,
         le=120,
         description="Request timeout in seconds"
     )
+    max_retries: int = Field(
+        default=4,
+        ge=0,
+        le=10,
+        description="Maximum retries for 429/5xx responses and timeouts"
+    )
+    retry_backoff_base: float = Field(
+        default=0.5,
+        ge=0.05,
+        le=10,
+        description="Base delay in seconds for exponential backoff"
+    )
+    retry_backoff_max: float = Field(
+        default=8.0,
+        ge=0.1,
+        le=60,
+        description="Maximum backoff delay in seconds (before jitter)"
+    )
+    retry_budget: float = Field(
+        default=75.0,
+        ge=0,
+        le=300,
+        description="Maximum total seconds spent waiting on retries per request"
+    )
+    rate_limit_penalty: float = Field(
+        default=30.0,
+        ge=0,
+        le=120,
+        description="Seconds to back off after a 429 without Retry-After (Airtable penalty window)"
+    )
+    pool_max_connections: int = Field(
+        default=10,
+        ge=1,
+        le=100,
+        description="Maximum number of open connections in the HTTP pool"
+    )
+    pool_max_keepalive: int = Field(
+        default=5,
+        ge=0,
+        le=100,
+        description="Maximum number of idle keep-alive connections"
+    )
+    keepalive_expiry: float = Field(
+        default=30.0,
+        ge=0,
+        le=300,
+        description="Seconds an idle keep-alive connection stays open"
+    )
+    http2: bool = Field(
+        default=False,
+        description="Enable HTTP/2 (requires the optional 'h2' package)"
+    )
+    cache_enabled: bool = Field(
+        default=True,
+        description="Cache record reads in memory"
+    )
+    cache_max_entries: int = Field(
+        default=2000,
+        ge=1,
+        le=100000,
+        description="Maximum cached responses before least recently used are evicted"
+    )
+    cache_ttl: float = Field(
+        default=60.0,
+        ge=0,
+        le=3600,
+        description="Default cache TTL in seconds"
+    )
+    cache_table_ttls: Dict[str, float] = Field(
+        default={
+            "TENANTS": 300.0,
+            "RESIDENCES": 600.0,
+            "PROFESSIONALS": 300.0,
+            "TICKETS": 30.0,
+            "MESSAGES": 30.0,
+        },
+        description="Per-table cache TTL in seconds, by table name"
+    )
+    replica_enabled: bool = Field(
+        default=False,
+        description="Mirror the tables into a local SQLite replica and serve reads from it"
+    )
+    replica_path: str = Field(
+        default="airtable_replica.sqlite3",
+        description="SQLite file for the local replica"
+    )
+    replica_max_staleness: float = Field(
+        default=60.0,
+        ge=1,
+        le=86400,
+        description="Serve reads locally only if the table synced within this many seconds"
+    )
+    replica_sync_interval: float = Field(
+        default=30.0,
+        ge=1,
+        le=3600,
+        description="Seconds between incremental syncs"
+    )
+    replica_reconcile_interval: float = Field(
+        default=900.0,
+        ge=60,
+        le=86400,
+        description="Seconds between full ID scans that detect deleted records"
+    )
+    metrics_path: Optional[str] = Field(
+        default=None,
+        description="Periodically write metrics to this file in Prometheus text format (optional)"
+    )
+    metrics_format: Literal["prometheus", "openmetrics"] = Field(
+        default="prometheus",
+        description="Exposition format of the metrics file"
+    )
+    metrics_interval: float = Field(
+        default=15.0,
+        ge=1,
+        le=3600,
+        description="Seconds between metrics file writes"
+    )
+    trace_enabled: bool = Field(
+        default=False,
+        description="Log a structured JSON span for every tool call, limiter wait and HTTP request"
+    )
+    trace_path: Optional[str] = Field(
+        default=None,
+        description="Write trace spans to this JSONL file instead of the log"
+    )
+    export_dir: str = Field(
+        default="exports",
+        description="Directory export_table writes to"
+    )
+    write_behind_enabled: bool = Field(
+        default=False,
+        description="Buffer update_record calls and write them as merged, batched PATCHes"
+    )
+    write_behind_window: float = Field(
+        default=2.0,
+        gt=0,
+        le=60,
+        description="Seconds an update waits for more updates to the same record"
+    )
+    write_behind_journal: str = Field(
+        default="write_behind.jsonl",
+        description="Journal that makes buffered updates survive a crash"
+    )
+    schema_source: Literal["api", "file", "static"] = Field(
+        default="api",
+        description=(
+            "Where field definitions come from: the metadata API (cached to schema_path), "
+            "schema_path only, or the built-in definitions"
+        )
+    )
+    schema_path: str = Field(
+        default="schema.json",
+        description="Metadata API snapshot, read when the API is unavailable or schema_source is 'file'"
+    )
+    schema_refresh_interval: float = Field(
+        default=3600.0,
+        ge=0,
+        description="Seconds between schema reloads (0 loads it once at startup)"
+    )
+    schema_validation: bool = Field(
+        default=True,
+        description="Check write payloads against the schema before calling Airtable"
+    )
+    change_feed_max_hashes: int = Field(
+        default=100000,
+        ge=1000,
+        le=10000000,
+        description="Record content hashes kept to drop no-op changes from changes_since"
+    )
+    upload_concurrency: int = Field(
+        default=3,
+        ge=1,
+        le=10,
+        description="Files upload_attachment sends to Airtable at once"
+    )
+    upload_index_path: str = Field(
+        default="uploads.json",
+        description="SHA-256 index of uploaded files, so identical files are never uploaded twice"
+    )
+    transport: Literal["stdio", "http"] = Field(
+        default="stdio",
+        description="Serve one client over stdio, or many over streamable HTTP and SSE"
+    )
+    http_host: str = Field(
+        default="127.0.0.1",
+        description="Address the HTTP transport listens on"
+    )
+    http_port: int = Field(
+        default=8765,
+        ge=1,
+        le=65535,
+        description="Port the HTTP transport listens on"
+    )
+    http_auth_token: Optional[str] = Field(
+        default=None,
+        description="Bearer token HTTP clients must send (optional, recommended off localhost)"
+    )
+    http_max_calls_per_client: int = Field(
+        default=4,
+        ge=1,
+        le=50,
+        description="Tool calls one HTTP client session may run at once; the rest wait"
+    )
+    http_drain_timeout: float = Field(
+        default=30.0,
+        ge=0,
+        le=600,
+        description="Seconds shutdown waits for running tool calls to finish"
+    )
+    bases: Dict[str, BaseConfig] = Field(
+        default={},
+        description=(
+            "Extra bases by name, as JSON. Each has its own token, table IDs, connection pool "
+            "and rate limit, and tools select one with their 'base' argument"
+        )
+    )
+
+    @validator("bases")
+    def validate_base_names(cls, v):
+        for name in v:
+            if name == DEFAULT_BASE or not re.fullmatch(r"[A-Za-z0-9_-]+", name):
+                raise ValueError(f"Invalid base name {name!r}: use letters, digits, '-' or '_', and not '{DEFAULT_BASE}'")
+        return v
 
     class Config:
         env_file = ".env"
@@ -80,36 +372,154 @@ TABLES = {
     "MESSAGES": "tblvQrZVzdAaxb7Kr",
     "PROFESSIONALS": "tblIcANCLun1lb2Ap",
 }
+TABLE_NAMES = {table_id: name for name, table_id in TABLES.items()}
+# Shared by every tool schema and table check instead of rebuilt per call
+TABLE_CHOICES = list(TABLES)
+INVALID_TABLE = f"Invalid table. Must be one of: {', '.join(TABLE_CHOICES)}"
+# Advertised in the JSON schema of every table argument
+TABLE_ENUM = {"enum": TABLE_CHOICES}
+
+# Hot lookup fields, indexed in memory by the local replica
+INDEXED_FIELDS = {
+    "TENANTS": ["email"],
+    "TICKETS": ["tenant_email", "status", "unit"],
+    "PROFESSIONALS": ["email"],
+}
+
+# A small field present on every record, used to list IDs cheaply when
+# reconciling deletions in the local replica
+ID_SCAN_FIELDS = {
+    "TENANTS": "email",
+    "TICKETS": "title",
+    "RESIDENCES": "name",
+    "MESSAGES": "titre",
+    "PROFESSIONALS": "email",
+}
+
+# Linked-record fields and the table they point to. TENANTS.RESIDENCES
+# is a plain text field, not a link.
+LINKED_FIELDS = {
+    "TICKETS": {"PROFESSIONALS": "PROFESSIONALS"},
+    "TENANTS": {"TICKETS": "TICKETS"},
+    "RESIDENCES": {"TICKETS": "TICKETS"},
+    "MESSAGES": {"TENANTS": "TENANTS", "PROFESSIONALS": "PROFESSIONALS"},
+}
+LINK_FIELD_NAMES = {field for links in LINKED_FIELDS.values() for field in links}
+
+# Built-in field definitions from lib/types.ts, used until the metadata API
+# schema is loaded. "select" fields list their options; "computed" fields
+# (lookups) are calculated by Airtable and can't be written.
+FIELD_SCHEMAS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "TENANTS": {
+        "email": {"id": "fldg4xlUQGWAMa1vq", "type": "email"},
+        "password_hash": {"id": "fld1BkzQo0EqKUMVM", "type": "text"},
+        "unit": {"id": "fld9QHC92B3G3mEWn", "type": "text"},
+        "phone": {"id": "fldV1nK2VzfncFWIa", "type": "text"},
+        "first_name": {"id": "fldCjf3UHzuXYax8B", "type": "text"},
+        "last_name": {"id": "fldsGDRvealJ3yZdR", "type": "text"},
+        "residence_name": {"id": "fldEKoG8PUyQLCC37", "type": "text"},
+        "message": {"id": "fldblRxAfc11wuqdq", "type": "text"},
+        "status": {"id": "fldK0XdnyBXTOkVfc", "type": "select", "options": ("active", "inactive")},
+        "created_at": {"id": "fldqd2KQ55XMKnF3R", "type": "datetime"},
+        "TICKETS": {"id": "fldoZAS0voQTlMBvx", "type": "links"},
+        "RESIDENCES": {"id": "fldXLbic4x3dGUQrL", "type": "text"},
+    },
+    "PROFESSIONALS": {
+        "email": {"id": "fldqgHmvZ7OFLCiBb", "type": "email"},
+        "password_hash": {"id": "fldk8Bk0F35G8I8jx", "type": "text"},
+        "name": {"id": "fldLZ9GvZ3MvLNUyP", "type": "text"},
+        "type": {
+            "id": "fldNbHwBSYIaUON0b",
+            "type": "select",
+            "options": ("plumber", "electrician", "concierge", "agency")
+        },
+        "phone": {"id": "fldRilhbZ3K92MnN8", "type": "text"},
+        "agency_email": {"id": "fldVubvDazWwArvo9", "type": "email"},
+        "specialties": {"id": "fldNNWbU6lWIfx4Gt", "type": "text"},
+        "created_at": {"id": "fldCZ6frTyuEBy0v3", "type": "datetime"},
+    },
+    "TICKETS": {
+        "title": {"id": "fld51ebPXV9129Tof", "type": "text"},
+        "description": {"id": "fldSs15cz93JSy6zO", "type": "text"},
+        "category": {
+            "id": "fldx8DUYFYylqMyq1",
+            "type": "select",
+            "options": ("plomberie", "électricité", "concierge", "autre")
+        },
+        "status": {
+            "id": "fldT3OYmpscavHWgC",
+            "type": "select",
+            "options": ("open", "assigned", "in_progress", "resolved", "closed")
+        },
+        "priority": {"id": "fldx5UszT8duxQZyY", "type": "select", "options": ("low", "medium", "high", "urgent")},
+        "tenant_email": {"id": "fldZGRcdiXnoNS5OL", "type": "email"},
+        "unit": {"id": "fldRj1kcmJSu4nQQ2", "type": "text"},
+        "PROFESSIONALS": {"id": "fldoNCHrRuh6zgzax", "type": "links"},
+        "email (from PROFESSIONALS)": {"id": "fldPpPm5WQaw4JMzc", "type": "computed"},
+        "assigned_to": {"id": "fld3bfcdn71PUNPZI", "type": "text"},
+        "name": {"id": "fld1jLo386MlJgxZr", "type": "text"},
+        "created_at": {"id": "fldDIUilSLOXpLuec", "type": "datetime"},
+        "updated_at": {"id": "fldwa2gEGI645x9FC", "type": "datetime"},
+        "resolved_at": {"id": "flddYiLBPnCYtBClV", "type": "datetime"},
+        "resolution_notes": {"id": "fldOWkLenvlefCm7Q", "type": "text"},
+        "images_urls": {"id": "flduOSxLcMx3dXktM", "type": "text"},
+        "invoice_url": {"id": "fldoOAr0BjGA947U7", "type": "text"},
+    },
+    "RESIDENCES": {
+        "name": {"id": "fldSlMmH9nIEOMd4K", "type": "text"},
+        "address": {"id": "fldIM3LhtmNsOZfmS", "type": "text"},
+        "agency_email": {"id": "fldyD0amh4QP5ZUTG", "type": "email"},
+        "total_units": {"id": "fldSruKcnTtimCD39", "type": "number"},
+        "created_at": {"id": "fldCezs14akLI82ot", "type": "datetime"},
+        "TICKETS": {"id": "fldBirnOJrr1ivjUW", "type": "links"},
+    },
+    "MESSAGES": {
+        "titre": {"id": "fldgHiPzTjNpqYOGW", "type": "text"},
+        "message": {"id": "flddnEGi0vpj3tGR3", "type": "text"},
+        "categorie": {
+            "id": "fldpEomz71o8ClGvr",
+            "type": "select",
+            "options": ("intervention", "evenement", "general")
+        },
+        "created_at": {"id": "fldVALw6rlBn1yMae", "type": "datetime"},
+        # lib/types.ts addresses these by name; their IDs come from the metadata API
+        "TENANTS": {"id": None, "type": "links"},
+        "PROFESSIONALS": {"id": None, "type": "links"},
+        "email (from TENANTS)": {"id": None, "type": "computed"},
+    },
+}
+
+# Fields a new record must have
+REQUIRED_FIELDS = {
+    "TENANTS": ("email", "first_name", "last_name", "unit"),
+    "PROFESSIONALS": ("email", "name", "type"),
+    "TICKETS": ("title", "description", "category", "tenant_email", "unit"),
+    "RESIDENCES": ("name", "address"),
+    "MESSAGES": ("titre", "message", "categorie"),
+}
 
 
 # ============================================================================
 # PYDANTIC MODELS FOR VALIDATION
 # ============================================================================
 
-class ListRecordsInput(BaseModel):
-    """Input for list_records tool."""
-    table: str = Field(..., description="Table name (TENANTS, TICKETS, etc.)")
-    view: Optional[str] = Field(None, description="View name (optional)")
-    max_records: int = Field(default=100, ge=1, le=100, description="Max records to return")
+class TableInput(BaseModel):
+    """Base for tool inputs that name a table."""
+    table: str = Field(..., description="Table name", json_schema_extra=TABLE_ENUM)
 
+    # Declared once here and inherited, so subclasses only add their own fields.
+    # Subclasses that make the table optional redeclare it with a None default.
     @validator("table")
     def validate_table(cls, v):
-        if v not in TABLES:
-            raise ValueError(f"Invalid table. Must be one of: {', '.join(TABLES.keys())}")
+        if v is not None and v not in TABLES:
+            raise ValueError(INVALID_TABLE)
         return v
 
 
-class GetRecordInput(BaseModel):
-    """Input for get_record tool."""
-    table: str = Field(..., description="Table name")
+class RecordInput(TableInput):
+    """Base for tool inputs that address one record."""
     record_id: str = Field(..., min_length=1, description="Airtable record ID (starts with 'rec')")
 
-    @validator("table")
-    def validate_table(cls, v):
-        if v not in TABLES:
-            raise ValueError(f"Invalid table. Must be one of: {', '.join(TABLES.keys())}")
-        return v
-
     @validator("record_id")
     def validate_record_id(cls, v):
         if not v.startswith("rec"):
@@ -117,478 +527,5284 @@ class GetRecordInput(BaseModel):
         return v
 
 
-class SearchRecordsInput(BaseModel):
-    """Input for search_records tool."""
-    table: str = Field(..., description="Table name")
-    filter_formula: str = Field(..., min_length=1, description="Airtable filter formula")
-    max_records: int = Field(default=100, ge=1, le=100)
+class OutputInput(TableInput):
+    """Base for tools that render records or rows: output format."""
+    output: Literal["text", "json", "table"] = Field(
+        default="text",
+        description="Output format: text (readable), json (compact) or table (tab-separated columns)"
+    )
 
-    @validator("table")
-    def validate_table(cls, v):
-        if v not in TABLES:
-            raise ValueError(f"Invalid table. Must be one of: {', '.join(TABLES.keys())}")
-        return v
 
+class CacheInput(TableInput):
+    """Base for tools that read through the cache and replica."""
+    no_cache: bool = Field(default=False, description="Bypass the read cache and fetch fresh data from Airtable")
 
-class CreateRecordInput(BaseModel):
-    """Input for create_record tool."""
-    table: str = Field(..., description="Table name")
-    fields: Dict[str, Any] = Field(..., description="Record fields as JSON object")
 
-    @validator("table")
-    def validate_table(cls, v):
-        if v not in TABLES:
-            raise ValueError(f"Invalid table. Must be one of: {', '.join(TABLES.keys())}")
+class ProjectionInput(OutputInput):
+    """Base for tools returning records: output format and field projection."""
+    fields: Optional[List[str]] = Field(None, min_length=1, description="Only return these fields")
+
+    @validator("fields")
+    def translate_fields(cls, v, values):
+        # fld IDs from the Next.js app are accepted as well as names
+        return schema.field_names(values["table"], v) if "table" in values else v
+
+
+class ReadInput(ProjectionInput, CacheInput):
+    """Base for read tools: cache bypass and link expansion on top of projection."""
+    expand: List[str] = Field(
+        default=[],
+        description=(
+            "Linked-record fields to replace with the linked records, "
+            "fetched in batches (e.g. PROFESSIONALS on TICKETS)"
+        ),
+        json_schema_extra={"items": {"type": "string", "enum": sorted(LINK_FIELD_NAMES)}}
+    )
+    expand_depth: int = Field(default=1, ge=1, le=3, description="How many levels of links to inline")
+
+    @validator("expand")
+    def validate_expand(cls, v):
+        unknown = sorted(set(v) - LINK_FIELD_NAMES)
+        if unknown:
+            raise ValueError(f"Not a linked-record field: {', '.join(unknown)}")
         return v
 
 
-class UpdateRecordInput(BaseModel):
+class ListRecordsInput(ReadInput):
+    """Input for list_records tool."""
+    view: Optional[str] = Field(None, description="View name (optional)")
+    max_records: int = Field(
+        default=100, ge=1, le=1000, description="Maximum number of records (fetched page by page)"
+    )
+    page_size: int = Field(default=100, ge=1, le=100, description="Records per Airtable page")
+    cursor: Optional[str] = Field(None, description="Cursor from a previous call to continue where it stopped")
+
+
+class GetRecordInput(RecordInput, ReadInput):
+    """Input for get_record tool."""
+    # Airtable's single-record endpoint has no fields[]
+    fields: Optional[List[str]] = Field(
+        None,
+        min_length=1,
+        description="Only return these fields (the record is fetched whole, then trimmed)"
+    )
+
+
+class SearchRecordsInput(ReadInput):
+    """Input for search_records tool."""
+    filter_formula: str = Field(
+        ..., min_length=1, description="Airtable filter formula (use field names in curly braces)"
+    )
+    max_records: int = Field(
+        default=100, ge=1, le=1000, description="Maximum records to return (fetched page by page)"
+    )
+    page_size: int = Field(default=100, ge=1, le=100, description="Records per Airtable page")
+    cursor: Optional[str] = Field(
+        None, description="Cursor from a previous call with the same formula to continue where it stopped"
+    )
+
+
+class CreateRecordInput(TableInput):
+    """Input for create_record tool."""
+    fields: Dict[str, Any] = Field(..., description="Record fields as key-value pairs")
+
+
+class UpdateRecordInput(RecordInput):
     """Input for update_record tool."""
-    table: str = Field(..., description="Table name")
-    record_id: str = Field(..., description="Record ID")
     fields: Dict[str, Any] = Field(..., description="Fields to update")
+    wait: bool = Field(
+        default=False,
+        description=(
+            "In write-behind mode, write now (with any buffered updates to this record) "
+            "and return the updated record"
+        )
+    )
 
-    @validator("table")
-    def validate_table(cls, v):
-        if v not in TABLES:
-            raise ValueError(f"Invalid table. Must be one of: {', '.join(TABLES.keys())}")
-        return v
 
-    @validator("record_id")
-    def validate_record_id(cls, v):
-        if not v.startswith("rec"):
-            raise ValueError("Record ID must start with 'rec'")
-        return v
+class FlushInput(TableInput):
+    """Input for flush tool."""
+    table: Optional[str] = Field(None, description="Only flush updates to this table", json_schema_extra=TABLE_ENUM)
 
 
-class DeleteRecordInput(BaseModel):
+class DeleteRecordInput(RecordInput):
     """Input for delete_record tool."""
-    table: str = Field(..., description="Table name")
-    record_id: str = Field(..., description="Record ID")
 
-    @validator("table")
-    def validate_table(cls, v):
-        if v not in TABLES:
-            raise ValueError(f"Invalid table. Must be one of: {', '.join(TABLES.keys())}")
-        return v
 
-    @validator("record_id")
+class BatchCreateRecordsInput(TableInput):
+    """Input for batch_create_records tool."""
+    records: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="List of record field objects"
+    )
+    typecast: bool = Field(default=False, description="Let Airtable convert string values to the field type")
+
+
+class BatchRecordUpdate(BaseModel):
+    """One record in a batch_update_records call."""
+    id: Optional[str] = Field(None, description="Record ID (optional when upserting)")
+    fields: Dict[str, Any] = Field(..., description="Fields to update")
+
+    @validator("id")
     def validate_record_id(cls, v):
-        if not v.startswith("rec"):
+        if v is not None and not v.startswith("rec"):
             raise ValueError("Record ID must start with 'rec'")
         return v
 
 
-# ============================================================================
-# AIRTABLE CLIENT
-# ============================================================================
+class BatchUpdateRecordsInput(TableInput):
+    """Input for batch_update_records tool."""
+    records: List[BatchRecordUpdate] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Records as {id, fields} objects. 'id' is optional when upserting"
+    )
+    fields_to_merge_on: Optional[List[str]] = Field(
+        None,
+        min_length=1,
+        max_length=3,
+        description="Upsert: match existing records on these fields, creating unmatched ones"
+    )
+    typecast: bool = Field(default=False, description="Let Airtable convert string values to the field type")
 
-class AirtableClient:
-    """Async Airtable API client with rate limiting and error handling."""
+    @validator("fields_to_merge_on", always=True)
+    def validate_ids_or_upsert(cls, v, values):
+        if v is None and any(r.id is None for r in values.get("records", [])):
+            raise ValueError("Every record needs an 'id' unless fields_to_merge_on is set")
+        return v
 
-    def __init__(self):
-        self.base_url = f"{settings.airtable_api_url}/{settings.airtable_base_id}"
-        self.headers = {
-            "Authorization": f"Bearer {settings.airtable_api_token}",
-            "Content-Type": "application/json"
-        }
-        self.semaphore = asyncio.Semaphore(settings.rate_limit_per_sec)
-        self.last_request_time = 0
 
-    async def _rate_limit(self):
-        """Implement rate limiting."""
-        async with self.semaphore:
-            # Ensure minimum time between requests
-            current_time = asyncio.get_event_loop().time()
-            time_since_last = current_time - self.last_request_time
-            min_interval = 1.0 / settings.rate_limit_per_sec
+class BatchDeleteRecordsInput(TableInput):
+    """Input for batch_delete_records tool."""
+    record_ids: List[str] = Field(..., min_length=1, max_length=1000, description="Record IDs to delete")
 
-            if time_since_last < min_interval:
-                await asyncio.sleep(min_interval - time_since_last)
+    @validator("record_ids")
+    def validate_record_ids(cls, v):
+        for record_id in v:
+            if not record_id.startswith("rec"):
+                raise ValueError(f"Record ID must start with 'rec': {record_id}")
+        return v
 
-            self.last_request_time = asyncio.get_event_loop().time()
 
-    async def _request(
-        self,
-        method: str,
-        endpoint: str,
-        **kwargs
-    ) -> Dict[str, Any]:
-        """Make HTTP request with rate limiting and error handling."""
-        await self._rate_limit()
+class LookupByFieldInput(ReadInput):
+    """Input for lookup_by_field tool."""
+    field: str = Field(
+        ..., min_length=1, description="Field name or ID (e.g. email, tenant_email, status, unit)"
+    )
+    value: str = Field(..., min_length=1, description="Exact value to match (case-sensitive)")
+    max_records: int = Field(default=100, ge=1, le=1000, description="Maximum records to return")
+    cursor: Optional[str] = Field(None, description="Cursor from a previous call to continue where it stopped")
 
-        url = f"{self.base_url}/{endpoint}"
+    @validator("field", always=True)
+    def validate_field(cls, v, values):
+        if "{" in v or "}" in v:
+            raise ValueError("Field name cannot contain curly braces")
+        if "table" not in values:
+            return v
+        name = schema.field_name(values["table"], v)
+        if schema.authoritative and name not in schema.tables.get(values["table"], {}):
+            raise ValueError(f"Unknown field '{v}' in {values['table']}")
+        return name
 
-        try:
-            async with httpx.AsyncClient(timeout=settings.request_timeout) as client:
-                response = await client.request(
-                    method,
-                    url,
-                    headers=self.headers,
-                    **kwargs
-                )
-                response.raise_for_status()
-                return response.json()
 
-        except httpx.TimeoutException as e:
-            logger.error(f"Request timeout: {url}")
-            raise TimeoutError(f"Request timed out after {settings.request_timeout}s")
+class AggregateMetric(BaseModel):
+    """One metric of an aggregate_records call."""
+    op: Literal["count", "sum", "min", "max", "avg"] = Field(..., description="Aggregation")
+    field: Optional[str] = Field(None, description="Field to aggregate (omit for a plain record count)")
 
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
+    @validator("field", always=True)
+    def validate_field(cls, v, values):
+        if v is None and values.get("op") not in (None, "count"):
+            raise ValueError(f"'{values.get('op')}' needs a field")
+        return v
 
-            if e.response.status_code == 429:
-                raise Exception("Rate limit exceeded. Please wait before retrying.")
-            elif e.response.status_code == 401:
-                raise Exception("Unauthorized. Check your Airtable API token.")
-            elif e.response.status_code == 404:
-                raise Exception("Record or table not found.")
-            else:
-                raise Exception(f"Airtable API error: {e.response.text}")
 
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            raise
+class AggregateRecordsInput(OutputInput, CacheInput):
+    """Input for aggregate_records tool."""
+    filter_formula: Optional[str] = Field(None, description="Airtable filter formula (optional)")
+    view: Optional[str] = Field(None, description="View name (optional)")
+    group_by: List[str] = Field(default=[], max_length=5, description="Fields to group by")
+    metrics: List[AggregateMetric] = Field(
+        default=[AggregateMetric(op="count")],
+        min_length=1,
+        max_length=10,
+        description="Metrics to compute per group (default: count)"
+    )
 
-    async def list_records(
-        self,
-        table_id: str,
-        view: Optional[str] = None,
-        max_records: int = 100
-    ) -> List[Dict[str, Any]]:
-        """List records from a table."""
-        params = {"maxRecords": max_records}
-        if view:
-            params["view"] = view
 
-        data = await self._request("GET", table_id, params=params)
-        return data.get("records", [])
+class ChangesSinceInput(ProjectionInput):
+    """Input for changes_since tool."""
+    since: Optional[str] = Field(
+        None,
+        min_length=1,
+        description=(
+            "ISO 8601 timestamp (e.g. 2025-11-26T10:00:00Z) or the cursor returned by the "
+            "previous call. Omit to start watching from now"
+        )
+    )
+    max_records: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Maximum changed records to scan per call; the cursor continues the scan"
+    )
+    fields: Optional[List[str]] = Field(
+        None,
+        min_length=1,
+        description="Only return these fields; changes to other fields are ignored"
+    )
 
-    async def get_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
-        """Get a single record by ID."""
-        data = await self._request("GET", f"{table_id}/{record_id}")
-        return data
 
-    async def search_records(
-        self,
-        table_id: str,
-        filter_formula: str,
-        max_records: int = 100
-    ) -> List[Dict[str, Any]]:
-        """Search records using Airtable filter formula."""
-        params = {
-            "filterByFormula": filter_formula,
-            "maxRecords": max_records
-        }
+class SyncStatusInput(TableInput):
+    """Input for sync_status tool."""
+    table: Optional[str] = Field(None, description="Table name (default: all tables)", json_schema_extra=TABLE_ENUM)
+    refresh: bool = Field(default=False, description="Run an incremental sync before reporting")
 
-        data = await self._request("GET", table_id, params=params)
-        return data.get("records", [])
 
-    async def create_record(
-        self,
-        table_id: str,
-        fields: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Create a new record."""
-        json_data = {"fields": fields}
-        data = await self._request("POST", table_id, json=json_data)
-        return data
+class ExportTableInput(TableInput):
+    """Input for export_table tool."""
+    table: Optional[str] = Field(
+        None, description="Table name (default: all tables, exported concurrently)", json_schema_extra=TABLE_ENUM
+    )
+    format: Literal["ndjson", "ndjson.gz", "parquet"] = Field(
+        default="ndjson.gz", description="ndjson, ndjson.gz or parquet (needs pyarrow)"
+    )
+    directory: Optional[str] = Field(
+        None, description="Output directory on the server (default: AIRTABLE_EXPORT_DIR)"
+    )
+    fields: Optional[List[str]] = Field(None, min_length=1, description="Only export these fields")
+    restart: bool = Field(default=False, description="Ignore any checkpoint and export from scratch")
 
-    async def update_record(
-        self,
-        table_id: str,
-        record_id: str,
-        fields: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Update an existing record."""
-        json_data = {"fields": fields}
-        data = await self._request("PATCH", f"{table_id}/{record_id}", json=json_data)
-        return data
 
-    async def delete_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
-        """Delete a record."""
-        data = await self._request("DELETE", f"{table_id}/{record_id}")
-        return data
+class ImportRecordsInput(TableInput):
+    """Input for import_records tool."""
+    path: str = Field(
+        ...,
+        description=(
+            "File on the server: .csv, .ndjson or .jsonl, optionally .gz. NDJSON lines are "
+            "field objects or Airtable records ({\"fields\": {...}}, as written by export_table)"
+        )
+    )
+    format: Optional[Literal["csv", "ndjson"]] = Field(None, description="File format (default: from the extension)")
+    dry_run: bool = Field(default=False, description="Validate every row and report errors without writing")
+    typecast: bool = Field(
+        default=False, description="Let Airtable convert values and create missing select options"
+    )
+    merge_on: Optional[List[str]] = Field(
+        None,
+        min_length=1,
+        max_length=3,
+        description="Upsert on these fields (e.g. [\"email\"]) so re-running an import never duplicates"
+    )
+    restart: bool = Field(default=False, description="Ignore any checkpoint and import from the first row")
 
 
-# ============================================================================
-# MCP SERVER & TOOLS
-# ============================================================================
+class UploadAttachmentInput(RecordInput):
+    """Input for upload_attachment tool."""
+    table: str = Field(default="TICKETS", description="Table name", json_schema_extra=TABLE_ENUM)
+    field: str = Field(
+        default="images_urls",
+        description="Attachment field, or text/URL field storing comma-separated URLs (name or fld ID)"
+    )
+    paths: List[str] = Field(..., min_length=1, max_length=20, description="Paths of the files on the server")
+    replace: bool = Field(default=False, description="Replace the field's current files instead of appending")
 
-# Initialize server and client
-server = Server("airtable-mcp")
-airtable = AirtableClient()
+    @validator("field", always=True)
+    def validate_field(cls, v, values):
+        if "table" not in values:
+            return v
+        name = schema.field_name(values["table"], v)
+        spec = schema.tables.get(values["table"], {}).get(name)
+        if spec is None or spec["type"] not in UPLOAD_FIELD_TYPES:
+            raise ValueError(f"{values['table']}.{name} is not an attachment, text or URL field")
+        return name
 
 
-def format_record(record: Dict[str, Any]) -> str:
-    """Format a record for display."""
-    record_id = record.get("id", "N/A")
-    fields = record.get("fields", {})
-    created_time = record.get("createdTime", "N/A")
+class DescribeTableInput(TableInput):
+    """Input for describe_table tool."""
+    table: Optional[str] = Field(None, description="Table name (default: all tables)", json_schema_extra=TABLE_ENUM)
+    refresh: bool = Field(default=False, description="Reload the schema before describing it")
 
-    lines = [
-        f"Record ID: {record_id}",
-        f"Created: {created_time}",
-        "Fields:"
-    ]
 
-    for key, value in fields.items():
-        lines.append(f"  • {key}: {value}")
+class ServerStatsInput(BaseModel):
+    """Input for server_stats tool."""
+    output: Literal["text", "prometheus", "openmetrics"] = Field(
+        default="text",
+        description="text (summary), or prometheus/openmetrics for the raw histograms"
+    )
 
-    return "\n".join(lines)
 
+def _flatten_schema(node: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    if "$ref" in node:
+        return _flatten_schema(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+    variants = node.get("anyOf", [])
+    if len(variants) == 2 and {"type": "null"} in variants:
+        # Optional[X]: clients leave the argument out rather than send null
+        [inner] = [variant for variant in variants if variant != {"type": "null"}]
+        node = {key: value for key, value in node.items() if key != "anyOf" and (key, value) != ("default", None)}
+        node = {**inner, **node}
 
-def format_records(records: List[Dict[str, Any]]) -> str:
-    """Format multiple records for display."""
-    if not records:
-        return "No records found."
+    flat = {}
+    for key, value in node.items():
+        if key in ("title", "$defs"):
+            continue
+        if key == "properties":
+            value = {name: _flatten_schema(prop, defs) for name, prop in value.items()}
+        elif key == "items":
+            value = _flatten_schema(value, defs)
+        flat[key] = value
+    return flat
 
-    lines = [f"Found {len(records)} record(s):\n"]
 
-    for i, record in enumerate(records, 1):
-        lines.append(f"--- Record {i} ---")
-        lines.append(format_record(record))
-        lines.append("")
+def tool_input_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """The JSON schema a tool advertises, generated from its input model.
 
-    return "\n".join(lines)
+    Nested models are inlined and titles dropped, so clients get the same
+    flat schemas a hand-written definition would give them. The model's
+    docstring is left out: the tool has its own description.
+    """
+    generated = model.model_json_schema()
+    generated.pop("description", None)
+    return _flatten_schema(generated, generated.get("$defs", {}))
 
 
-@server.list_tools()
-async def list_tools() -> List[Tool]:
-    """List available MCP tools."""
-    return [
-        Tool(
-            name="list_records",
-            description="List records from an Airtable table with optional view and limit",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "table": {
-                        "type": "string",
-                        "description": "Table name (TENANTS, TICKETS, RESIDENCES, MESSAGES, PROFESSIONALS)",
-                        "enum": list(TABLES.keys())
-                    },
-                    "view": {
-                        "type": "string",
-                        "description": "Optional view name"
-                    },
-                    "max_records": {
-                        "type": "integer",
-                        "description": "Maximum number of records (1-100)",
-                        "default": 100,
-                        "minimum": 1,
-                        "maximum": 100
-                    }
-                },
-                "required": ["table"]
-            }
-        ),
-        Tool(
-            name="get_record",
-            description="Get a specific record by ID from an Airtable table",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "table": {
-                        "type": "string",
-                        "description": "Table name",
-                        "enum": list(TABLES.keys())
-                    },
-                    "record_id": {
-                        "type": "string",
-                        "description": "Airtable record ID (starts with 'rec')"
-                    }
-                },
-                "required": ["table", "record_id"]
-            }
-        ),
-        Tool(
-            name="search_records",
-            description="Search records using Airtable filter formula (e.g., \"{email}='test@example.com'\")",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "table": {
-                        "type": "string",
-                        "description": "Table name",
-                        "enum": list(TABLES.keys())
-                    },
-                    "filter_formula": {
-                        "type": "string",
-                        "description": "Airtable filter formula (use field names in curly braces)"
-                    },
-                    "max_records": {
-                        "type": "integer",
-                        "description": "Maximum records to return",
-                        "default": 100,
-                        "minimum": 1,
-                        "maximum": 100
-                    }
-                },
-                "required": ["table", "filter_formula"]
-            }
-        ),
-        Tool(
-            name="create_record",
-            description="Create a new record in an Airtable table",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "table": {
-                        "type": "string",
-                        "description": "Table name",
-                        "enum": list(TABLES.keys())
-                    },
-                    "fields": {
-                        "type": "object",
-                        "description": "Record fields as key-value pairs"
-                    }
-                },
-                "required": ["table", "fields"]
-            }
-        ),
-        Tool(
-            name="update_record",
-            description="Update an existing record in an Airtable table",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "table": {
-                        "type": "string",
-                        "description": "Table name",
-                        "enum": list(TABLES.keys())
-                    },
-                    "record_id": {
-                        "type": "string",
-                        "description": "Record ID to update"
-                    },
-                    "fields": {
-                        "type": "object",
-                        "description": "Fields to update"
-                    }
-                },
-                "required": ["table", "record_id", "fields"]
-            }
-        ),
-        Tool(
-            name="delete_record",
-            description="Delete a record from an Airtable table",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "table": {
-                        "type": "string",
-                        "description": "Table name",
-                        "enum": list(TABLES.keys())
-                    },
-                    "record_id": {
-                        "type": "string",
-                        "description": "Record ID to delete"
-                    }
-                },
-                "required": ["table", "record_id"]
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10)
+
+# name -> (help text, buckets)
+METRIC_DEFINITIONS = {
+    "mcp_tool_duration_seconds": ("Total time to answer a tool call", LATENCY_BUCKETS),
+    "mcp_tool_validation_seconds": ("Time spent validating tool arguments", LATENCY_BUCKETS),
+    "mcp_tool_format_seconds": ("Time spent formatting tool output", LATENCY_BUCKETS),
+    "mcp_tool_response_bytes": ("Size of tool responses", SIZE_BUCKETS),
+    "airtable_limiter_wait_seconds": ("Time Airtable requests waited for the rate limiter", LATENCY_BUCKETS),
+    "airtable_http_seconds": ("Airtable HTTP round-trip time", LATENCY_BUCKETS),
+    "airtable_response_bytes": ("Size of Airtable response bodies", SIZE_BUCKETS),
+    "airtable_request_retries": ("Retries per Airtable request", COUNT_BUCKETS),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram, as exposed by Prometheus."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # One count per bucket, plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: "Histogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, **extra: str) -> str:
+    pairs = [*key, *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """Labelled histograms for every metric in METRIC_DEFINITIONS."""
+
+    def __init__(self):
+        self.series: Dict[str, Dict[LabelKey, Histogram]] = {name: {} for name in METRIC_DEFINITIONS}
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        histogram = self.series[name].get(key)
+        if histogram is None:
+            histogram = Histogram(METRIC_DEFINITIONS[name][1])
+            self.series[name][key] = histogram
+        histogram.observe(value)
+
+    def by_label(self, name: str, label: str) -> Dict[str, Histogram]:
+        """Merge a metric's series into one histogram per value of ``label``."""
+        merged: Dict[str, Histogram] = {}
+        for key, histogram in self.series[name].items():
+            value = dict(key).get(label, "")
+            if value not in merged:
+                merged[value] = Histogram(histogram.buckets)
+            merged[value].merge(histogram)
+        return merged
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Render every series in Prometheus text (or OpenMetrics) format."""
+        lines = []
+        for name, (help_text, _) in METRIC_DEFINITIONS.items():
+            series = self.series[name]
+            if not series:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for key, histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, n in zip([*histogram.buckets, "+Inf"], histogram.counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_format_labels(key, le=str(bound))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, openmetrics: bool = False):
+        """Atomically replace ``path`` with the current metrics."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render(openmetrics))
+        os.replace(tmp_path, path)
+
+
+metrics_registry = MetricsRegistry()
+trace_logger = logging.getLogger("airtable-mcp.trace")
+
+
+class CallTrace:
+    """Timings of one tool call, shared by everything it awaits.
+
+    Phases (validation, limiter_wait, http, format) accumulate across every
+    Airtable request the call makes, so the log line and root span show
+    where the time went.
+    """
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.trace_id = os.urandom(8).hex()
+        self.span_id = os.urandom(4).hex()
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.phases: Dict[str, float] = {"validation": 0.0, "limiter_wait": 0.0, "http": 0.0, "format": 0.0}
+        self.requests = 0
+        self.retries = 0
+
+    def finish(self, contents: List[Any]):
+        """Record the call's metrics and emit its root span."""
+        duration = time.perf_counter() - self.started
+        size = sum(len(content.text.encode("utf-8")) for content in contents)
+        status = "error" if any(content.text.startswith("❌") for content in contents) else "ok"
+
+        metrics_registry.observe("mcp_tool_duration_seconds", duration, tool=self.tool, status=status)
+        metrics_registry.observe("mcp_tool_validation_seconds", self.phases["validation"], tool=self.tool)
+        metrics_registry.observe("mcp_tool_format_seconds", self.phases["format"], tool=self.tool)
+        metrics_registry.observe("mcp_tool_response_bytes", size, tool=self.tool)
+
+        logger.info(
+            f"{self.tool} took {duration * 1000:.0f}ms: {self.requests} request(s), "
+            f"limiter {self.phases['limiter_wait'] * 1000:.0f}ms, http {self.phases['http'] * 1000:.0f}ms, "
+            f"format {self.phases['format'] * 1000:.1f}ms, {size} bytes"
+        )
+        emit_span(
+            "tool",
+            self.started_at,
+            duration,
+            root=True,
+            tool=self.tool,
+            status=status,
+            response_bytes=size,
+            requests=self.requests,
+            retries=self.retries,
+            **{f"{phase}_ms": round(seconds * 1000, 3) for phase, seconds in self.phases.items()}
+        )
+
+
+# Tool call being served; None for background work such as replica syncs
+current_trace: ContextVar[Optional[CallTrace]] = ContextVar("current_trace", default=None)
+
+
+def emit_span(name: str, started_at: float, duration: float, root: bool = False, **attributes: Any):
+    """Log one structured span of the current tool call (if tracing is on)."""
+    if not settings.trace_enabled:
+        return
+    trace = current_trace.get()
+    span = {
+        "trace_id": trace.trace_id if trace else None,
+        "span_id": trace.span_id if root and trace else os.urandom(4).hex(),
+        "parent_id": trace.span_id if trace and not root else None,
+        "name": name,
+        "start": datetime.fromtimestamp(started_at, timezone.utc).isoformat(),
+        "duration_ms": round(duration * 1000, 3),
+        **attributes
+    }
+    trace_logger.info(json.dumps(span, ensure_ascii=False, default=str))
+
+
+def record_phase(phase: str, seconds: float):
+    """Add time to a phase of the current tool call."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.phases[phase] += seconds
+
+
+def traced_phase(phase: str):
+    """Decorator timing a synchronous function as a phase of the tool call."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started_at = time.time()
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                record_phase(phase, elapsed)
+                emit_span(phase, started_at, elapsed, function=fn.__name__)
+        return wrapper
+    return decorator
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@traced_phase("validation")
+def validate_input(model: Type[ModelT], arguments: Dict[str, Any]) -> ModelT:
+    """Validate tool arguments against their input model."""
+    return model(**arguments)
+
+
+def configure_tracing():
+    """Send trace spans to ``trace_path`` as bare JSON lines, if set."""
+    if settings.trace_enabled and settings.trace_path:
+        handler = logging.FileHandler(settings.trace_path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        trace_logger.addHandler(handler)
+        trace_logger.propagate = False
+
+
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+
+PRIORITY_LANES = ("interactive", "normal", "bulk")
+
+# Priority lane of the tool call being served; read by RateLimiter.slot()
+request_priority: ContextVar[str] = ContextVar("request_priority", default="normal")
+
+
+class RateLimiter:
+    """Async token-bucket rate limiter with an in-flight cap and priority lanes.
+
+    Tokens refill continuously at ``rate`` per second up to ``burst``, and at
+    most ``max_in_flight`` requests may hold a slot at the same time. A
+    request that finds a token and a free slot with nobody queued starts
+    right away. Otherwise it waits in its priority lane, and a single
+    dispatcher hands out tokens and slots by weighted fair queuing: each
+    grant advances the lane's virtual time by ``1 / weight`` and the waiting
+    lane that would finish first goes next. With the default weights a
+    queued ``get_record`` overtakes a long bulk job instead of waiting
+    behind it, while bulk work still gets a share and never starves.
+
+    ``clock`` and ``sleep`` can be swapped for a fake clock in tests.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        max_in_flight: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+    ):
+        self.rate = float(rate)
+        self.max_rate = self.rate
+        self.min_rate = self.rate / 8
+        self.burst = float(burst)
+        self.max_in_flight = max_in_flight
+        weights = weights or {}
+        self.weights = {lane: float(weights.get(lane, 1.0)) for lane in PRIORITY_LANES}
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._penalty_until = 0.0
+        self._active = 0
+        self._queues: Dict[str, Deque["asyncio.Future[None]"]] = {lane: deque() for lane in PRIORITY_LANES}
+        self._virtual_time = {lane: 0.0 for lane in PRIORITY_LANES}
+        self._virtual_now = 0.0
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+        self._slot_freed = asyncio.Event()
+        self.lane_stats: Dict[str, Dict[str, float]] = {
+            lane: {"granted": 0, "wait_seconds": 0.0, "max_wait": 0.0}
+            for lane in PRIORITY_LANES
+        }
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def queue_depth(self, lane: str) -> int:
+        """Requests currently waiting in a lane."""
+        return sum(not future.done() for future in self._queues[lane])
+
+    def penalize(self, seconds: float):
+        """Pause every caller for ``seconds`` and halve the rate.
+
+        Called when Airtable answers 429. Concurrent 429s within the same
+        penalty window only halve the rate once.
+        """
+        self._refill()
+        now = self._updated
+        if now >= self._penalty_until:
+            self.rate = max(self.min_rate, self.rate / 2)
+        self._penalty_until = max(self._penalty_until, now + seconds)
+        self._tokens = min(self._tokens, -(self._penalty_until - now) * self.rate)
+
+    def recover(self):
+        """Creep back towards the configured rate after a successful request."""
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def _next_lane(self) -> Optional[str]:
+        """Pick the waiting lane with the earliest virtual finish time."""
+        waiting = []
+        for lane, queue in self._queues.items():
+            while queue and queue[0].done():
+                queue.popleft()
+            if queue:
+                waiting.append(lane)
+        if not waiting:
+            return None
+        return min(waiting, key=lambda lane: self._virtual_time[lane] + 1 / self.weights[lane])
+
+    def _activate(self, lane: str):
+        """Start an idle lane at the current virtual time.
+
+        Only done when the lane goes from idle to busy: a lane that keeps
+        waiting keeps its virtual time, so lighter lanes catch up with it
+        instead of being pushed back behind every grant.
+        """
+        self._virtual_time[lane] = max(self._virtual_time[lane], self._virtual_now)
+
+    def _grant(self, lane: str):
+        """Hand one token and one in-flight slot to ``lane``."""
+        start = self._virtual_time[lane]
+        self._virtual_now = start
+        self._virtual_time[lane] = start + 1 / self.weights[lane]
+        self._tokens -= 1
+        self._active += 1
+
+    async def _dispatch(self):
+        """Grant queued requests in fair order until every lane is empty."""
+        while True:
+            lane = self._next_lane()
+            if lane is None:
+                return
+            if self._active >= self.max_in_flight:
+                self._slot_freed.clear()
+                await self._slot_freed.wait()
+                continue
+            self._refill()
+            if self._tokens < 1:
+                await self._sleep((1 - self._tokens) / self.rate)
+                continue
+            self._grant(lane)
+            self._queues[lane].popleft().set_result(None)
+
+    async def acquire(self, lane: Optional[str] = None) -> float:
+        """Wait for a token and an in-flight slot. Returns the time spent waiting.
+
+        ``lane`` defaults to the priority of the current tool call. Every
+        successful ``acquire`` must be paired with a ``release``.
+        """
+        lane = lane or request_priority.get()
+        stats = self.lane_stats[lane]
+
+        self._refill()
+        if (
+            self._tokens >= 1
+            and self._active < self.max_in_flight
+            and not any(self._queues.values())
+        ):
+            self._activate(lane)
+            self._grant(lane)
+            stats["granted"] += 1
+            return 0.0
+
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        queued_at = self._clock()
+        queue = self._queues[lane]
+        while queue and queue[0].done():
+            queue.popleft()
+        if not queue:
+            self._activate(lane)
+        queue.append(future)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: give it back
+                self._tokens += 1
+                self.release()
+            raise
+
+        waited = self._clock() - queued_at
+        stats["granted"] += 1
+        stats["wait_seconds"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+        return waited
+
+    def release(self):
+        """Free the in-flight slot taken by ``acquire``."""
+        self._active -= 1
+        self._slot_freed.set()
+
+    @asynccontextmanager
+    async def slot(self, lane: Optional[str] = None) -> AsyncIterator[float]:
+        """Hold an in-flight slot and a rate token for one request.
+
+        Yields the time spent waiting for them.
+        """
+        waited = await self.acquire(lane)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(base_id: str, rate: Optional[float] = None) -> RateLimiter:
+    """Return the rate limiter shared by every client of ``base_id``.
+
+    Airtable's limit is per base, so each base gets its own budget and
+    requests to different bases never wait on each other.
+    """
+    limiter = _rate_limiters.get(base_id)
+    if limiter is None:
+        limiter = RateLimiter(
+            rate=rate or settings.rate_limit_per_sec,
+            burst=settings.rate_limit_burst,
+            max_in_flight=settings.max_concurrent_requests,
+            weights=settings.priority_weights
+        )
+        _rate_limiters[base_id] = limiter
+    return limiter
+
+
+# ============================================================================
+# CACHING
+# ============================================================================
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def make_cache_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> CacheKey:
+    """Build a cache key from an endpoint and its normalized query params."""
+    items = []
+    for key, value in (params or {}).items():
+        if isinstance(value, (list, tuple)):
+            items.extend((key, str(v)) for v in value)
+        else:
+            items.append((key, str(value)))
+    return endpoint, tuple(sorted(items))
+
+
+class RecordCache:
+    """In-process LRU cache of Airtable GET responses with per-table TTLs.
+
+    Entries are keyed by endpoint (``table_id`` or ``table_id/record_id``)
+    and normalized query params. A write to a table drops that table's query
+    results and the written record, leaving other cached records intact.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        default_ttl: float,
+        table_ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.table_ttls = table_ttls or {}
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """Return a fresh cached value, or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: CacheKey, value: Any):
+        """Store a value, evicting the least recently used entries if full."""
+        table_id = key[0].split("/", 1)[0]
+        ttl = self.table_ttls.get(table_id, self.default_ttl)
+        if ttl <= 0:
+            return
+
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, table_id: str, record_id: Optional[str] = None):
+        """Drop cached queries for a table and, optionally, one record."""
+        record_endpoint = f"{table_id}/{record_id}" if record_id else None
+        stale = [
+            key for key in self._entries
+            if key[0] == table_id or key[0] == record_endpoint
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+
+# ============================================================================
+# AIRTABLE CLIENT
+# ============================================================================
+
+# Airtable accepts at most 10 records per create/update/delete request
+BATCH_SIZE = 10
+
+# Airtable rejects URLs longer than 16k characters; keep RECORD_ID()
+# lookups well under that to leave room for the other query params
+MAX_FORMULA_URL_LENGTH = 12000
+RECORD_ID_PATTERN = re.compile(r"^rec[A-Za-z0-9]+$")
+
+# Responses worth retrying. 429 is always safe to retry because Airtable
+# rejected the request; the others only for idempotent methods.
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "PUT", "PATCH", "DELETE"}
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def record_ids_formula(record_ids: List[str]) -> str:
+    """Build a formula matching any of the given record IDs."""
+    return "OR(" + ",".join(f"RECORD_ID()='{record_id}'" for record_id in record_ids) + ")"
+
+
+def chunk_record_ids(record_ids: List[str], size: int = 100) -> Iterator[List[str]]:
+    """Split IDs into chunks of at most one page whose formula fits in a URL."""
+    chunk: List[str] = []
+    length = 0
+    for record_id in record_ids:
+        term = len(quote(f"RECORD_ID()='{record_id}',"))
+        if chunk and (len(chunk) >= size or length + term > MAX_FORMULA_URL_LENGTH):
+            yield chunk
+            chunk, length = [], 0
+        chunk.append(record_id)
+        length += term
+    if chunk:
+        yield chunk
+
+
+# Files are read and sent in chunks of this size, never whole
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class MultipartFile:
+    """A ``multipart/form-data`` body streaming one file from disk.
+
+    Iterating it again re-reads the file, so a retried upload never needs
+    the file in memory. Content-Length is known up front, which keeps the
+    upload out of chunked transfer encoding.
+    """
+
+    def __init__(self, path: str, filename: str, content_type: str, field: str = "file"):
+        self.path = path
+        self.size = os.path.getsize(path)
+        boundary = os.urandom(16).hex()
+        quoted = filename.replace("\\", "\\\\").replace('"', '\\"').replace("\r", " ").replace("\n", " ")
+        self.head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{quoted}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self.tail = f"\r\n--{boundary}--\r\n".encode()
+        self.headers = {
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+            "Content-Length": str(len(self.head) + self.size + len(self.tail)),
+        }
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self.head
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        yield self.tail
+
+
+def _http2_available() -> bool:
+    """Check whether the optional HTTP/2 dependency is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class AirtableClient:
+    """Async Airtable API client with rate limiting and error handling.
+
+    A single ``httpx.AsyncClient`` is kept for the lifetime of the client so
+    that TCP/TLS connections are pooled and reused across tool calls. Call
+    ``aclose()`` on shutdown to release them.
+    """
+
+    def __init__(
+        self,
+        name: str = DEFAULT_BASE,
+        base_id: Optional[str] = None,
+        api_token: Optional[str] = None,
+        tables: Optional[Dict[str, str]] = None,
+        rate: Optional[float] = None
+    ):
+        base_id = base_id or settings.airtable_base_id
+        self.name = name
+        self.base_url = f"{settings.airtable_api_url}/{base_id}"
+        self.headers = {
+            "Authorization": f"Bearer {api_token or settings.airtable_api_token}",
+            "Content-Type": "application/json"
+        }
+        # Callers address tables by the default base's IDs; other bases map
+        # them to their own (table names work too, Airtable accepts both)
+        self.table_ids: Dict[str, str] = {}
+        if tables is not None:
+            self.table_ids = {table_id: tables.get(name, name) for name, table_id in TABLES.items()}
+        self.limiter = get_rate_limiter(base_id, rate)
+        self.cache: Optional[RecordCache] = None
+        if settings.cache_enabled:
+            self.cache = RecordCache(
+                max_entries=settings.cache_max_entries,
+                default_ttl=settings.cache_ttl,
+                table_ttls={
+                    TABLES[name]: ttl
+                    for name, ttl in settings.cache_table_ttls.items()
+                    if name in TABLES
+                }
+            )
+        self._http: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[CacheKey, "asyncio.Future[Dict[str, Any]]"] = {}
+        # Called as hook(table_id, record, deleted) after every successful write
+        self.write_hooks: List[Callable[[str, Dict[str, Any], bool], None]] = []
+        self.metrics: Dict[str, float] = {
+            "requests": 0,
+            "coalesced": 0,
+            "retries": 0,
+            "retry_wait_seconds": 0.0,
+            "rate_limited": 0,
+            "retries_exhausted": 0,
+        }
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client, created lazily on first use."""
+        if self._http is None or self._http.is_closed:
+            http2 = settings.http2
+            if http2 and not _http2_available():
+                logger.warning("HTTP/2 requested but 'h2' is not installed; falling back to HTTP/1.1")
+                http2 = False
+
+            self._http = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=settings.request_timeout,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.pool_max_connections,
+                    max_keepalive_connections=settings.pool_max_keepalive,
+                    keepalive_expiry=settings.keepalive_expiry
+                )
+            )
+        return self._http
+
+    async def aclose(self):
+        """Close pooled connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _send(self, method: str, url: str, table: str, **kwargs) -> httpx.Response:
+        """Send one HTTP request under the rate limiter, recording its timings."""
+        trace = current_trace.get()
+        tool = trace.tool if trace else "background"
+        lane = request_priority.get()
+
+        queued_at = time.time()
+        async with self.limiter.slot() as waited:
+            metrics_registry.observe("airtable_limiter_wait_seconds", waited, tool=tool, table=table, lane=lane)
+            record_phase("limiter_wait", waited)
+            emit_span("limiter.wait", queued_at, waited, table=table, lane=lane)
+
+            started_at = time.time()
+            start = time.perf_counter()
+            status = "error"
+            size = 0
+            try:
+                response = await self.http.request(method, url, **kwargs)
+                status = str(response.status_code)
+                size = len(response.content)
+            finally:
+                elapsed = time.perf_counter() - start
+                metrics_registry.observe("airtable_http_seconds", elapsed, tool=tool, table=table, method=method, status=status)
+                metrics_registry.observe("airtable_response_bytes", size, tool=tool, table=table)
+                record_phase("http", elapsed)
+                if trace is not None:
+                    trace.requests += 1
+                emit_span("airtable.request", started_at, elapsed, method=method, table=table, status=status, bytes=size)
+
+        response.raise_for_status()
+        return response
+
+    def _retry_delay(
+        self,
+        method: str,
+        error: Exception,
+        attempt: int
+    ) -> Optional[float]:
+        """Return seconds to wait before retrying, or None if not retryable."""
+        status = None
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            if status not in RETRYABLE_STATUS_CODES:
+                return None
+        elif not isinstance(error, httpx.TimeoutException):
+            return None
+
+        if status != 429 and method not in IDEMPOTENT_METHODS:
+            return None
+
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+        backoff = random.uniform(
+            0,
+            min(settings.retry_backoff_max, settings.retry_backoff_base * 2 ** attempt)
+        )
+
+        if status in (429, 503):
+            retry_after = _parse_retry_after(error.response.headers.get("Retry-After"))
+            if retry_after is None and status == 429:
+                retry_after = settings.rate_limit_penalty
+            if retry_after is not None:
+                # Slow every caller of this base down, not just this one
+                self.limiter.penalize(retry_after)
+                return retry_after + backoff
+
+        return backoff
+
+    def _raise_for_error(self, url: str, error: Exception):
+        """Translate an httpx error into the exception returned to tools."""
+        if isinstance(error, httpx.TimeoutException):
+            logger.error(f"Request timeout: {url}")
+            raise TimeoutError(f"Request timed out after {settings.request_timeout}s")
+
+        response = error.response
+        logger.error(f"HTTP error {response.status_code}: {response.text}")
+
+        if response.status_code == 429:
+            raise Exception("Rate limit exceeded. Please wait before retrying.")
+        elif response.status_code == 401:
+            raise Exception("Unauthorized. Check your Airtable API token.")
+        elif response.status_code == 404:
+            raise Exception("Record or table not found.")
+        else:
+            raise Exception(f"Airtable API error: {response.text}")
+
+    def _observe_retries(self, table: str, attempt: int):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.retries += attempt
+        metrics_registry.observe(
+            "airtable_request_retries",
+            attempt,
+            tool=trace.tool if trace else "background",
+            table=table
+        )
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Make HTTP request with rate limiting, retries and error handling.
+
+        429, 502, 503, 504 and timeouts are retried with jittered exponential
+        backoff, up to ``max_retries`` attempts and ``retry_budget`` seconds of
+        total waiting. A 429 honours Retry-After (or Airtable's 30 second
+        penalty window) and throttles the shared rate limiter.
+        """
+        if endpoint.startswith(("http://", "https://")):
+            url = endpoint
+            table = "uploads" if endpoint.startswith(settings.content_url) else "meta"
+        else:
+            table_id, _, rest = endpoint.partition("/")
+            url = f"{self.base_url}/{quote(self.table_ids.get(table_id, table_id), safe='')}"
+            if rest:
+                url = f"{url}/{rest}"
+            table = TABLE_NAMES.get(table_id, table_id)
+            if self.name != DEFAULT_BASE:
+                table = f"{self.name}.{table}"
+        self.metrics["requests"] += 1
+        attempt = 0
+        waited = 0.0
+
+        while True:
+            try:
+                response = await self._send(method, url, table, **kwargs)
+                self.limiter.recover()
+                self._observe_retries(table, attempt)
+                return response.json()
+
+            except (httpx.TimeoutException, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429:
+                    self.metrics["rate_limited"] += 1
+
+                delay = self._retry_delay(method, e, attempt)
+                if delay is None or attempt >= settings.max_retries or waited + delay > settings.retry_budget:
+                    if attempt:
+                        self.metrics["retries_exhausted"] += 1
+                    self._observe_retries(table, attempt)
+                    self._raise_for_error(url, e)
+
+                attempt += 1
+                waited += delay
+                self.metrics["retries"] += 1
+                self.metrics["retry_wait_seconds"] += delay
+                reason = "timeout" if isinstance(e, httpx.TimeoutException) else f"HTTP {e.response.status_code}"
+                logger.warning(
+                    f"Retrying {method} {endpoint} in {delay:.1f}s "
+                    f"(attempt {attempt}/{settings.max_retries}, {reason})"
+                )
+                await asyncio.sleep(delay)
+
+            except Exception as e:
+                logger.error(f"Unexpected error: {e}")
+                raise
+
+    async def _get(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """GET through the read cache, coalescing identical concurrent reads.
+
+        Concurrent calls with the same endpoint and params share a single
+        upstream request (single-flight); its result or error is delivered to
+        every waiter. List pages are only cached when they are complete (no
+        ``offset``), because Airtable offsets expire and must not outlive
+        their query.
+        """
+        key = make_cache_key(endpoint, params)
+        if self.cache is not None and use_cache:
+            data = self.cache.get(key)
+            if data is not None:
+                return data
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.metrics["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(self._fetch(key, endpoint, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish_flight(key, t))
+
+        # Shield so one cancelled caller doesn't cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        key: CacheKey,
+        endpoint: str,
+        params: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Fetch a GET response once and store it in the cache."""
+        data = await self._request("GET", endpoint, params=params)
+        if self.cache is not None and "offset" not in data:
+            self.cache.set(key, data)
+        return data
+
+    def _finish_flight(self, key: CacheKey, task: "asyncio.Future[Dict[str, Any]]"):
+        """Forget a completed in-flight read."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the error as retrieved even if every waiter was cancelled
+            task.exception()
+
+    def _record_written(self, table_id: str, record: Dict[str, Any], deleted: bool = False):
+        """Update the cache and notify write hooks after a successful write."""
+        record_id = record.get("id")
+        if self.cache is not None:
+            self.cache.invalidate(table_id, record_id)
+            if not deleted and record_id and "fields" in record:
+                self.cache.set(make_cache_key(f"{table_id}/{record_id}"), record)
+
+        for hook in self.write_hooks:
+            hook(table_id, record, deleted)
+
+    async def iter_pages(
+        self,
+        table_id: str,
+        view: Optional[str] = None,
+        filter_formula: Optional[str] = None,
+        page_size: int = 100,
+        max_records: Optional[int] = None,
+        offset: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Walk Airtable's offset pagination one page at a time.
+
+        Yields ``(records, next_offset)``, where ``next_offset`` is None on the
+        last page. Only the current page is held in memory. When
+        ``max_records`` is set, the final page size is trimmed so iteration
+        stops on a page boundary and ``next_offset`` can resume exactly.
+        """
+        remaining = max_records
+
+        while True:
+            params: Dict[str, Any] = {
+                "pageSize": page_size if remaining is None else min(page_size, remaining)
             }
+            if view:
+                params["view"] = view
+            if filter_formula:
+                params["filterByFormula"] = filter_formula
+            if fields:
+                params["fields[]"] = fields
+            if offset:
+                params["offset"] = offset
+
+            data = await self._get(table_id, params, use_cache=use_cache)
+            records = data.get("records", [])
+            offset = data.get("offset")
+
+            yield records, offset
+
+            if remaining is not None:
+                remaining -= len(records)
+                if remaining <= 0:
+                    return
+            if not offset:
+                return
+
+    async def iter_records(self, table_id: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over records across pages (see ``iter_pages``)."""
+        async for records, _ in self.iter_pages(table_id, **kwargs):
+            for record in records:
+                yield record
+
+    async def collect_records(
+        self,
+        table_id: str,
+        max_records: int = 100,
+        **kwargs
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Collect up to ``max_records`` and return them with the resume offset."""
+        collected: List[Dict[str, Any]] = []
+        next_offset = None
+        async for records, next_offset in self.iter_pages(table_id, max_records=max_records, **kwargs):
+            collected.extend(records)
+        return collected, next_offset
+
+    async def list_records(
+        self,
+        table_id: str,
+        view: Optional[str] = None,
+        max_records: int = 100
+    ) -> List[Dict[str, Any]]:
+        """List records from a table."""
+        records, _ = await self.collect_records(table_id, max_records=max_records, view=view)
+        return records
+
+    async def get_record(
+        self,
+        table_id: str,
+        record_id: str,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Get a single record by ID."""
+        data = await self._get(f"{table_id}/{record_id}", use_cache=use_cache)
+        return data
+
+    async def search_records(
+        self,
+        table_id: str,
+        filter_formula: str,
+        max_records: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Search records using Airtable filter formula."""
+        records, _ = await self.collect_records(
+            table_id,
+            max_records=max_records,
+            filter_formula=filter_formula
+        )
+        return records
+
+    async def get_records_by_ids(
+        self,
+        table_id: str,
+        record_ids: Set[str],
+        use_cache: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch many records by ID in as few requests as possible.
+
+        IDs already in the read cache are served from it. The rest are
+        resolved with concurrent ``OR(RECORD_ID()='...')`` list queries of
+        one page each, and cached per record so later ``get_record`` calls
+        hit. IDs that no longer exist are absent from the result.
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for record_id in sorted(record_ids):
+            cached = None
+            if self.cache is not None and use_cache:
+                cached = self.cache.get(make_cache_key(f"{table_id}/{record_id}"))
+            if cached is not None:
+                found[record_id] = cached
+            else:
+                missing.append(record_id)
+
+        async def fetch(chunk: List[str]) -> List[Dict[str, Any]]:
+            records, _ = await self.collect_records(
+                table_id,
+                max_records=len(chunk),
+                filter_formula=record_ids_formula(chunk),
+                use_cache=use_cache
+            )
+            return records
+
+        for records in await asyncio.gather(*(fetch(chunk) for chunk in chunk_record_ids(missing))):
+            for record in records:
+                found[record["id"]] = record
+                if self.cache is not None:
+                    self.cache.set(make_cache_key(f"{table_id}/{record['id']}"), record)
+        return found
+
+    async def get_base_schema(self) -> Dict[str, Any]:
+        """Fetch table and field definitions from the metadata API.
+
+        Needs a token with the ``schema.bases:read`` scope.
+        """
+        api_url, base_id = self.base_url.rsplit("/", 1)
+        return await self._request("GET", f"{api_url}/meta/bases/{base_id}/tables")
+
+    async def create_record(
+        self,
+        table_id: str,
+        fields: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Create a new record."""
+        json_data = {"fields": fields}
+        data = await self._request("POST", table_id, json=json_data)
+        self._record_written(table_id, data)
+        return data
+
+    async def update_record(
+        self,
+        table_id: str,
+        record_id: str,
+        fields: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Update an existing record."""
+        json_data = {"fields": fields}
+        data = await self._request("PATCH", f"{table_id}/{record_id}", json=json_data)
+        self._record_written(table_id, data)
+        return data
+
+    async def upload_file(self, body: MultipartFile) -> Dict[str, Any]:
+        """Upload a file to the content API; returns ``{id, filename, size, url}``."""
+        return await self._request("POST", f"{settings.content_url}/uploads", content=body, headers=body.headers)
+
+    async def delete_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
+        """Delete a record."""
+        data = await self._request("DELETE", f"{table_id}/{record_id}")
+        self._record_written(table_id, {"id": record_id}, deleted=True)
+        return data
+
+    async def _run_batches(
+        self,
+        table_id: str,
+        items: List[Any],
+        send: Callable[[List[Any]], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """Split ``items`` into chunks of 10 and send them concurrently.
+
+        ``send`` returns the Airtable records for one chunk, in order. The
+        result has one entry per input item: ``{"index", "ok", "id",
+        "record", "error"}``. A failed chunk marks only its own items as
+        failed.
+        """
+        chunks = [items[i:i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+        outcomes = await asyncio.gather(
+            *(send(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+
+        results: List[Dict[str, Any]] = []
+        for chunk_index, (chunk, outcome) in enumerate(zip(chunks, outcomes)):
+            start = chunk_index * BATCH_SIZE
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                for offset in range(len(chunk)):
+                    results.append({"index": start + offset, "ok": False, "error": str(outcome)})
+                continue
+
+            for offset, record in enumerate(outcome):
+                self._record_written(table_id, record, deleted=bool(record.get("deleted")))
+                results.append({
+                    "index": start + offset,
+                    "ok": True,
+                    "id": record.get("id"),
+                    "record": record
+                })
+        return results
+
+    async def batch_create_records(
+        self,
+        table_id: str,
+        records: List[Dict[str, Any]],
+        typecast: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Create records in chunks of 10, sent concurrently."""
+        async def send(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            json_data = {
+                "records": [{"fields": fields} for fields in chunk],
+                "typecast": typecast
+            }
+            data = await self._request("POST", table_id, json=json_data)
+            return data.get("records", [])
+
+        return await self._run_batches(table_id, records, send)
+
+    async def batch_update_records(
+        self,
+        table_id: str,
+        records: List[Dict[str, Any]],
+        fields_to_merge_on: Optional[List[str]] = None,
+        typecast: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Update (or upsert) records in chunks of 10, sent concurrently.
+
+        Each record is ``{"id": ..., "fields": {...}}``. With
+        ``fields_to_merge_on`` Airtable's ``performUpsert`` is used, so
+        records without an ``id`` are matched on those fields or created.
+        """
+        async def send(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            json_data: Dict[str, Any] = {
+                "records": [
+                    {k: v for k, v in record.items() if k in ("id", "fields") and v is not None}
+                    for record in chunk
+                ],
+                "typecast": typecast
+            }
+            if fields_to_merge_on:
+                json_data["performUpsert"] = {"fieldsToMergeOn": fields_to_merge_on}
+
+            data = await self._request("PATCH", table_id, json=json_data)
+            created_ids.update(data.get("createdRecords", []))
+            return data.get("records", [])
+
+        created_ids: set = set()
+        results = await self._run_batches(table_id, records, send)
+        if fields_to_merge_on:
+            for result in results:
+                if result["ok"]:
+                    result["upsert"] = "created" if result["id"] in created_ids else "updated"
+        return results
+
+    async def batch_delete_records(
+        self,
+        table_id: str,
+        record_ids: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Delete records in chunks of 10, sent concurrently."""
+        async def send(chunk: List[str]) -> List[Dict[str, Any]]:
+            data = await self._request("DELETE", table_id, params={"records[]": chunk})
+            return data.get("records", [])
+
+        return await self._run_batches(table_id, record_ids, send)
+
+
+# ============================================================================
+# FORMULA EVALUATION
+# ============================================================================
+
+class UnsupportedFormula(Exception):
+    """Raised when a formula can't be evaluated locally; use the API instead."""
+
+
+# {field} | 'string' | "string" | number | identifier | operator | punctuation
+FORMULA_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<field>\{[^}]*\})
+      | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op><=|>=|!=|<>|[=<>&+\-*/])
+      | (?P<punct>[(),])
+    )
+""", re.VERBOSE)
+
+# Binary operators by precedence, lowest first
+FORMULA_PRECEDENCE = {
+    "=": 1, "!=": 1, "<>": 1, "<": 1, ">": 1, "<=": 1, ">=": 1,
+    "&": 2,
+    "+": 3, "-": 3,
+    "*": 4, "/": 4,
+}
+
+# Compiled formula node: takes a record, returns a value
+FormulaNode = Callable[[Dict[str, Any]], Any]
+
+
+def _tokenize_formula(formula: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    formula = formula.strip()
+    while position < len(formula):
+        match = FORMULA_TOKEN.match(formula, position)
+        if match is None or match.end() == position:
+            raise UnsupportedFormula(f"Unexpected character at {position}: {formula[position:position + 10]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or value == "" or value == []
+
+
+def _to_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, list):
+        return ", ".join(_to_text(v) for v in value)
+    return str(value)
+
+
+def _to_number(value: Any) -> float:
+    if _is_blank(value):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value))
+    except ValueError:
+        raise UnsupportedFormula(f"Not a number: {value!r}")
+
+
+def _to_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(_to_text(value).replace("Z", "+00:00"))
+        except ValueError:
+            raise UnsupportedFormula(f"Not a date: {value!r}")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _is_truthy(value: Any) -> bool:
+    return not _is_blank(value) and value != 0 and value is not False
+
+
+def _formula_equals(left: Any, right: Any) -> bool:
+    if _is_blank(left) or _is_blank(right):
+        return _is_blank(left) and _is_blank(right)
+    if isinstance(left, (int, float)) or isinstance(right, (int, float)):
+        try:
+            return _to_number(left) == _to_number(right)
+        except UnsupportedFormula:
+            return False
+    return _to_text(left) == _to_text(right)
+
+
+def _formula_compare(op: str, left: Any, right: Any) -> bool:
+    if op in ("=",):
+        return _formula_equals(left, right)
+    if op in ("!=", "<>"):
+        return not _formula_equals(left, right)
+    if isinstance(left, (int, float)) or isinstance(right, (int, float)):
+        left, right = _to_number(left), _to_number(right)
+    else:
+        left, right = _to_text(left), _to_text(right)
+    return {
+        "<": left < right,
+        ">": left > right,
+        "<=": left <= right,
+        ">=": left >= right,
+    }[op]
+
+
+def _find(needle: Any, haystack: Any, start: Any = 1, ignore_case: bool = False) -> int:
+    needle, haystack = _to_text(needle), _to_text(haystack)
+    if ignore_case:
+        needle, haystack = needle.lower(), haystack.lower()
+    return haystack.find(needle, max(int(_to_number(start)) - 1, 0)) + 1
+
+
+def _search(needle: Any, haystack: Any, start: Any = 1) -> Optional[int]:
+    # SEARCH is case-insensitive and returns blank (not 0) when not found
+    return _find(needle, haystack, start, ignore_case=True) or None
+
+
+FORMULA_FUNCTIONS: Dict[str, Tuple[Callable[..., Any], int, int]] = {
+    # name: (implementation, min args, max args)
+    "FIND": (_find, 2, 3),
+    "SEARCH": (_search, 2, 3),
+    "LOWER": (lambda v: _to_text(v).lower(), 1, 1),
+    "UPPER": (lambda v: _to_text(v).upper(), 1, 1),
+    "TRIM": (lambda v: _to_text(v).strip(), 1, 1),
+    "LEN": (lambda v: len(_to_text(v)), 1, 1),
+    "IS_BEFORE": (lambda a, b: _to_datetime(a) < _to_datetime(b), 2, 2),
+    "IS_AFTER": (lambda a, b: _to_datetime(a) > _to_datetime(b), 2, 2),
+    "NOT": (lambda v: not _is_truthy(v), 1, 1),
+    "BLANK": (lambda: None, 0, 0),
+    "TRUE": (lambda: True, 0, 0),
+    "FALSE": (lambda: False, 0, 0),
+}
+
+
+class _FormulaParser:
+    """Recursive-descent parser compiling a formula into nested closures."""
+
+    def __init__(self, formula: str):
+        self.tokens = _tokenize_formula(formula)
+        self.position = 0
+        # Field names the formula references
+        self.fields: Set[str] = set()
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise UnsupportedFormula("Unexpected end of formula")
+        self.position += 1
+        return token
+
+    def _expect(self, value: str):
+        kind, text = self._next()
+        if text != value:
+            raise UnsupportedFormula(f"Expected {value!r}, got {text!r}")
+
+    def parse(self) -> FormulaNode:
+        node = self._expression(0)
+        if self._peek() is not None:
+            raise UnsupportedFormula(f"Unexpected token {self._peek()[1]!r}")
+        return node
+
+    def _expression(self, min_precedence: int) -> FormulaNode:
+        left = self._unary()
+        while True:
+            token = self._peek()
+            if token is None or token[0] != "op" or FORMULA_PRECEDENCE[token[1]] <= min_precedence:
+                return left
+            op = self._next()[1]
+            right = self._expression(FORMULA_PRECEDENCE[op])
+            left = self._binary(op, left, right)
+
+    @staticmethod
+    def _binary(op: str, left: FormulaNode, right: FormulaNode) -> FormulaNode:
+        if op == "&":
+            return lambda r: _to_text(left(r)) + _to_text(right(r))
+        if op in ("+", "-", "*", "/"):
+            def arithmetic(r: Dict[str, Any]) -> float:
+                a, b = _to_number(left(r)), _to_number(right(r))
+                if op == "/" and b == 0:
+                    raise UnsupportedFormula("Division by zero")
+                return {"+": a + b, "-": a - b, "*": a * b, "/": a / b if b else 0}[op]
+            return arithmetic
+        return lambda r: _formula_compare(op, left(r), right(r))
+
+    def _unary(self) -> FormulaNode:
+        token = self._peek()
+        if token == ("op", "-"):
+            self._next()
+            operand = self._unary()
+            return lambda r: -_to_number(operand(r))
+        return self._primary()
+
+    def _primary(self) -> FormulaNode:
+        kind, text = self._next()
+
+        if kind == "field":
+            name = text[1:-1]
+            self.fields.add(name)
+            return lambda r: _field_value(r, name)
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", text[1:-1])
+            return lambda r: value
+        if kind == "number":
+            number = float(text)
+            return lambda r: number
+        if text == "(":
+            node = self._expression(0)
+            self._expect(")")
+            return node
+        if kind == "name":
+            return self._call(text.upper())
+
+        raise UnsupportedFormula(f"Unexpected token {text!r}")
+
+    def _call(self, name: str) -> FormulaNode:
+        self._expect("(")
+        args: List[FormulaNode] = []
+        if self._peek() != ("punct", ")"):
+            args.append(self._expression(0))
+            while self._peek() == ("punct", ","):
+                self._next()
+                args.append(self._expression(0))
+        self._expect(")")
+
+        if name == "AND":
+            return lambda r: all(_is_truthy(arg(r)) for arg in args)
+        if name == "OR":
+            return lambda r: any(_is_truthy(arg(r)) for arg in args)
+        if name == "IF" and len(args) in (2, 3):
+            then = args[1]
+            otherwise = args[2] if len(args) == 3 else (lambda r: None)
+            return lambda r: then(r) if _is_truthy(args[0](r)) else otherwise(r)
+        if name == "RECORD_ID" and not args:
+            return lambda r: r.get("id")
+        if name == "CREATED_TIME" and not args:
+            return lambda r: r.get("createdTime")
+
+        if name not in FORMULA_FUNCTIONS:
+            raise UnsupportedFormula(f"Unsupported function: {name}")
+        function, min_args, max_args = FORMULA_FUNCTIONS[name]
+        if not min_args <= len(args) <= max_args:
+            raise UnsupportedFormula(f"{name} takes {min_args}-{max_args} arguments")
+        return lambda r: function(*(arg(r) for arg in args))
+
+
+def _field_value(record: Dict[str, Any], name: str) -> Any:
+    value = record.get("fields", {}).get(name)
+    if isinstance(value, list) and value:
+        first = value[0]
+        # Linked records and attachments render differently in Airtable
+        # formulas (primary field names, filenames), so leave them to the API
+        if isinstance(first, dict) or (isinstance(first, str) and first.startswith("rec")):
+            raise UnsupportedFormula(f"Field {{{name}}} holds linked records or attachments")
+    return value
+
+
+# Field types whose formula value can't be reproduced from the record JSON
+OPAQUE_FORMULA_FIELD_TYPES = ("links", "attachments")
+
+
+@lru_cache(maxsize=256)
+def _parse_formula(formula: str) -> Optional[Tuple[FormulaNode, FrozenSet[str]]]:
+    """Parse a formula once; returns its root node and referenced fields."""
+    try:
+        parser = _FormulaParser(formula)
+        return parser.parse(), frozenset(parser.fields)
+    except UnsupportedFormula as e:
+        logger.debug(f"Formula not supported locally ({e}): {formula}")
+        return None
+
+
+def _check_formula_fields(table_name: str, fields: FrozenSet[str]):
+    """Raise ``UnsupportedFormula`` unless every field exists as a plain value.
+
+    Airtable rejects formulas naming an unknown field with a 422, while a
+    local evaluation would read it as blank and return a different answer.
+    """
+    table_schema = schema.tables.get(table_name)
+    if table_schema is None:
+        raise UnsupportedFormula(f"No schema for table {table_name}")
+    for name in fields:
+        spec = table_schema.get(name)
+        if spec is None:
+            raise UnsupportedFormula(f"Unknown field {{{name}}} in {table_name}")
+        if spec["type"] in OPAQUE_FORMULA_FIELD_TYPES:
+            raise UnsupportedFormula(f"Field {{{name}}} holds {spec['type']}")
+
+
+def compile_formula(
+    formula: str,
+    table_name: Optional[str] = None
+) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Compile an Airtable filter formula into a record predicate.
+
+    Supports field references, string/number literals, comparisons, ``&``,
+    arithmetic, AND/OR/NOT/IF, FIND, SEARCH, LOWER, UPPER, TRIM, LEN,
+    IS_BEFORE, IS_AFTER, BLANK, TRUE, FALSE, RECORD_ID and CREATED_TIME.
+    With ``table_name``, every referenced field must be in that table's
+    schema and not a linked record or attachment field. Returns None for
+    anything else. The predicate may still raise ``UnsupportedFormula``
+    for records whose values can't be evaluated faithfully (linked
+    records, attachments, unparseable dates).
+    """
+    parsed = _parse_formula(formula)
+    if parsed is None:
+        return None
+    node, fields = parsed
+    if table_name is not None:
+        try:
+            _check_formula_fields(table_name, fields)
+        except UnsupportedFormula as e:
+            logger.debug(f"Formula not supported locally ({e}): {formula}")
+            return None
+    return lambda record: _is_truthy(node(record))
+
+
+# ============================================================================
+# LOCAL REPLICA
+# ============================================================================
+
+REPLICA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    table_id TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    created_time TEXT,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (table_id, record_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_id TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL,
+    reconciled_at REAL,
+    last_error TEXT
+);
+"""
+
+# Top-level equality formulas answered from a hash index: {field}='value'
+EQUALITY_FORMULA = re.compile(r"""^\s*\{([^}]+)\}\s*=\s*(?:'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)")\s*$""")
+
+# Records modified this close to the watermark are fetched again on the next
+# sync, to cover clock skew and writes that were in flight during a sync
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def _format_timestamp(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def modified_since_formula(watermark: str) -> str:
+    """Formula matching records created or modified after ``watermark``."""
+    return (
+        f"OR(IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{watermark}')), "
+        f"IS_AFTER(CREATED_TIME(), DATETIME_PARSE('{watermark}')))"
+    )
+
+
+# Field types an equality index can't answer like Airtable: formulas see
+# linked records by primary field and lookups, rollups and attachments
+# differently from the stored JSON
+UNINDEXABLE_FIELD_TYPES = OPAQUE_FORMULA_FIELD_TYPES + ("computed",)
+
+
+class FieldIndex:
+    """In-memory hash index mapping a field's value to record IDs.
+
+    Values are keyed by their formula text form, so a lookup matches exactly
+    what ``{field}='value'`` matches in Airtable.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self._ids: Dict[str, Set[str]] = {}
+        self._keys: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, record: Dict[str, Any]):
+        record_id = record["id"]
+        self.remove(record_id)
+        value = record.get("fields", {}).get(self.field)
+        if _is_blank(value):
+            return
+        key = _to_text(value)
+        self._ids.setdefault(key, set()).add(record_id)
+        self._keys[record_id] = key
+
+    def remove(self, record_id: str):
+        key = self._keys.pop(record_id, None)
+        if key is not None:
+            ids = self._ids[key]
+            ids.discard(record_id)
+            if not ids:
+                del self._ids[key]
+
+    def lookup(self, value: Any) -> Set[str]:
+        return self._ids.get(_to_text(value), set())
+
+
+class LocalReplica:
+    """SQLite mirror of the base, kept fresh by incremental syncs.
+
+    The first sync of a table pulls every record. Later syncs only fetch
+    records created or modified since the previous watermark, and a periodic
+    ID scan removes records deleted in Airtable. Writes made through
+    ``AirtableClient`` are applied immediately via its write hooks.
+    """
+
+    def __init__(
+        self,
+        client: "AirtableClient",
+        path: str,
+        tables: Dict[str, str],
+        max_staleness: float,
+        sync_interval: float,
+        reconcile_interval: float
+    ):
+        self.client = client
+        self.path = path
+        self.tables = tables
+        self.table_names = {table_id: name for name, table_id in tables.items()}
+        self.max_staleness = max_staleness
+        self.sync_interval = sync_interval
+        self.reconcile_interval = reconcile_interval
+        self._db: Optional[sqlite3.Connection] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # table_id -> field -> index, built on first use
+        self._indexes: Dict[str, Dict[str, FieldIndex]] = {}
+        self.local_reads = 0
+        self.index_lookups = 0
+        client.write_hooks.append(self.apply_write)
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """SQLite connection, opened on first use."""
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.executescript(REPLICA_SCHEMA)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ---- Sync state --------------------------------------------------------
+
+    def _state(self, table_id: str) -> Dict[str, Any]:
+        row = self.db.execute(
+            "SELECT watermark, synced_at, reconciled_at, last_error FROM sync_state WHERE table_id = ?",
+            (table_id,)
+        ).fetchone()
+        if row is None:
+            return {"watermark": None, "synced_at": None, "reconciled_at": None, "last_error": None}
+        return dict(zip(("watermark", "synced_at", "reconciled_at", "last_error"), row))
+
+    def _save_state(self, table_id: str, **values: Any):
+        state = {**self._state(table_id), **values}
+        self.db.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?)",
+            (table_id, state["watermark"], state["synced_at"], state["reconciled_at"], state["last_error"])
+        )
+        self.db.commit()
+
+    def age(self, table_id: str) -> Optional[float]:
+        """Seconds since the table last synced, or None if it never did."""
+        synced_at = self._state(table_id)["synced_at"]
+        return None if synced_at is None else max(0.0, time.time() - synced_at)
+
+    def is_fresh(self, table_id: str) -> bool:
+        """Whether reads for this table may be served locally."""
+        age = self.age(table_id)
+        return age is not None and age <= self.max_staleness
+
+    # ---- Storage -----------------------------------------------------------
+
+    def _upsert(self, table_id: str, records: List[Dict[str, Any]]):
+        self.db.executemany(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+            [
+                (table_id, r["id"], r.get("createdTime"), json.dumps(r.get("fields", {})))
+                for r in records
+            ]
+        )
+        for index in self._indexes.get(table_id, {}).values():
+            for record in records:
+                index.add(record)
+
+    def _delete(self, table_id: str, record_ids: List[str]):
+        self.db.executemany(
+            "DELETE FROM records WHERE table_id = ? AND record_id = ?",
+            [(table_id, record_id) for record_id in record_ids]
+        )
+        for index in self._indexes.get(table_id, {}).values():
+            for record_id in record_ids:
+                index.remove(record_id)
+
+    # ---- Indexes -----------------------------------------------------------
+
+    def index(self, table_id: str, field: str) -> FieldIndex:
+        """Return the hash index for a field, building it on first use."""
+        indexes = self._indexes.setdefault(table_id, {})
+        if field not in indexes:
+            index = FieldIndex(field)
+            for record in self.iter_table(table_id):
+                index.add(record)
+            indexes[field] = index
+        return indexes[field]
+
+    def build_indexes(self, table_id: str):
+        """Build the configured INDEXED_FIELDS indexes for a table."""
+        table_name = self.table_names.get(table_id)
+        for field in INDEXED_FIELDS.get(table_name, []):
+            self.index(table_id, field)
+
+    def get_many(self, table_id: str, record_ids: Set[str]) -> List[Dict[str, Any]]:
+        """Fetch records by ID, in list order."""
+        records: List[Dict[str, Any]] = []
+        ids = list(record_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self.db.execute(
+                "SELECT record_id, created_time, fields FROM records "
+                f"WHERE table_id = ? AND record_id IN ({', '.join('?' * len(chunk))})",
+                (table_id, *chunk)
+            )
+            records.extend(self._to_record(row) for row in rows)
+        records.sort(key=lambda r: (r.get("createdTime") or "", r["id"]))
+        return records
+
+    def indexable(self, table_id: str, field: str) -> bool:
+        """Whether an index on ``field`` matches what Airtable would.
+
+        Unknown fields (Airtable answers 422) and link, lookup and
+        attachment fields are left to the API.
+        """
+        spec = schema.tables.get(self.table_names.get(table_id, ""), {}).get(field)
+        return spec is not None and spec["type"] not in UNINDEXABLE_FIELD_TYPES
+
+    def lookup(
+        self,
+        table_id: str,
+        field: str,
+        value: Any,
+        max_records: int = 100,
+        offset: int = 0
+    ) -> Optional[Tuple[List[Dict[str, Any]], Optional[int]]]:
+        """Equality lookup through a hash index: O(1) plus matching rows.
+
+        Returns None when the field can't be indexed, so the caller can
+        fall back to Airtable.
+        """
+        if not self.indexable(table_id, field):
+            logger.debug(f"Not indexing {field}, falling back to Airtable")
+            return None
+        ids = self.index(table_id, field).lookup(value)
+        self.index_lookups += 1
+        self.local_reads += 1
+        records = self.get_many(table_id, ids)
+        next_offset = offset + max_records if len(records) > offset + max_records else None
+        return records[offset:offset + max_records], next_offset
+
+    def apply_write(self, table_id: str, record: Dict[str, Any], deleted: bool):
+        """Write hook: mirror a write made through the client."""
+        if table_id not in self.tables.values() or self._state(table_id)["synced_at"] is None:
+            return
+        if deleted:
+            self._delete(table_id, [record["id"]])
+        elif "fields" in record:
+            self._upsert(table_id, [record])
+        self.db.commit()
+
+    @staticmethod
+    def _to_record(row: Tuple[str, Optional[str], str]) -> Dict[str, Any]:
+        record_id, created_time, fields = row
+        return {"id": record_id, "createdTime": created_time, "fields": json.loads(fields)}
+
+    def count(self, table_id: str) -> int:
+        return self.db.execute(
+            "SELECT COUNT(*) FROM records WHERE table_id = ?", (table_id,)
+        ).fetchone()[0]
+
+    def get(self, table_id: str, record_id: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            "SELECT record_id, created_time, fields FROM records WHERE table_id = ? AND record_id = ?",
+            (table_id, record_id)
+        ).fetchone()
+        self.local_reads += 1
+        return None if row is None else self._to_record(row)
+
+    def list(
+        self,
+        table_id: str,
+        max_records: int = 100,
+        offset: int = 0,
+        where: str = "",
+        args: Tuple[Any, ...] = ()
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Return a page of records and the next local offset, if any."""
+        rows = self.db.execute(
+            "SELECT record_id, created_time, fields FROM records "
+            f"WHERE table_id = ? {where} ORDER BY created_time, record_id LIMIT ? OFFSET ?",
+            (table_id, *args, max_records + 1, offset)
+        ).fetchall()
+        self.local_reads += 1
+        next_offset = offset + max_records if len(rows) > max_records else None
+        return [self._to_record(row) for row in rows[:max_records]], next_offset
+
+    def iter_table(self, table_id: str) -> Iterator[Dict[str, Any]]:
+        """Iterate over every record of a table in list order."""
+        rows = self.db.execute(
+            "SELECT record_id, created_time, fields FROM records "
+            "WHERE table_id = ? ORDER BY created_time, record_id",
+            (table_id,)
+        )
+        for row in rows:
+            yield self._to_record(row)
+
+    def search(
+        self,
+        table_id: str,
+        filter_formula: str,
+        max_records: int = 100,
+        offset: int = 0
+    ) -> Optional[Tuple[List[Dict[str, Any]], Optional[int]]]:
+        """Evaluate a filter formula over the local copy of a table.
+
+        ``offset`` counts matching records to skip. Returns None when the
+        formula (or a value it touches) can't be evaluated locally, so the
+        caller can fall back to Airtable.
+        """
+        match = EQUALITY_FORMULA.match(filter_formula)
+        if match is not None:
+            field, single, double = match.groups()
+            value = re.sub(r"\\(.)", r"\1", single if single is not None else double)
+            if value and field in self._indexes.get(table_id, {}) and self.indexable(table_id, field):
+                return self.lookup(table_id, field, value, max_records=max_records, offset=offset)
+
+        predicate = compile_formula(filter_formula, self.table_names.get(table_id, table_id))
+        if predicate is None:
+            return None
+        return self._scan(table_id, filter_formula, predicate, max_records, offset)
+
+    def _scan(
+        self,
+        table_id: str,
+        filter_formula: str,
+        predicate: Callable[[Dict[str, Any]], bool],
+        max_records: int,
+        offset: int
+    ) -> Optional[Tuple[List[Dict[str, Any]], Optional[int]]]:
+        """Evaluate a predicate over every local record of a table."""
+        matches: List[Dict[str, Any]] = []
+        skipped = 0
+        try:
+            for record in self.iter_table(table_id):
+                if not predicate(record):
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                matches.append(record)
+                if len(matches) > max_records:
+                    break
+        except UnsupportedFormula as e:
+            logger.debug(f"Falling back to Airtable for {filter_formula}: {e}")
+            return None
+
+        self.local_reads += 1
+        next_offset = offset + max_records if len(matches) > max_records else None
+        return matches[:max_records], next_offset
+
+    # ---- Syncing -----------------------------------------------------------
+
+    async def sync_table(self, table_id: str, full: bool = False):
+        """Bring one table up to date with Airtable."""
+        lock = self._locks.setdefault(table_id, asyncio.Lock())
+        async with lock:
+            state = self._state(table_id)
+            started = datetime.now(timezone.utc)
+            try:
+                if full or state["watermark"] is None:
+                    await self._full_pull(table_id)
+                    self._save_state(table_id, reconciled_at=time.time())
+                else:
+                    async for records, _ in self.client.iter_pages(
+                        table_id, filter_formula=modified_since_formula(state["watermark"]), use_cache=False
+                    ):
+                        self._upsert(table_id, records)
+                        self.db.commit()
+
+                    reconciled_at = state["reconciled_at"] or 0
+                    if time.time() - reconciled_at >= self.reconcile_interval:
+                        await self._reconcile(table_id)
+                        self._save_state(table_id, reconciled_at=time.time())
+
+            except Exception as e:
+                logger.error(f"Replica sync failed for {table_id}: {e}")
+                self._save_state(table_id, last_error=str(e))
+                raise
+
+            self._save_state(
+                table_id,
+                watermark=_format_timestamp(started - SYNC_OVERLAP),
+                synced_at=time.time(),
+                last_error=None
+            )
+            self.build_indexes(table_id)
+
+    async def _full_pull(self, table_id: str):
+        seen = set()
+        async for records, _ in self.client.iter_pages(table_id, use_cache=False):
+            self._upsert(table_id, records)
+            self.db.commit()
+            seen.update(r["id"] for r in records)
+        self._delete_missing(table_id, seen)
+
+    async def _reconcile(self, table_id: str):
+        """Remove local records that no longer exist in Airtable."""
+        table_name = self.table_names[table_id]
+        scan_field = ID_SCAN_FIELDS.get(table_name)
+        seen = set()
+        async for records, _ in self.client.iter_pages(
+            table_id, fields=[scan_field] if scan_field else None, use_cache=False
+        ):
+            seen.update(r["id"] for r in records)
+        self._delete_missing(table_id, seen)
+
+    def _delete_missing(self, table_id: str, seen: set):
+        local_ids = [
+            row[0] for row in
+            self.db.execute("SELECT record_id FROM records WHERE table_id = ?", (table_id,))
+        ]
+        missing = [record_id for record_id in local_ids if record_id not in seen]
+        if missing:
+            logger.info(f"Replica: removing {len(missing)} deleted record(s) from {table_id}")
+            self._delete(table_id, missing)
+            self.db.commit()
+
+    async def sync_all(self, full: bool = False):
+        """Sync every table concurrently under the shared rate limiter."""
+        results = await asyncio.gather(
+            *(self.sync_table(table_id, full=full) for table_id in self.tables.values()),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+
+    async def run(self):
+        """Background loop keeping the replica within its staleness bound."""
+        # Background syncs must not hold up interactive tool calls
+        request_priority.set("bulk")
+        while True:
+            await self.sync_all()
+            await asyncio.sleep(self.sync_interval)
+
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+# Metadata API field types, mapped to the types validate_fields checks.
+# Anything else (collaborators, barcodes, ...) is passed through unchecked.
+METADATA_FIELD_TYPES = {
+    "singleLineText": "text",
+    "multilineText": "text",
+    "richText": "text",
+    "phoneNumber": "text",
+    "email": "email",
+    "url": "url",
+    "number": "number",
+    "currency": "number",
+    "percent": "number",
+    "rating": "number",
+    "duration": "number",
+    "checkbox": "checkbox",
+    "date": "datetime",
+    "dateTime": "datetime",
+    "singleSelect": "select",
+    "multipleSelects": "multiselect",
+    "multipleRecordLinks": "links",
+    "multipleAttachments": "attachments",
+}
+# Field types Airtable calculates itself
+COMPUTED_FIELD_TYPES = {
+    "formula", "rollup", "count", "lookup", "multipleLookupValues", "autoNumber",
+    "createdTime", "lastModifiedTime", "createdBy", "lastModifiedBy", "button",
+}
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+CHECKBOX_VALUES = {"true": True, "1": True, "yes": True, "x": True, "false": False, "0": False, "no": False}
+
+
+class BaseSchema:
+    """Every table's fields: name, ``fld`` ID, type and select options.
+
+    ``tables[table][field name]`` is ``{"id", "type", "options"}``. Tables
+    missing from a metadata payload keep their built-in definition.
+    ``authoritative`` is set for a schema fresh from the metadata API: only
+    then are writes refused for unknown fields or missing required ones.
+    """
+
+    def __init__(
+        self,
+        tables: Dict[str, Dict[str, Dict[str, Any]]],
+        source: str,
+        authoritative: bool = False
+    ):
+        self.tables = tables
+        self.source = source
+        self.authoritative = authoritative
+        self.loaded_at = time.time()
+        self._names = {
+            table: {spec["id"]: name for name, spec in fields.items() if spec.get("id")}
+            for table, fields in tables.items()
+        }
+
+    @classmethod
+    def from_metadata(cls, payload: Dict[str, Any], source: str, authoritative: bool = False) -> "BaseSchema":
+        """Build from a ``GET /meta/bases/{base}/tables`` response."""
+        tables = dict(FIELD_SCHEMAS)
+        for table in payload.get("tables", []):
+            name = TABLE_NAMES.get(table.get("id"))
+            if name is None:
+                continue
+            fields = {}
+            for field in table.get("fields", []):
+                kind = field.get("type")
+                spec: Dict[str, Any] = {
+                    "id": field.get("id"),
+                    "type": "computed" if kind in COMPUTED_FIELD_TYPES else METADATA_FIELD_TYPES.get(kind, "any"),
+                }
+                choices = (field.get("options") or {}).get("choices")
+                if choices:
+                    spec["options"] = tuple(choice["name"] for choice in choices)
+                fields[field["name"]] = spec
+            tables[name] = fields
+        return cls(tables, source, authoritative)
+
+    def field_name(self, table_name: str, key: str) -> str:
+        """Field name for a name or ``fld`` ID."""
+        return self._names.get(table_name, {}).get(key, key)
+
+    def field_names(self, table_name: str, keys: Optional[List[str]]) -> Optional[List[str]]:
+        if keys is None:
+            return None
+        return [self.field_name(table_name, key) for key in keys]
+
+    def field_id(self, table_name: str, name: str) -> Optional[str]:
+        spec = self.tables.get(table_name, {}).get(name)
+        return spec.get("id") if spec else None
+
+
+schema = BaseSchema(FIELD_SCHEMAS, "built-in")
+
+
+def _coerce_value(spec: Dict[str, Any], value: Any, typecast: bool) -> Any:
+    """Check one value against its field type; CSV strings are converted."""
+    kind = spec["type"]
+    options = spec.get("options") or ()
+
+    if kind == "any":
+        return value
+    if kind == "links":
+        ids = value if isinstance(value, list) else [part for part in re.split(r"[,\s]+", str(value)) if part]
+        for record_id in ids:
+            if not isinstance(record_id, str) or not RECORD_ID_PATTERN.match(record_id):
+                raise ValueError(f"not a record ID: {record_id!r}")
+        return ids
+    if kind == "multiselect":
+        names = value if isinstance(value, list) else [part.strip() for part in str(value).split(",") if part.strip()]
+        unknown = [name for name in names if name not in options]
+        if unknown and not typecast:
+            raise ValueError(f"{unknown[0]!r} is not one of: {', '.join(options)}")
+        return names
+    if kind == "attachments":
+        if isinstance(value, str):
+            value = [{"url": url} for url in value.split()]
+        if not isinstance(value, list) or not all(isinstance(a, dict) and ("url" in a or "id" in a) for a in value):
+            raise ValueError("expected a list of {url} objects")
+        return value
+    if isinstance(value, (list, dict)):
+        raise ValueError("expected a single value")
+
+    if kind == "number":
+        if isinstance(value, bool):
+            raise ValueError("expected a number")
+        if isinstance(value, (int, float)):
+            return value
+        text = str(value).strip()
+        try:
+            return int(text)
+        except ValueError:
+            try:
+                return float(text)
+            except ValueError:
+                raise ValueError(f"expected a number, got {value!r}")
+    if kind == "checkbox":
+        if isinstance(value, bool):
+            return value
+        checked = CHECKBOX_VALUES.get(str(value).strip().lower())
+        if checked is None:
+            raise ValueError(f"expected true or false, got {value!r}")
+        return checked
+
+    text = value if isinstance(value, str) else str(value)
+    if kind == "email" and not EMAIL_PATTERN.match(text):
+        raise ValueError(f"not an email address: {text!r}")
+    if kind == "url" and not text.startswith(("http://", "https://")):
+        raise ValueError(f"not a URL: {text!r}")
+    if kind == "datetime":
+        try:
+            _to_datetime(text)
+        except UnsupportedFormula:
+            raise ValueError(f"not an ISO 8601 date: {text!r}")
+    if kind == "select" and text not in options and not typecast:
+        raise ValueError(f"{text!r} is not one of: {', '.join(options)}")
+    return text
+
+
+def validate_fields(
+    table_name: str,
+    fields: Dict[str, Any],
+    typecast: bool = False,
+    require: bool = True,
+    lenient: bool = False
+) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """Validate a write payload against the schema.
+
+    Field IDs are translated to names. Returns the cleaned fields (CSV
+    strings converted), a list of errors, empty if the record can be
+    written, and a list of warnings. Empty values clear a field. With
+    ``lenient`` (rows read from a file) empty values and computed fields
+    are dropped instead.
+
+    Unless the schema is authoritative (see ``BaseSchema``), it may be
+    missing real fields or guess their types, so every problem is only a
+    warning and the value is sent to Airtable as given.
+    """
+    table_schema = schema.tables[table_name]
+    clean: Dict[str, Any] = {}
+    problems: List[str] = []
+    invalid: Set[str] = set()
+
+    for key, value in fields.items():
+        name = schema.field_name(table_name, key)
+        spec = table_schema.get(name)
+        empty = value is None or value == "" or value == []
+        if lenient and (empty or (spec is not None and spec["type"] == "computed")):
+            continue
+        if spec is None:
+            problems.append(f"unknown field '{key}'")
+            clean[name] = value
+            continue
+        if spec["type"] == "computed":
+            problems.append(f"'{name}' is computed by Airtable and can't be written")
+            clean[name] = value
+            continue
+        if empty:
+            clean[name] = value
+            continue
+        try:
+            clean[name] = _coerce_value(spec, value, typecast)
+        except ValueError as e:
+            invalid.add(name)
+            problems.append(f"{name}: {e}")
+            clean[name] = value
+
+    if require:
+        missing = [
+            name for name in REQUIRED_FIELDS.get(table_name, ())
+            if name in table_schema and clean.get(name) in (None, "", []) and name not in invalid
+        ]
+        if missing:
+            problems.append(f"missing required field(s): {', '.join(missing)}")
+
+    if schema.authoritative:
+        return clean, problems, []
+    return clean, [], problems
+
+
+def prepare_fields(
+    table_name: str,
+    fields: Dict[str, Any],
+    typecast: bool = False,
+    require: bool = False
+) -> Dict[str, Any]:
+    """Translate field IDs and validate a write locally, before spending quota.
+
+    Raises ValueError listing every problem. With ``schema_validation``
+    off, only the IDs are translated.
+    """
+    if not settings.schema_validation:
+        return {schema.field_name(table_name, key): value for key, value in fields.items()}
+    clean, errors, warnings = validate_fields(table_name, fields, typecast, require)
+    if errors:
+        raise ValueError(f"Invalid {table_name} fields: {'; '.join(errors)}")
+    if warnings:
+        logger.warning(f"{table_name} write not checked against {schema.source} schema: {'; '.join(warnings)}")
+    return clean
+
+
+def prepare_batch_fields(
+    table_name: str,
+    index: int,
+    fields: Dict[str, Any],
+    typecast: bool = False,
+    require: bool = False
+) -> Dict[str, Any]:
+    """prepare_fields for one record of a batch; errors name the record."""
+    try:
+        return prepare_fields(table_name, fields, typecast, require)
+    except ValueError as e:
+        raise ValueError(f"Record {index}: {e}")
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def load_schema() -> BaseSchema:
+    """(Re)load the schema from ``schema_source``.
+
+    The metadata API result is saved to ``schema_path``. If the API fails,
+    the schema already loaded is kept, or read from ``schema_path``, or
+    the built-in definitions are used.
+    """
+    global schema
+    if settings.schema_source == "api":
+        try:
+            payload = await airtable.get_base_schema()
+        except Exception as e:
+            logger.warning(f"Could not load the schema from the metadata API: {e}")
+        else:
+            schema = BaseSchema.from_metadata(payload, "metadata API", authoritative=True)
+            try:
+                await asyncio.to_thread(_write_json_atomic, settings.schema_path, payload)
+            except OSError as e:
+                logger.warning(f"Could not save the schema to {settings.schema_path}: {e}")
+            return schema
+        if schema.authoritative:
+            return schema
+
+    if settings.schema_source != "static":
+        try:
+            payload = await asyncio.to_thread(_read_json, settings.schema_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {settings.schema_path} ({e}), using the built-in schema")
+        else:
+            schema = BaseSchema.from_metadata(payload, settings.schema_path)
+    return schema
+
+
+async def refresh_schema_periodically():
+    """Load the schema, then pick up new fields and select options every
+    ``schema_refresh_interval`` seconds. Until the first load completes,
+    writes are checked against the built-in definitions.
+    """
+    while True:
+        await load_schema()
+        logger.info(f"Schema loaded from {schema.source}")
+        if not settings.schema_refresh_interval:
+            return
+        await asyncio.sleep(settings.schema_refresh_interval)
+
+
+@traced_phase("format")
+def format_schema(table_names: List[str]) -> str:
+    """Format the describe_table summary."""
+    age = time.time() - schema.loaded_at
+    lines = [f"📐 Schema from {schema.source}, loaded {age:.0f}s ago", ""]
+    if not schema.authoritative:
+        lines[-1:] = [
+            "   Not from the metadata API: unknown fields, type mismatches and missing",
+            "   required fields are logged as warnings, not refused",
+            ""
+        ]
+    for table_name in table_names:
+        fields = schema.tables[table_name]
+        required = REQUIRED_FIELDS.get(table_name, ())
+        lines.append(f"{table_name} ({TABLES[table_name]}), {len(fields)} fields:")
+        for name, spec in fields.items():
+            kind = spec["type"]
+            if spec.get("options"):
+                kind += f": {', '.join(spec['options'])}"
+            flag = " (required)" if name in required else ""
+            lines.append(f"  • {name} [{spec.get('id') or 'no ID'}] {kind}{flag}")
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+# ============================================================================
+# WRITE-BEHIND
+# ============================================================================
+
+# Errors that retrying a buffered update won't fix; anything else (timeouts,
+# rate limiting, 5xx) puts the update back in the queue
+PERMANENT_WRITE_ERRORS = ("INVALID", "NOT_FOUND", "not found", "Unauthorized", "ROW_DOES_NOT_EXIST")
+# Permanently failed updates kept for the flush tool and server_stats
+MAX_FAILED_UPDATES = 100
+
+RecordKey = Tuple[str, str]
+
+
+def _is_permanent_error(error: str) -> bool:
+    return any(marker in error for marker in PERMANENT_WRITE_ERRORS)
+
+
+class WriteBehindQueue:
+    """Buffers ``update_record`` calls and writes them as batched PATCHes.
+
+    Updates to the same record within ``window`` seconds of its first
+    buffered update are merged (later fields win) and flushed together,
+    10 records per request. Every update is appended to a JSONL journal
+    and fsynced before the caller is acknowledged. A line marking the
+    flush is added once Airtable accepts it. On startup, updates in the
+    journal that were never flushed are replayed, so a crash loses
+    nothing. The journal is truncated whenever the queue drains.
+    """
+
+    def __init__(self, client: "AirtableClient", path: str, window: float):
+        self.client = client
+        self.path = path
+        self.window = window
+        # (table ID, record ID) -> {"fields", "seq", "since"}
+        self.pending: "OrderedDict[RecordKey, Dict[str, Any]]" = OrderedDict()
+        self.failed: Deque[Dict[str, Any]] = deque(maxlen=MAX_FAILED_UPDATES)
+        self.metrics = {"queued": 0, "merged": 0, "flushed": 0, "requests": 0, "failed": 0, "replayed": 0}
+        self._seq = 0
+        self._inflight = 0
+        self._journal_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def _merge(self, key: RecordKey, fields: Dict[str, Any], seq: int, since: float):
+        entry = self.pending.get(key)
+        if entry is None:
+            self.pending[key] = {"fields": dict(fields), "seq": seq, "since": since}
+        else:
+            entry["fields"].update(fields)
+            entry["seq"] = seq
+            self.metrics["merged"] += 1
+
+    def replay(self):
+        """Queue the journal's unflushed updates again."""
+        entries: Dict[RecordKey, List[Tuple[int, Dict[str, Any]]]] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash mid-append was never acknowledged
+                        continue
+                    key = (entry["table"], entry["record"])
+                    self._seq = max(self._seq, entry.get("seq", 0))
+                    if "flushed" in entry:
+                        entries[key] = [e for e in entries.get(key, []) if e[0] > entry["flushed"]]
+                    else:
+                        entries.setdefault(key, []).append((entry["seq"], entry["fields"]))
+        except FileNotFoundError:
+            return
+
+        now = time.monotonic()
+        for key, updates in entries.items():
+            for seq, fields in updates:
+                self._merge(key, fields, seq, now)
+                self.metrics["replayed"] += 1
+        if self.pending:
+            logger.info(f"Write-behind: replayed {len(self.pending)} unflushed update(s) from {self.path}")
+
+    def start(self):
+        """Replay the journal and start the background flusher."""
+        if self._task is None:
+            self.replay()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the flusher and write out everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.pending:
+            await self.flush()
+
+    async def _append(self, entries: List[Dict[str, Any]]):
+        data = _encode_ndjson(entries, compress=False)
+        async with self._journal_lock:
+            await asyncio.to_thread(_append_durably, self.path, data)
+
+    async def _compact(self):
+        # Checked under the lock: an update journaled concurrently is
+        # already in ``pending`` by the time the lock is released
+        async with self._journal_lock:
+            if not self.pending and not self._inflight:
+                await asyncio.to_thread(_append_durably, self.path, b"", 0)
+
+    def _requeue(self, key: RecordKey, entry: Dict[str, Any]):
+        """Put an update back, behind any newer update to the same record."""
+        newer = self.pending.pop(key, None)
+        self.pending[key] = {"fields": dict(entry["fields"]), "seq": entry["seq"], "since": time.monotonic()}
+        if newer is not None:
+            self.pending[key]["fields"].update(newer["fields"])
+            self.pending[key]["seq"] = newer["seq"]
+
+    async def enqueue(self, table_id: str, record_id: str, fields: Dict[str, Any]) -> float:
+        """Journal an update and buffer it; returns seconds until it is due."""
+        self.start()
+        self._seq += 1
+        seq = self._seq
+        await self._append([{"seq": seq, "table": table_id, "record": record_id, "fields": fields}])
+        self._merge((table_id, record_id), fields, seq, time.monotonic())
+        self.metrics["queued"] += 1
+        self._wakeup.set()
+        return max(0.0, self.pending[(table_id, record_id)]["since"] + self.window - time.monotonic())
+
+    async def write_now(self, table_id: str, record_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Update a record immediately, sending its buffered fields along."""
+        key = (table_id, record_id)
+        entry = self.pending.pop(key, None)
+        try:
+            record = await self.client.update_record(
+                table_id, record_id, {**entry["fields"], **fields} if entry else fields
+            )
+        except Exception:
+            if entry is not None:
+                self._requeue(key, entry)
+            raise
+        if entry is not None:
+            await self._append([{"table": table_id, "record": record_id, "flushed": entry["seq"]}])
+            await self._compact()
+        return record
+
+    def has_pending(self, table_id: str, record_ids: List[str]) -> bool:
+        return any((table_id, record_id) in self.pending for record_id in record_ids)
+
+    async def _run(self):
+        while True:
+            if not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            # Entries are queued in order, so the first one is due first
+            oldest = next(iter(self.pending.values()))["since"]
+            delay = oldest + self.window - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await self.flush(due_only=True)
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {e}", exc_info=True)
+                await asyncio.sleep(self.window)
+
+    async def _write(
+        self,
+        table_id: str,
+        entries: List[Tuple[RecordKey, Dict[str, Any]]]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """PATCH ``entries`` 10 per request; returns per-record results and the request count.
+
+        Airtable rejects a whole request for one bad record (e.g. deleted
+        since), so records of rejected multi-record requests are retried
+        one by one and only the bad one fails.
+        """
+        def payload(indexes: List[int]) -> List[Dict[str, Any]]:
+            return [{"id": entries[i][0][1], "fields": entries[i][1]["fields"]} for i in indexes]
+
+        results = await self.client.batch_update_records(table_id, payload(list(range(len(entries)))))
+        requests = -(-len(entries) // BATCH_SIZE)
+        retry = [
+            i for i, result in enumerate(results)
+            if not result["ok"] and _is_permanent_error(result["error"])
+            and min(BATCH_SIZE, len(entries) - i // BATCH_SIZE * BATCH_SIZE) > 1
+        ]
+        if retry:
+            singles = await asyncio.gather(
+                *(self.client.batch_update_records(table_id, payload([i])) for i in retry)
+            )
+            for i, [result] in zip(retry, singles):
+                results[i] = result
+            requests += len(retry)
+        return results, requests
+
+    async def flush(
+        self,
+        keys: Optional[List[RecordKey]] = None,
+        due_only: bool = False
+    ) -> Dict[str, Any]:
+        """Write buffered updates now: all of them, ``keys``, or those past their window.
+
+        Returns ``{"records", "requests", "failed", "requeued", "rejected"}``,
+        ``rejected`` holding this flush's entries of ``failed``.
+        """
+        now = time.monotonic()
+        if keys is None:
+            keys = [
+                key for key, entry in self.pending.items()
+                if not due_only or entry["since"] + self.window <= now
+            ]
+        batch = [(key, self.pending.pop(key)) for key in keys if key in self.pending]
+        summary: Dict[str, Any] = {"records": 0, "requests": 0, "failed": 0, "requeued": 0, "rejected": []}
+        if not batch:
+            return summary
+
+        by_table: Dict[str, List[Tuple[RecordKey, Dict[str, Any]]]] = {}
+        for key, entry in batch:
+            by_table.setdefault(key[0], []).append((key, entry))
+
+        self._inflight += 1
+        try:
+            try:
+                outcomes = await asyncio.gather(*(
+                    self._write(table_id, entries) for table_id, entries in by_table.items()
+                ))
+            except BaseException:
+                for key, entry in batch:
+                    self._requeue(key, entry)
+                raise
+
+            markers = []
+            for (table_id, entries), (results, requests) in zip(by_table.items(), outcomes):
+                summary["requests"] += requests
+                for ((_, record_id), entry), result in zip(entries, results):
+                    key = (table_id, record_id)
+                    if result["ok"]:
+                        summary["records"] += 1
+                    elif _is_permanent_error(result["error"]):
+                        failure = {
+                            "table": TABLE_NAMES.get(table_id, table_id),
+                            "record": record_id,
+                            "fields": entry["fields"],
+                            "error": result["error"],
+                        }
+                        summary["failed"] += 1
+                        summary["rejected"].append(failure)
+                        self.failed.append(failure)
+                        logger.error(f"Write-behind update of {record_id} dropped: {result['error']}")
+                    else:
+                        summary["requeued"] += 1
+                        self._requeue(key, entry)
+                        continue
+                    markers.append({"table": table_id, "record": record_id, "flushed": entry["seq"]})
+
+            self.metrics["flushed"] += summary["records"]
+            self.metrics["requests"] += summary["requests"]
+            self.metrics["failed"] += summary["failed"]
+            if markers:
+                await self._append(markers)
+        finally:
+            self._inflight -= 1
+
+        # Nothing left to replay: start the journal afresh
+        await self._compact()
+        return summary
+
+    async def discard(self, table_id: str, record_ids: List[str]):
+        """Drop buffered updates for records that are being deleted."""
+        markers = []
+        for record_id in record_ids:
+            entry = self.pending.pop((table_id, record_id), None)
+            if entry is not None:
+                markers.append({"table": table_id, "record": record_id, "flushed": entry["seq"]})
+        if markers:
+            await self._append(markers)
+            await self._compact()
+
+
+@traced_phase("format")
+def format_flush_results(queue: WriteBehindQueue, summary: Dict[str, Any]) -> str:
+    """Format the flush tool result."""
+    lines = [
+        f"✅ Flushed {summary['records']} record update(s) in {summary['requests']} request(s)",
+        f"   {len(queue.pending)} still pending, {summary['requeued']} requeued after a transient error",
+    ]
+    rejected = summary["rejected"]
+    if rejected:
+        lines += ["", f"❌ {len(rejected)} update(s) rejected by Airtable (not retried):"]
+        lines += [_format_failure(failure) for failure in rejected]
+    # Failures of background flushes would otherwise go unreported
+    earlier = [failure for failure in queue.failed if not any(failure is r for r in rejected)]
+    if earlier:
+        lines += ["", f"⚠️ {len(earlier)} update(s) rejected by earlier flushes:"]
+        lines += [_format_failure(failure) for failure in earlier]
+    return "\n".join(lines)
+
+
+def _format_failure(failure: Dict[str, Any]) -> str:
+    return f"  • {failure['table']} {failure['record']} {failure['fields']}: {failure['error']}"
+
+
+# ============================================================================
+# AGGREGATION
+# ============================================================================
+
+class Aggregator:
+    """Incremental group-by reducer over a stream of records.
+
+    Memory grows with the number of groups, never with the number of
+    records: each group only keeps one running accumulator per metric.
+    """
+
+    def __init__(self, group_by: List[str], metrics: List[Tuple[str, Optional[str]]]):
+        self.group_by = group_by
+        self.metrics = metrics
+        self.groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        self.matched = 0
+
+    def add(self, record: Dict[str, Any]):
+        fields = record.get("fields", {})
+        key = tuple(
+            "(empty)" if _is_blank(fields.get(name)) else _to_text(fields.get(name))
+            for name in self.group_by
+        )
+        accumulators = self.groups.get(key)
+        if accumulators is None:
+            accumulators = [
+                {"count": 0, "sum": 0.0, "min": None, "max": None}
+                for _ in self.metrics
+            ]
+            self.groups[key] = accumulators
+        self.matched += 1
+
+        for (op, field), acc in zip(self.metrics, accumulators):
+            if field is None:
+                acc["count"] += 1
+                continue
+            value = fields.get(field)
+            if _is_blank(value):
+                continue
+            numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if op in ("sum", "avg") and not numeric:
+                continue
+            acc["count"] += 1
+            if numeric:
+                acc["sum"] += value
+            # min/max also work on text such as ISO dates. Numbers (int or
+            # float alike) are only compared with numbers, text with text
+            comparable = value if numeric else _to_text(value)
+            for bound, better in (("min", operator.lt), ("max", operator.gt)):
+                current = acc[bound]
+                if current is None or (
+                    isinstance(current, str) == isinstance(comparable, str) and better(comparable, current)
+                ):
+                    acc[bound] = comparable
+
+    @staticmethod
+    def _value(op: str, acc: Dict[str, Any]) -> Any:
+        if op == "count":
+            return acc["count"]
+        if op == "sum":
+            return acc["sum"]
+        if op == "avg":
+            return acc["sum"] / acc["count"] if acc["count"] else None
+        return acc[op]
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Results as one dict per group, sorted by group key."""
+        rows = []
+        for key in sorted(self.groups):
+            row: Dict[str, Any] = dict(zip(self.group_by, key))
+            for (op, field), acc in zip(self.metrics, self.groups[key]):
+                label = op if field is None else f"{op}({field})"
+                row[label] = self._value(op, acc)
+            rows.append(row)
+        return rows
+
+
+# ============================================================================
+# ATTACHMENTS
+# ============================================================================
+
+# Fields upload_attachment can write: attachment fields get attachment
+# objects, text and URL fields a comma-separated list of URLs
+UPLOAD_FIELD_TYPES = ("attachments", "text", "url")
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def merge_attachments(kind: str, current: Any, attachments: List[Dict[str, Any]]) -> Any:
+    """Field value with ``attachments`` appended to ``current``, skipping ones already there."""
+    if kind == "attachments":
+        existing = [item for item in current or [] if isinstance(item, dict) and item.get("id")]
+        seen = {(item.get("filename"), item.get("size")) for item in existing}
+        value = [{"id": item["id"]} for item in existing]
+        for attachment in attachments:
+            if (attachment["filename"], attachment["size"]) not in seen:
+                seen.add((attachment["filename"], attachment["size"]))
+                value.append({"url": attachment["url"], "filename": attachment["filename"]})
+        return value
+
+    urls = [url.strip() for url in str(current or "").split(",") if url.strip()]
+    for attachment in attachments:
+        if attachment["url"] not in urls:
+            urls.append(attachment["url"])
+    return ",".join(urls)
+
+
+class UploadIndex:
+    """Uploads files to a base and remembers them by SHA-256.
+
+    The index (content hash -> attachment Airtable returned) is saved to
+    ``path`` after every upload, so identical content, such as the same
+    invoice attached to two tickets, is sent once and its URL reused.
+    Concurrent uploads of the same content share one request, and at most
+    ``concurrency`` files are sent at once, each streamed from disk.
+    """
+
+    def __init__(self, client: AirtableClient, path: str, concurrency: int):
+        self.client = client
+        self.path = path
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._slots = asyncio.Semaphore(concurrency)
+        self._save_lock = asyncio.Lock()
+        self.metrics = {"uploaded": 0, "deduplicated": 0, "failed": 0, "bytes_sent": 0, "bytes_saved": 0}
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """The index, read from ``path`` on first use."""
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.path):
+                try:
+                    self._entries = _read_json(self.path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable upload index {self.path}: {e}")
+        return self._entries
+
+    async def upload(self, path: str) -> Tuple[Dict[str, Any], bool]:
+        """Upload ``path`` unless identical content was uploaded before.
+
+        Returns the attachment and whether this call sent the file.
+        """
+        digest = await asyncio.to_thread(_sha256_file, path)
+        entry = self.entries.get(digest)
+        if entry is None:
+            task = self._inflight.get(digest)
+            if task is None:
+                task = asyncio.ensure_future(self._upload(path, digest))
+                self._inflight[digest] = task
+                task.add_done_callback(lambda done: self._finish_upload(digest, done))
+                return await asyncio.shield(task), True
+            entry = await asyncio.shield(task)
+
+        self.metrics["deduplicated"] += 1
+        self.metrics["bytes_saved"] += entry.get("size") or 0
+        return entry, False
+
+    def _finish_upload(self, digest: str, task: "asyncio.Future[Dict[str, Any]]"):
+        if self._inflight.get(digest) is task:
+            del self._inflight[digest]
+        if not task.cancelled():
+            # Mark the error as retrieved even if every waiter was cancelled
+            task.exception()
+
+    async def _upload(self, path: str, digest: str) -> Dict[str, Any]:
+        filename = os.path.basename(path)
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        async with self._slots:
+            body = MultipartFile(path, filename, content_type)
+            try:
+                data = await self.client.upload_file(body)
+            except Exception:
+                self.metrics["failed"] += 1
+                raise
+
+        entry = {
+            "id": data.get("id"),
+            "url": data["url"],
+            "filename": data.get("filename") or filename,
+            "size": data.get("size") or body.size,
+            "type": content_type,
+            "uploaded_at": _format_timestamp(datetime.now(timezone.utc)),
+        }
+        self.entries[digest] = entry
+        self.metrics["uploaded"] += 1
+        self.metrics["bytes_sent"] += body.size
+        async with self._save_lock:
+            try:
+                await asyncio.to_thread(_write_json_atomic, self.path, dict(self.entries))
+            except OSError as e:
+                logger.warning(f"Could not save the upload index to {self.path}: {e}")
+        return entry
+
+    async def attach(
+        self,
+        table_name: str,
+        record_id: str,
+        field: str,
+        paths: List[str],
+        replace: bool = False
+    ) -> Dict[str, Any]:
+        """Upload ``paths`` and add them to a record's field in one PATCH.
+
+        Files that fail to upload are reported and left out; the others
+        are still attached.
+        """
+        missing = [path for path in paths if not os.path.isfile(path)]
+        if missing:
+            raise ValueError(f"Not a file: {', '.join(missing)}")
+
+        outcomes = await asyncio.gather(*(self.upload(path) for path in paths), return_exceptions=True)
+        files: List[Dict[str, Any]] = []
+        for path, outcome in zip(paths, outcomes):
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                files.append({"path": path, "ok": False, "error": str(outcome)})
+            else:
+                attachment, uploaded = outcome
+                files.append({"path": path, "ok": True, "attachment": attachment, "uploaded": uploaded})
+
+        attachments = [file["attachment"] for file in files if file["ok"]]
+        record = None
+        if attachments:
+            table_id = TABLES[table_name]
+            current = None
+            if not replace:
+                existing = await self.client.get_record(table_id, record_id, use_cache=False)
+                current = existing.get("fields", {}).get(field)
+            kind = schema.tables[table_name][field]["type"]
+            value = merge_attachments(kind, current, attachments)
+            record = await self.client.update_record(table_id, record_id, {field: value})
+
+        return {"table": table_name, "record_id": record_id, "field": field, "files": files, "record": record}
+
+
+@traced_phase("format")
+def format_attach_results(result: Dict[str, Any]) -> str:
+    """Format an upload_attachment result."""
+    files = result["files"]
+    ok = [file for file in files if file["ok"]]
+    uploaded = sum(1 for file in ok if file["uploaded"])
+    target = f"{result['table']} {result['record_id']} ({result['field']})"
+    if result["record"] is None:
+        lines = [f"❌ Nothing attached to {target}: no file could be uploaded"]
+    else:
+        lines = [
+            f"{'✅' if len(ok) == len(files) else '❌'} Attached {len(ok)}/{len(files)} file(s) to {target}: "
+            f"{uploaded} uploaded, {len(ok) - uploaded} already on Airtable"
+        ]
+    for file in files:
+        if file["ok"]:
+            attachment = file["attachment"]
+            how = f"uploaded, {attachment['size'] / 1024:,.1f} KB" if file["uploaded"] else "reused"
+            lines.append(f"  • {file['path']} → {attachment['url']} ({how})")
+        else:
+            lines.append(f"  ❌ {file['path']}: {file['error']}")
+    return "\n".join(lines)
+
+
+# ============================================================================
+# MCP SERVER & TOOLS
+# ============================================================================
+
+class AirtableBase:
+    """A configured base and the components serving it.
+
+    Each base has its own client (token, connection pool, rate limiter,
+    read cache), upload index and, when enabled, its own local replica and
+    write-behind queue, so nothing is shared between bases.
+    """
+
+    def __init__(self, client: AirtableClient):
+        self.name = client.name
+        self.client = client
+        self.replica: Optional[LocalReplica] = None
+        if settings.replica_enabled:
+            self.replica = LocalReplica(
+                client,
+                path=base_path(settings.replica_path, self.name),
+                tables=TABLES,
+                max_staleness=settings.replica_max_staleness,
+                sync_interval=settings.replica_sync_interval,
+                reconcile_interval=settings.replica_reconcile_interval
+            )
+        self.uploads = UploadIndex(
+            client,
+            path=base_path(settings.upload_index_path, self.name),
+            concurrency=settings.upload_concurrency
+        )
+        self.write_behind: Optional[WriteBehindQueue] = None
+        if settings.write_behind_enabled:
+            self.write_behind = WriteBehindQueue(
+                client,
+                path=base_path(settings.write_behind_journal, self.name),
+                window=settings.write_behind_window
+            )
+
+
+def base_path(path: str, base: str) -> str:
+    """Per-base variant of a state file: replica.db -> replica.<base>.db."""
+    if base == DEFAULT_BASE:
+        return path
+    stem, extension = os.path.splitext(path)
+    return f"{stem}.{base}{extension}"
+
+
+# Initialize clients. ``airtable`` is the default base's client.
+airtable = AirtableClient()
+bases: Dict[str, AirtableBase] = {DEFAULT_BASE: AirtableBase(airtable)}
+for base_name, base_config in settings.bases.items():
+    unknown_tables = sorted(set(base_config.tables) - set(TABLES))
+    if unknown_tables:
+        raise ValueError(f"Base {base_name}: unknown table(s) {', '.join(unknown_tables)}")
+    bases[base_name] = AirtableBase(AirtableClient(
+        name=base_name,
+        base_id=base_config.base_id,
+        api_token=base_config.api_token,
+        tables=base_config.tables,
+        rate=base_config.rate_limit_per_sec
+    ))
+
+# Base of the tool call being served, set from its 'base' argument
+current_base: ContextVar[str] = ContextVar("current_base", default=DEFAULT_BASE)
+
+
+def active_base() -> AirtableBase:
+    """The base the current tool call or CLI command works on."""
+    return bases[current_base.get()]
+
+
+def format_record(record: Dict[str, Any]) -> str:
+    """Format a record for display."""
+    record_id = record.get("id", "N/A")
+    fields = record.get("fields", {})
+    created_time = record.get("createdTime", "N/A")
+
+    lines = [
+        f"Record ID: {record_id}",
+        f"Created: {created_time}",
+        "Fields:"
+    ]
+
+    for key, value in fields.items():
+        lines.append(f"  • {key}: {value}")
+
+    return "\n".join(lines)
+
+
+def format_records(records: List[Dict[str, Any]]) -> str:
+    """Format multiple records for display."""
+    if not records:
+        return "No records found."
+
+    lines = [f"Found {len(records)} record(s):\n"]
+
+    for i, record in enumerate(records, 1):
+        lines.append(f"--- Record {i} ---")
+        lines.append(format_record(record))
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def project_fields(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the requested fields of a record."""
+    if not fields:
+        return record
+    record_fields = record.get("fields", {})
+    return {
+        **record,
+        "fields": {name: record_fields[name] for name in fields if name in record_fields}
+    }
+
+
+def iter_records_json(records: List[Dict[str, Any]]) -> Iterator[str]:
+    """Encode records one at a time as compact JSON fragments."""
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    yield "["
+    for i, record in enumerate(records):
+        if i:
+            yield ","
+        yield encoder.encode({
+            "id": record.get("id"),
+            "createdTime": record.get("createdTime"),
+            "fields": record.get("fields", {})
+        })
+    yield "]"
+
+
+def _table_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        value = ", ".join(
+            (
+                item["url"] if "url" in item
+                else json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+            ) if isinstance(item, dict) else str(item)
+            for item in value
+        )
+    elif isinstance(value, dict):
+        value = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return str(value).replace("\t", " ").replace("\r", " ").replace("\n", " ")
+
+
+def format_records_table(records: List[Dict[str, Any]]) -> str:
+    """Format records as tab-separated columns with a header row."""
+    columns: Dict[str, None] = {}
+    for record in records:
+        columns.update(dict.fromkeys(record.get("fields", {})))
+
+    lines = ["\t".join(["id", "createdTime", *columns])]
+    for record in records:
+        fields = record.get("fields", {})
+        lines.append("\t".join([
+            record.get("id", ""),
+            record.get("createdTime", ""),
+            *(_table_cell(fields.get(column)) for column in columns)
+        ]))
+    return "\n".join(lines)
+
+
+@traced_phase("format")
+def render_records(
+    records: List[Dict[str, Any]],
+    output: str = "text",
+    fields: Optional[List[str]] = None,
+    next_cursor: Optional[str] = None,
+    source: Optional[str] = None
+) -> str:
+    """Render read results in the requested output format."""
+    records = [project_fields(record, fields) for record in records]
+
+    if output == "json":
+        parts = [f'{{"count":{len(records)},"records":']
+        parts.extend(iter_records_json(records))
+        if next_cursor:
+            parts.append(f',"cursor":{json.dumps(next_cursor)}')
+        if source:
+            parts.append(f',"source":{json.dumps(source)}')
+        parts.append("}")
+        return "".join(parts)
+
+    if output == "table":
+        text = format_records_table(records)
+        if next_cursor:
+            text += f"\n# cursor: {next_cursor}"
+        if source:
+            text += f"\n# source: {source}"
+        return text
+
+    text = format_records(records) + format_cursor(next_cursor)
+    if source:
+        text += f"\n(Served from {source})"
+    return text
+
+
+@traced_phase("format")
+def render_record(
+    record: Dict[str, Any],
+    output: str = "text",
+    fields: Optional[List[str]] = None,
+    source: Optional[str] = None
+) -> str:
+    """Render a single record in the requested output format."""
+    record = project_fields(record, fields)
+
+    if output == "json":
+        payload = {
+            "id": record.get("id"),
+            "createdTime": record.get("createdTime"),
+            "fields": record.get("fields", {})
+        }
+        if source:
+            payload["source"] = source
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+    if output == "table":
+        text = format_records_table([record])
+        return text + (f"\n# source: {source}" if source else "")
+
+    return format_record(record) + (f"\n(Served from {source})" if source else "")
+
+
+@traced_phase("format")
+def format_aggregate(
+    table: str,
+    aggregator: Aggregator,
+    output: str = "text",
+    source: Optional[str] = None
+) -> str:
+    """Format aggregate_records results."""
+    rows = aggregator.rows()
+
+    if output == "json":
+        payload: Dict[str, Any] = {"matched": aggregator.matched, "groups": rows}
+        if source:
+            payload["source"] = source
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+    columns = list(rows[0].keys()) if rows else []
+
+    def cell(value: Any) -> str:
+        if isinstance(value, float):
+            return f"{value:.2f}".rstrip("0").rstrip(".")
+        return _table_cell(value)
+
+    if output == "table":
+        lines = ["\t".join(columns)]
+        lines.extend("\t".join(cell(row[c]) for c in columns) for row in rows)
+        if source:
+            lines.append(f"# source: {source}")
+        return "\n".join(lines)
+
+    lines = [f"📊 {table}: {aggregator.matched} record(s) matched, {len(rows)} group(s)", ""]
+    for row in rows:
+        lines.append("  • " + ", ".join(f"{c}: {cell(row[c])}" for c in columns))
+    if source:
+        lines.append(f"\n(Served from {source})")
+    return "\n".join(lines)
+
+
+@traced_phase("format")
+def format_batch_results(action: str, results: List[Dict[str, Any]]) -> str:
+    """Format per-record results of a batch operation."""
+    succeeded = [r for r in results if r["ok"]]
+    failed = [r for r in results if not r["ok"]]
+
+    icon = "✅" if not failed else ("⚠️" if succeeded else "❌")
+    lines = [f"{icon} Batch {action}: {len(succeeded)}/{len(results)} succeeded, {len(failed)} failed"]
+
+    upserts = [r["upsert"] for r in succeeded if "upsert" in r]
+    if upserts:
+        lines.append(f"Upsert: {upserts.count('created')} created, {upserts.count('updated')} updated")
+
+    if failed:
+        lines.append("")
+        lines.append("Failed:")
+        for r in failed:
+            lines.append(f"  • #{r['index'] + 1}: {r['error']}")
+
+    if succeeded:
+        lines.append("")
+        lines.append("Succeeded:")
+        for r in succeeded:
+            lines.append(f"  • #{r['index'] + 1} → {r['id']}")
+
+    return "\n".join(lines)
+
+
+# Cursors for pages served from the local replica: "loc<row offset>"
+LOCAL_CURSOR_PREFIX = "loc"
+
+
+def local_replica_for(
+    table_id: str,
+    no_cache: bool = False,
+    cursor: Optional[str] = None,
+    view: Optional[str] = None
+) -> Optional[LocalReplica]:
+    """Return the replica if this read may be served locally, else None."""
+    replica = active_base().replica
+    if replica is None or no_cache or view:
+        return None
+    if cursor:
+        # Scans continue where they started: locally or on Airtable
+        return replica if cursor.startswith(LOCAL_CURSOR_PREFIX) else None
+    return replica if replica.is_fresh(table_id) else None
+
+
+def local_cursor(next_offset: Optional[int]) -> Optional[str]:
+    return None if next_offset is None else f"{LOCAL_CURSOR_PREFIX}{next_offset}"
+
+
+def local_offset(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        return int(cursor[len(LOCAL_CURSOR_PREFIX):])
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def describe_local_source(local: LocalReplica, table_id: str) -> str:
+    """Describe where results served from the local replica came from."""
+    age = local.age(table_id)
+    synced = "never synced" if age is None else f"synced {age:.0f}s ago"
+    return f"local replica, {synced}"
+
+
+async def fetch_linked(
+    table_name: str,
+    record_ids: Set[str],
+    use_cache: bool = True
+) -> Dict[str, Dict[str, Any]]:
+    """Resolve linked record IDs, from the replica when it is fresh."""
+    table_id = TABLES[table_name]
+    found: Dict[str, Dict[str, Any]] = {}
+    local = local_replica_for(table_id, not use_cache)
+    if local is not None:
+        found = {record["id"]: record for record in local.get_many(table_id, record_ids)}
+        local.local_reads += 1
+    missing = record_ids - found.keys()
+    if missing:
+        found.update(await active_base().client.get_records_by_ids(table_id, missing, use_cache))
+    return found
+
+
+async def expand_links(
+    table_name: str,
+    records: List[Dict[str, Any]],
+    expand: List[str],
+    depth: int = 1,
+    use_cache: bool = True
+) -> List[Dict[str, Any]]:
+    """Replace linked record IDs with the linked records, level by level.
+
+    Every ID of a level is collected per target table and resolved in one
+    batch, so 100 tickets linking 30 professionals cost one request rather
+    than 30 ``get_record`` calls. IDs that can't be resolved are kept as is.
+    Records are copied before being changed, as they may be cache entries.
+    """
+    if not expand:
+        return records
+
+    records = [{**record, "fields": dict(record.get("fields", {}))} for record in records]
+    level = [(table_name, record) for record in records]
+    resolved: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    for _ in range(depth):
+        links = [
+            (record, field, target)
+            for name, record in level
+            for field, target in LINKED_FIELDS.get(name, {}).items()
+            if field in expand and isinstance(record["fields"].get(field), list)
+        ]
+
+        wanted: Dict[str, Set[str]] = {}
+        for record, field, target in links:
+            for value in record["fields"][field]:
+                if (
+                    isinstance(value, str)
+                    and RECORD_ID_PATTERN.match(value)
+                    and value not in resolved.get(target, {})
+                ):
+                    wanted.setdefault(target, set()).add(value)
+
+        fetched = await asyncio.gather(
+            *(fetch_linked(target, ids, use_cache) for target, ids in wanted.items())
         )
+        for target, found in zip(wanted, fetched):
+            resolved.setdefault(target, {}).update(found)
+
+        level = []
+        for record, field, target in links:
+            expanded: List[Any] = []
+            for value in record["fields"][field]:
+                linked = resolved.get(target, {}).get(value) if isinstance(value, str) else None
+                if linked is None:
+                    expanded.append(value)
+                    continue
+                copy = {"id": linked["id"], "fields": dict(linked.get("fields", {}))}
+                expanded.append(copy)
+                level.append((target, copy))
+            record["fields"][field] = expanded
+        if not level:
+            break
+
+    return records
+
+
+@traced_phase("format")
+def format_sync_status(table_names: List[str]) -> str:
+    """Format the local replica status for display."""
+    replica = active_base().replica
+    if replica is None:
+        return "Local replica is disabled. Set AIRTABLE_REPLICA_ENABLED=true to enable it."
+
+    lines = [
+        "🗄️ Local replica status",
+        f"Path: {replica.path}",
+        f"Max staleness: {replica.max_staleness:.0f}s",
+        f"Local reads served: {replica.local_reads} ({replica.index_lookups} via indexes)",
+        ""
+    ]
+    for name in table_names:
+        table_id = TABLES[name]
+        state = replica._state(table_id)
+        age = replica.age(table_id)
+        if age is None:
+            status = "not synced yet"
+        elif age <= replica.max_staleness:
+            status = f"fresh ({age:.0f}s behind)"
+        else:
+            status = f"stale ({age:.0f}s behind, reads go to Airtable)"
+
+        lines.append(f"{name}: {status}")
+        lines.append(f"  • Records: {replica.count(table_id)}")
+        indexed = replica._indexes.get(table_id, {})
+        if indexed:
+            lines.append(f"  • Indexed fields: {', '.join(sorted(indexed))}")
+        lines.append(f"  • Watermark: {state['watermark'] or 'N/A'}")
+        if state["reconciled_at"]:
+            lines.append(f"  • Deletions reconciled: {time.time() - state['reconciled_at']:.0f}s ago")
+        if state["last_error"]:
+            lines.append(f"  • Last error: {state['last_error']}")
+    return "\n".join(lines)
+
+
+def format_cursor(next_cursor: Optional[str]) -> str:
+    """Format the pagination hint appended to list results."""
+    if not next_cursor:
+        return ""
+    return f"\nMore records available. Pass cursor=\"{next_cursor}\" to continue."
+
+
+@traced_phase("format")
+def format_stats() -> str:
+    """Format client metrics of the active base for display."""
+    base = active_base()
+    metrics = base.client.metrics
+    limiter = base.client.limiter
+    lines = [
+        "📊 Server statistics" + (f" (base {base.name})" if len(bases) > 1 else ""),
+        "",
+        "Airtable requests:",
+        f"  • Requests: {metrics['requests']:.0f}",
+        f"  • Saved by coalescing identical reads: {metrics['coalesced']:.0f}",
+        f"  • Retries: {metrics['retries']:.0f}",
+        f"  • Time waiting on retries: {metrics['retry_wait_seconds']:.1f}s",
+        f"  • Rate limited (429): {metrics['rate_limited']:.0f}",
+        f"  • Retries exhausted: {metrics['retries_exhausted']:.0f}",
+        "",
+        "Rate limiter:",
+        f"  • Current rate: {limiter.rate:.2f} req/sec (configured: {limiter.max_rate:.0f})",
+        f"  • Max in flight: {limiter.max_in_flight}",
     ]
+    for lane in PRIORITY_LANES:
+        stats = limiter.lane_stats[lane]
+        average = stats["wait_seconds"] / stats["granted"] if stats["granted"] else 0.0
+        lines.append(
+            f"  • Lane {lane} (weight {limiter.weights[lane]:g}): "
+            f"{limiter.queue_depth(lane)} queued, {stats['granted']:.0f} granted, "
+            f"avg wait {average:.2f}s, max wait {stats['max_wait']:.2f}s"
+        )
+
+    cache = base.client.cache
+    if cache is not None:
+        lookups = cache.hits + cache.misses
+        hit_rate = cache.hits / lookups * 100 if lookups else 0.0
+        lines += [
+            "",
+            "Read cache:",
+            f"  • Entries: {len(cache)}/{cache.max_entries}",
+            f"  • Hits: {cache.hits} / Misses: {cache.misses} ({hit_rate:.1f}% hit rate)",
+            f"  • Evictions: {cache.evictions}",
+            f"  • Invalidations: {cache.invalidations}",
+        ]
+
+    write_behind = base.write_behind
+    if write_behind is not None:
+        queue = write_behind.metrics
+        saved = queue["queued"] - queue["requests"]
+        lines += [
+            "",
+            f"Write-behind ({write_behind.window:g}s window):",
+            f"  • Pending: {len(write_behind.pending)} record(s)",
+            f"  • Updates queued: {queue['queued']}, merged: {queue['merged']}, replayed: {queue['replayed']}",
+            f"  • Flushed: {queue['flushed']} record(s) in {queue['requests']} request(s) ({max(saved, 0)} PATCHes saved)",
+            f"  • Rejected by Airtable: {queue['failed']}",
+        ]
+
+    if client_limits is not None:
+        calls = client_limits.metrics
+        lines += [
+            "",
+            f"HTTP clients ({client_limits.max_calls} concurrent call(s) each):",
+            f"  • Sessions: {client_limits.clients}, calls running: {client_limits.in_flight}",
+            f"  • Calls: {calls['calls']}, waited for a slot: {calls['waited']}, refused while draining: {calls['refused']}",
+        ]
+
+    uploads = base.uploads.metrics
+    if uploads["uploaded"] or uploads["deduplicated"] or uploads["failed"]:
+        lines += [
+            "",
+            f"Uploads ({base.uploads.path}):",
+            f"  • Uploaded: {uploads['uploaded']} file(s), {uploads['bytes_sent'] / 2**20:.1f} MB",
+            f"  • Deduplicated: {uploads['deduplicated']} file(s), {uploads['bytes_saved'] / 2**20:.1f} MB not sent",
+            f"  • Failed: {uploads['failed']}",
+        ]
+
+    feeds = change_hashes.metrics
+    if feeds["polls"]:
+        lines += [
+            "",
+            "Change feeds:",
+            f"  • Polls: {feeds['polls']}, records scanned: {feeds['scanned']}",
+            f"  • Reported: {feeds['reported']}, unchanged skipped: {feeds['suppressed']}",
+            f"  • Content hashes: {len(change_hashes)}/{change_hashes.max_entries}",
+        ]
+
+    durations = metrics_registry.by_label("mcp_tool_duration_seconds", "tool")
+    if durations:
+        phases = {
+            "validation": metrics_registry.by_label("mcp_tool_validation_seconds", "tool"),
+            "limiter": metrics_registry.by_label("airtable_limiter_wait_seconds", "tool"),
+            "http": metrics_registry.by_label("airtable_http_seconds", "tool"),
+            "format": metrics_registry.by_label("mcp_tool_format_seconds", "tool"),
+        }
+        sizes = metrics_registry.by_label("mcp_tool_response_bytes", "tool")
+        lines += ["", "Tool latency (p50 / p95 / p99, then time per call by phase):"]
+        for tool, histogram in sorted(durations.items()):
+            breakdown = ", ".join(
+                f"{phase} {by_tool[tool].sum / histogram.count * 1000:.1f}ms"
+                for phase, by_tool in phases.items() if tool in by_tool
+            )
+            lines.append(
+                f"  • {tool}: {histogram.count} call(s), "
+                f"{histogram.quantile(0.5) * 1000:.0f} / {histogram.quantile(0.95) * 1000:.0f} / "
+                f"{histogram.quantile(0.99) * 1000:.0f}ms; {breakdown}; "
+                f"{sizes[tool].mean / 1024:.1f} KB avg response"
+            )
+
+    http_by_table = metrics_registry.by_label("airtable_http_seconds", "table")
+    if http_by_table:
+        waits = metrics_registry.by_label("airtable_limiter_wait_seconds", "table")
+        retries = metrics_registry.by_label("airtable_request_retries", "table")
+        lines += ["", "Airtable latency by table (p50 / p95):"]
+        for table, histogram in sorted(http_by_table.items()):
+            wait = waits.get(table, Histogram(LATENCY_BUCKETS))
+            lines.append(
+                f"  • {table}: {histogram.count} request(s), http "
+                f"{histogram.quantile(0.5) * 1000:.0f} / {histogram.quantile(0.95) * 1000:.0f}ms, "
+                f"limiter wait {wait.quantile(0.5) * 1000:.0f} / {wait.quantile(0.95) * 1000:.0f}ms, "
+                f"{retries[table].sum if table in retries else 0:.0f} retries"
+            )
+    return "\n".join(lines)
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+EXPORT_FORMATS = ("ndjson", "ndjson.gz", "parquet")
+# Parquet is written as a directory of part files, one per this many pages
+PARQUET_PAGES_PER_PART = 50
+# Airtable's error when a list offset is too old to resume from
+EXPIRED_OFFSET_ERROR = "LIST_RECORDS_ITERATOR_NOT_AVAILABLE"
+
+
+def default_export_dir() -> str:
+    """Export directory of the active base; extra bases get a subdirectory."""
+    base_name = current_base.get()
+    return settings.export_dir if base_name == DEFAULT_BASE else os.path.join(settings.export_dir, base_name)
+
+
+def _write_json_atomic(path: str, payload: Dict[str, Any]):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _encode_ndjson(records: List[Dict[str, Any]], compress: bool) -> bytes:
+    data = "".join(
+        json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for record in records
+    ).encode("utf-8")
+    # One gzip member per page: a file truncated at any checkpoint is still valid
+    return gzip.compress(data, compresslevel=6) if compress else data
+
+
+def _append_durably(path: str, data: bytes, truncate_to: Optional[int] = None) -> int:
+    """Append ``data`` to ``path``, fsync it and return the new file size."""
+    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        if truncate_to is not None:
+            f.truncate(truncate_to)
+        f.seek(0, os.SEEK_END)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def _write_parquet_part(path: str, records: List[Dict[str, Any]]):
+    """Write one Parquet part: id, createdTime and the fields as JSON."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    table = pa.table({
+        "id": [record["id"] for record in records],
+        "createdTime": [record.get("createdTime") for record in records],
+        "fields": [
+            json.dumps(record.get("fields", {}), ensure_ascii=False, separators=(",", ":"))
+            for record in records
+        ],
+    })
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+async def export_table(
+    table_name: str,
+    directory: str,
+    format: str = "ndjson.gz",
+    fields: Optional[List[str]] = None,
+    restart: bool = False
+) -> Dict[str, Any]:
+    """Stream one table to disk, checkpointing as it goes.
+
+    Only one page (or one Parquet part) is held in memory. After each
+    durable write a checkpoint records Airtable's next offset and how much
+    of the output is valid, so an interrupted export resumes from there
+    (the output is first truncated back to the checkpoint). The checkpoint
+    is removed once the table is complete.
+    """
+    table_id = TABLES[table_name]
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{table_name}.{format}")
+    checkpoint_path = f"{path}.checkpoint.json"
+
+    checkpoint = None if restart else _load_checkpoint(checkpoint_path)
+    if checkpoint is not None and (checkpoint.get("format") != format or checkpoint.get("fields") != fields):
+        logger.warning(f"Ignoring {checkpoint_path}: it was written for a different format or field list")
+        checkpoint = None
+    if checkpoint is None:
+        checkpoint = {"format": format, "fields": fields, "offset": None, "records": 0, "bytes": 0, "part": 0}
+    resumed_at = checkpoint["records"] if checkpoint["offset"] else 0
+
+    if format == "parquet":
+        os.makedirs(path, exist_ok=True)
+        # Drop parts written after the last checkpoint
+        for name in os.listdir(path):
+            if name.startswith("part-") and int(name[5:10]) >= checkpoint["part"]:
+                os.remove(os.path.join(path, name))
+    elif not checkpoint["offset"] and os.path.exists(path):
+        os.remove(path)
+
+    started = time.perf_counter()
+    buffer: List[Dict[str, Any]] = []
+    buffered_pages = 0
+    truncate_to: Optional[int] = checkpoint["bytes"]
+
+    try:
+        pages = active_base().client.iter_pages(table_id, offset=checkpoint["offset"], fields=fields, use_cache=False)
+        async for records, next_offset in pages:
+            if format == "parquet":
+                buffer.extend(records)
+                buffered_pages += 1
+                if buffered_pages < PARQUET_PAGES_PER_PART and next_offset:
+                    continue
+                part_path = os.path.join(path, f"part-{checkpoint['part']:05d}.parquet")
+                await asyncio.to_thread(_write_parquet_part, part_path, buffer)
+                checkpoint["part"] += 1
+                checkpoint["records"] += len(buffer)
+                buffer, buffered_pages = [], 0
+            else:
+                data = _encode_ndjson(records, compress=format == "ndjson.gz")
+                checkpoint["bytes"] = await asyncio.to_thread(_append_durably, path, data, truncate_to)
+                checkpoint["records"] += len(records)
+                truncate_to = None
+
+            checkpoint["offset"] = next_offset
+            if next_offset:
+                await asyncio.to_thread(_write_json_atomic, checkpoint_path, checkpoint)
+    except Exception as e:
+        if checkpoint["offset"] and EXPIRED_OFFSET_ERROR in str(e):
+            logger.warning(f"Checkpoint offset for {table_name} expired, exporting from scratch")
+            return await export_table(table_name, directory, format, fields, restart=True)
+        raise
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    if format == "parquet":
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    else:
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+
+    return {
+        "table": table_name,
+        "path": path,
+        "records": checkpoint["records"],
+        "resumed_at": resumed_at,
+        "bytes": size,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+async def export_tables(
+    table_names: List[str],
+    directory: str,
+    format: str = "ndjson.gz",
+    fields: Optional[List[str]] = None,
+    restart: bool = False
+) -> List[Any]:
+    """Export tables concurrently; returns a summary or exception per table."""
+    if format == "parquet":
+        # Fail fast rather than after the first 50 pages
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    return await asyncio.gather(
+        *(export_table(name, directory, format, fields, restart) for name in table_names),
+        return_exceptions=True
+    )
+
+
+@traced_phase("format")
+def format_export_results(directory: str, results: List[Any]) -> str:
+    """Format export_table results."""
+    exported = [r for r in results if isinstance(r, dict)]
+    lines = [f"✅ Exported {len(exported)}/{len(results)} table(s) to {directory}:", ""]
+    for result in results:
+        if isinstance(result, Exception):
+            lines.append(f"  ❌ {result} (run again to resume)")
+            continue
+        resumed = f", resumed after {result['resumed_at']:,}" if result["resumed_at"] else ""
+        lines.append(
+            f"  • {result['table']}: {result['records']:,} records{resumed} → {result['path']} "
+            f"({result['bytes'] / 1024:,.1f} KB, {result['seconds']:.1f}s)"
+        )
+    return "\n".join(lines)
+
+
+# ============================================================================
+# IMPORT
+# ============================================================================
+
+IMPORT_FORMATS = ("csv", "ndjson")
+# Row errors listed in the report; all of them go to the errors file
+MAX_REPORTED_ERRORS = 20
+
+
+def _import_format(path: str, format: Optional[str]) -> str:
+    if format:
+        return format
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    raise ValueError(f"Cannot tell the format of {path}; set the format to csv or ndjson")
+
+
+def _iter_import_rows(path: str, format: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield ``(line, fields, error)`` for each row of a CSV or NDJSON file.
+
+    CSV headers are field names. An NDJSON line is either a field object or
+    an Airtable record with a ``fields`` key, so export_table output can be
+    imported back.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8-sig", newline="") as f:
+        if format == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                if None in row:
+                    yield reader.line_num, None, "more values than header columns"
+                    continue
+                yield reader.line_num, row, None
+            return
+
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, None, f"invalid JSON: {e}"
+                continue
+            if isinstance(row, dict) and isinstance(row.get("fields"), dict):
+                row = row["fields"]
+            if not isinstance(row, dict):
+                yield line_number, None, "expected a JSON object"
+                continue
+            yield line_number, row, None
+
+
+def _source_signature(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+async def _write_import_batch(
+    table_id: str,
+    rows: List[Tuple[int, Dict[str, Any]]],
+    typecast: bool,
+    merge_on: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """Write up to 10 rows in one request; returns one batch result per row.
+
+    Airtable rejects the whole request if any record is invalid, so a
+    rejected batch is retried row by row to pin the error on its row.
+    """
+    client = active_base().client
+    fields = [row_fields for _, row_fields in rows]
+    if merge_on:
+        results = await client.batch_update_records(
+            table_id, [{"fields": f} for f in fields], fields_to_merge_on=merge_on, typecast=typecast
+        )
+    else:
+        results = await client.batch_create_records(table_id, fields, typecast=typecast)
+
+    rejected = not results[0]["ok"] and results[0]["error"].startswith("Airtable API error")
+    if len(rows) > 1 and rejected:
+        singles = await asyncio.gather(
+            *(_write_import_batch(table_id, [row], typecast, merge_on) for row in rows)
+        )
+        return [result for [result] in singles]
+    return results
+
+
+async def import_records(
+    table_name: str,
+    path: str,
+    format: Optional[str] = None,
+    dry_run: bool = False,
+    typecast: bool = False,
+    merge_on: Optional[List[str]] = None,
+    restart: bool = False
+) -> Dict[str, Any]:
+    """Stream a CSV or NDJSON file into a table, 10 records per request.
+
+    Up to ``max_concurrent_requests`` batches are in flight at once, so the
+    import runs at whatever rate the limiter allows. Results are applied in
+    file order: rejected rows are appended to ``<path>.<TABLE>.errors.ndjson``
+    (``<path>.<base>.<TABLE>.errors.ndjson`` for an extra base), importable
+    once fixed, and a checkpoint records the last line written.
+    Re-running an interrupted import skips the lines already done. Batches
+    in flight when it stopped may be written twice unless ``merge_on`` is
+    set.
+    """
+    table_id = TABLES[table_name]
+    format = _import_format(path, format)
+    if not os.path.exists(path):
+        raise ValueError(f"File not found: {path}")
+    merge_on = schema.field_names(table_name, merge_on)
+    for field in merge_on or []:
+        if schema.authoritative and field not in schema.tables[table_name]:
+            raise ValueError(f"merge_on: unknown field '{field}'")
+
+    base_name = current_base.get()
+    prefix = f"{path}.{table_name}" if base_name == DEFAULT_BASE else f"{path}.{base_name}.{table_name}"
+    checkpoint_path = f"{prefix}.checkpoint.json"
+    errors_path = f"{prefix}.errors.ndjson"
+    source = _source_signature(path)
+
+    checkpoint = None if restart or dry_run else _load_checkpoint(checkpoint_path)
+    if checkpoint is not None and (checkpoint.get("source") != source or checkpoint.get("merge_on") != merge_on):
+        logger.warning(f"Ignoring {checkpoint_path}: the file or merge_on changed since it was written")
+        checkpoint = None
+    if checkpoint is None:
+        checkpoint = {
+            "source": source, "merge_on": merge_on, "line": 0,
+            "written": 0, "invalid": 0, "failed": 0, "errors_bytes": 0,
+        }
+        if not dry_run and os.path.exists(errors_path):
+            os.remove(errors_path)
+    resumed_at = checkpoint["line"]
+
+    report: Dict[str, Any] = {
+        "table": table_name,
+        "path": path,
+        "dry_run": dry_run,
+        "resumed_at": resumed_at,
+        "rows": 0,
+        "valid": 0,
+        "created": 0,
+        "updated": 0,
+        "errors": [],
+        "errors_path": None if dry_run else errors_path,
+    }
+    truncate_to: Optional[int] = checkpoint["errors_bytes"]
+    # Schema warnings already logged, so each is logged once per import
+    warned: Set[str] = set()
+    # (last line, rows, rejected rows, write task) per batch, in file order
+    window: Deque[Tuple[int, List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]], Optional[asyncio.Task]]] = deque()
+    started = time.perf_counter()
+
+    def reject(line: int, error: str, fields: Optional[Dict[str, Any]], errors: List[Dict[str, Any]]):
+        errors.append({"line": line, "error": error, "fields": fields})
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line, "error": error})
+
+    async def complete_oldest():
+        nonlocal truncate_to
+        last_line, rows, errors, task = window[0]
+        results = await task if task is not None else []
+        window.popleft()
+        checkpoint["invalid"] += len(errors)
+        for (line, fields), result in zip(rows, results):
+            if result["ok"]:
+                checkpoint["written"] += 1
+                report["updated" if result.get("upsert") == "updated" else "created"] += 1
+            else:
+                checkpoint["failed"] += 1
+                reject(line, result["error"], fields, errors)
+        if errors:
+            data = _encode_ndjson(errors, compress=False)
+            checkpoint["errors_bytes"] = await asyncio.to_thread(_append_durably, errors_path, data, truncate_to)
+            truncate_to = None
+        checkpoint["line"] = last_line
+        await asyncio.to_thread(_write_json_atomic, checkpoint_path, checkpoint)
+
+    def submit(line: int, rows: List[Tuple[int, Dict[str, Any]]], errors: List[Dict[str, Any]]):
+        task = asyncio.create_task(_write_import_batch(table_id, rows, typecast, merge_on)) if rows else None
+        window.append((line, rows, errors, task))
+
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    batch_errors: List[Dict[str, Any]] = []
+    line = resumed_at
+    try:
+        for line, row, error in _iter_import_rows(path, format):
+            if line <= resumed_at:
+                continue
+            report["rows"] += 1
+            if error is None:
+                fields, problems, warnings = validate_fields(table_name, row, typecast, lenient=True)
+                error = "; ".join(problems) if problems else None
+                for warning in set(warnings) - warned:
+                    logger.warning(f"{table_name} import not checked against {schema.source} schema: {warning}")
+                    warned.add(warning)
+
+            if dry_run:
+                if error is None:
+                    report["valid"] += 1
+                else:
+                    checkpoint["invalid"] += 1
+                    reject(line, error, row, [])
+                continue
+
+            if error is not None:
+                reject(line, error, row, batch_errors)
+            else:
+                batch.append((line, fields))
+            if len(batch) == BATCH_SIZE:
+                submit(line, batch, batch_errors)
+                batch, batch_errors = [], []
+                # Keep max_concurrent_requests batches in flight; record
+                # finished ones as soon as they are at the head of the queue
+                while len(window) >= settings.max_concurrent_requests or window[0][3].done():
+                    await complete_oldest()
+                    if not window:
+                        break
+            elif report["rows"] % 1000 == 0:
+                # Reading is synchronous: let in-flight batches make progress
+                await asyncio.sleep(0)
+
+        if batch or batch_errors:
+            submit(line, batch, batch_errors)
+        while window:
+            await complete_oldest()
+    finally:
+        for _, _, _, task in window:
+            if task is not None:
+                task.cancel()
+
+    if not dry_run and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    report.update(
+        written=checkpoint["written"],
+        invalid=checkpoint["invalid"],
+        failed=checkpoint["failed"],
+        seconds=time.perf_counter() - started,
+    )
+    if dry_run or not checkpoint["invalid"] + checkpoint["failed"]:
+        report["errors_path"] = None
+    return report
+
+
+@traced_phase("format")
+def format_import_report(report: Dict[str, Any]) -> str:
+    """Format an import_records report."""
+    rate = report["rows"] / report["seconds"] if report["seconds"] else 0.0
+    rejected = report["invalid"] + report["failed"]
+    if report["dry_run"]:
+        lines = [
+            f"{'✅' if not rejected else '❌'} Dry run of {report['path']} → {report['table']}: "
+            f"{report['valid']:,} valid row(s), {report['invalid']:,} invalid"
+        ]
+    else:
+        upserted = f" ({report['created']:,} created, {report['updated']:,} updated)" if report["updated"] else ""
+        lines = [
+            f"{'✅' if not rejected else '❌'} Imported {report['path']} → {report['table']}: "
+            f"{report['written']:,} written{upserted}, {report['invalid']:,} invalid, {report['failed']:,} failed"
+        ]
+    resumed = f", resumed after line {report['resumed_at']:,}" if report["resumed_at"] else ""
+    lines.append(f"   {report['rows']:,} rows in {report['seconds']:.1f}s ({rate:,.1f} rows/s){resumed}")
+
+    if report["errors"]:
+        lines.append("")
+        for error in report["errors"]:
+            lines.append(f"  • line {error['line']}: {error['error']}")
+        if rejected > len(report["errors"]):
+            lines.append(f"  … and {rejected - len(report['errors']):,} more")
+    if report["errors_path"]:
+        lines.append(f"\nRejected rows: {report['errors_path']} (fix and import it to retry)")
+    return "\n".join(lines)
+
+
+# ============================================================================
+# CHANGE FEED
+# ============================================================================
+
+# Cursors returned by changes_since: "chg" + base64url(JSON feed state)
+CHANGE_CURSOR_PREFIX = "chg"
+
+
+class ChangeHashes:
+    """Content hash of the last version of each record a change feed returned.
+
+    A record Airtable reports as modified is only returned again if its
+    (projected) fields hash differently, which drops re-fetches caused by
+    the watermark overlap and edits to fields the caller did not ask for.
+    Bounded LRU shared by all feeds; an evicted hash only means the record
+    may be reported once more.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._hashes: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.metrics = {"polls": 0, "scanned": 0, "reported": 0, "suppressed": 0}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def changed(self, feed: str, record: Dict[str, Any]) -> bool:
+        """Remember the record's hash and return whether it differs from the last one."""
+        payload = json.dumps(record.get("fields", {}), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        digest = hashlib.blake2b(payload.encode(), digest_size=16).digest()
+        key = (feed, record["id"])
+        previous = self._hashes.pop(key, None)
+        self._hashes[key] = digest
+        if len(self._hashes) > self.max_entries:
+            self._hashes.popitem(last=False)
+        if previous == digest:
+            self.metrics["suppressed"] += 1
+            return False
+        self.metrics["reported"] += 1
+        return True
+
+
+change_hashes = ChangeHashes(settings.change_feed_max_hashes)
+
+
+def _parse_since(since: str) -> str:
+    """Normalize a caller-supplied ISO 8601 timestamp to Airtable's format."""
+    try:
+        value = datetime.fromisoformat(since.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid since: {since!r} is neither an ISO 8601 timestamp nor a changes_since cursor")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return _format_timestamp(value)
+
 
+def encode_change_cursor(state: Dict[str, Any]) -> str:
+    payload = json.dumps(state, separators=(",", ":")).encode()
+    return CHANGE_CURSOR_PREFIX + base64.urlsafe_b64encode(payload).decode().rstrip("=")
 
-@server.call_tool()
-async def call_tool(name: str, arguments: Any) -> List[TextContent]:
-    """Handle tool calls."""
+
+def decode_change_cursor(cursor: str) -> Dict[str, Any]:
+    encoded = cursor[len(CHANGE_CURSOR_PREFIX):]
     try:
-        if name == "list_records":
-            # Validate input
-            input_data = ListRecordsInput(**arguments)
-            table_id = TABLES[input_data.table]
+        state = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+        if not isinstance(state, dict) or not {"table", "base", "feed", "watermark"} <= state.keys():
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return state
 
-            logger.info(f"Listing records from {input_data.table} (max: {input_data.max_records})")
 
-            # Fetch records
-            records = await airtable.list_records(
-                table_id,
-                view=input_data.view,
-                max_records=input_data.max_records
+async def changes_since(
+    table_name: str,
+    since: Optional[str],
+    max_records: int = 100,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Records of a table created or modified since a watermark or cursor.
+
+    A feed scans ``LAST_MODIFIED_TIME()``/``CREATED_TIME()`` after its
+    watermark in pages of ``max_records``; when a scan is complete the
+    watermark moves to the time the scan started, and the next scan
+    reaches back SYNC_OVERLAP before it. Without ``since`` the feed starts
+    now and only its cursor is returned. Records
+    whose content hash matches what the feed last returned are skipped, so
+    an idle poll costs one request and returns nothing. Deletions are not
+    reported.
+    """
+    base = current_base.get()
+    table_id = TABLES[table_name]
+
+    if since and since.startswith(CHANGE_CURSOR_PREFIX):
+        state = decode_change_cursor(since)
+        if (state["table"], state["base"]) != (table_name, base):
+            raise ValueError(
+                f"This cursor belongs to {state['table']} in base '{state['base']}', not {table_name} in '{base}'"
             )
+    else:
+        watermark = _parse_since(since) if since else _format_timestamp(datetime.now(timezone.utc))
+        # The first scan starts exactly at the caller's watermark; later ones overlap the previous scan
+        state = {
+            "table": table_name,
+            "base": base,
+            "feed": os.urandom(8).hex(),
+            "watermark": watermark,
+            "from": watermark,
+        }
+        if not since:
+            # Start watching from now: nothing to fetch yet
+            return {
+                "table": table_name,
+                "since": state["watermark"],
+                "created": [],
+                "modified": [],
+                "unchanged": 0,
+                "cursor": encode_change_cursor(state),
+                "more": False,
+            }
 
-            result = format_records(records)
-            return [TextContent(type="text", text=result)]
+    if not state.get("offset"):
+        # A new scan: everything changed between the watermark and now
+        state["scan_started"] = _format_timestamp(datetime.now(timezone.utc))
+        state.setdefault("from", _format_timestamp(
+            datetime.fromisoformat(state["watermark"].replace("Z", "+00:00")) - SYNC_OVERLAP
+        ))
+    formula = modified_since_formula(state["from"])
 
-        elif name == "get_record":
-            # Validate input
-            input_data = GetRecordInput(**arguments)
-            table_id = TABLES[input_data.table]
+    client = active_base().client
+    try:
+        records, next_offset = await client.collect_records(
+            table_id,
+            max_records=max_records,
+            filter_formula=formula,
+            offset=state.get("offset"),
+            fields=fields,
+            use_cache=False
+        )
+    except Exception as e:
+        if not (state.get("offset") and EXPIRED_OFFSET_ERROR in str(e)):
+            raise
+        # Rescan from the same watermark; records already returned hash the same and are skipped
+        logger.warning(f"Change feed offset for {table_name} expired, rescanning since {state['watermark']}")
+        state["offset"] = None
+        state["scan_started"] = _format_timestamp(datetime.now(timezone.utc))
+        records, next_offset = await client.collect_records(
+            table_id,
+            max_records=max_records,
+            filter_formula=formula,
+            fields=fields,
+            use_cache=False
+        )
 
-            logger.info(f"Getting record {input_data.record_id} from {input_data.table}")
+    created: List[Dict[str, Any]] = []
+    modified: List[Dict[str, Any]] = []
+    for record in records:
+        record = project_fields(record, fields)
+        if not change_hashes.changed(state["feed"], record):
+            continue
+        (created if record.get("createdTime", "") >= state["watermark"] else modified).append(record)
+    change_hashes.metrics["polls"] += 1
+    change_hashes.metrics["scanned"] += len(records)
 
-            # Fetch record
-            record = await airtable.get_record(table_id, input_data.record_id)
+    if next_offset:
+        next_state = {**state, "offset": next_offset}
+    else:
+        next_state = {
+            "table": table_name,
+            "base": base,
+            "feed": state["feed"],
+            "watermark": state["scan_started"],
+        }
 
-            result = format_record(record)
-            return [TextContent(type="text", text=result)]
+    return {
+        "table": table_name,
+        "since": state["watermark"],
+        "created": created,
+        "modified": modified,
+        "unchanged": len(records) - len(created) - len(modified),
+        "cursor": encode_change_cursor(next_state),
+        "more": bool(next_offset),
+    }
 
-        elif name == "search_records":
-            # Validate input
-            input_data = SearchRecordsInput(**arguments)
-            table_id = TABLES[input_data.table]
 
-            logger.info(f"Searching {input_data.table} with formula: {input_data.filter_formula}")
+@traced_phase("format")
+def format_changes(result: Dict[str, Any], output: str = "text") -> str:
+    """Render a changes_since result in the requested output format."""
+    if output == "json":
+        parts = ['{"created":']
+        parts.extend(iter_records_json(result["created"]))
+        parts.append(',"modified":')
+        parts.extend(iter_records_json(result["modified"]))
+        parts.append(
+            f',"unchanged":{result["unchanged"]},"cursor":{json.dumps(result["cursor"])},'
+            f'"more":{json.dumps(result["more"])}}}'
+        )
+        return "".join(parts)
+
+    if output == "table":
+        tagged = [
+            {**record, "fields": {"change": change, **record.get("fields", {})}}
+            for change in ("created", "modified") for record in result[change]
+        ]
+        text = format_records_table(tagged)
+        text += f"\n# cursor: {result['cursor']}"
+        if result["more"]:
+            text += "\n# more: true"
+        return text
+
+    changed = len(result["created"]) + len(result["modified"])
+    skipped = f" ({result['unchanged']} unchanged skipped)" if result["unchanged"] else ""
+    if not changed:
+        lines = [f"No changes in {result['table']} since {result['since']}{skipped}."]
+    else:
+        lines = [
+            f"🔄 {result['table']} since {result['since']}: {len(result['created'])} created, "
+            f"{len(result['modified'])} modified{skipped}",
+            ""
+        ]
+        for change in ("created", "modified"):
+            for record in result[change]:
+                lines.append(f"--- {change.capitalize()} ---")
+                lines.append(format_record(record))
+                lines.append("")
+    if result["more"]:
+        lines.append("More changes pending. Call again right away with:")
+    else:
+        lines.append("Poll again later with:")
+    lines.append(f'since="{result["cursor"]}"')
+    return "\n".join(lines)
 
-            # Search records
-            records = await airtable.search_records(
-                table_id,
-                input_data.filter_formula,
-                max_records=input_data.max_records
-            )
 
-            result = format_records(records)
-            return [TextContent(type="text", text=result)]
+# ============================================================================
+# TOOL REGISTRY
+# ============================================================================
 
-        elif name == "create_record":
-            # Validate input
-            input_data = CreateRecordInput(**arguments)
-            table_id = TABLES[input_data.table]
+ToolHandler = Callable[[Any], Awaitable[str]]
 
-            logger.info(f"Creating record in {input_data.table}")
 
-            # Create record
-            record = await airtable.create_record(table_id, input_data.fields)
+class ToolSpec:
+    """An MCP tool: its input model, handler, JSON schema and priority lane.
 
-            result = f"✅ Record created successfully!\n\n{format_record(record)}"
-            return [TextContent(type="text", text=result)]
+    The schema is generated from the input model once, at registration.
+    """
 
-        elif name == "update_record":
-            # Validate input
-            input_data = UpdateRecordInput(**arguments)
-            table_id = TABLES[input_data.table]
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        model: Type[BaseModel],
+        handler: ToolHandler,
+        priority: str
+    ):
+        self.name = name
+        self.description = description
+        self.model = model
+        self.handler = handler
+        self.input_schema = tool_input_schema(model)
+        self.priority = priority
 
-            logger.info(f"Updating record {input_data.record_id} in {input_data.table}")
 
-            # Update record
-            record = await airtable.update_record(
-                table_id,
-                input_data.record_id,
-                input_data.fields
+# Tool name -> spec, in the order the tools are listed
+TOOLS: Dict[str, ToolSpec] = {}
+
+
+def tool(
+    name: str,
+    description: str,
+    model: Type[BaseModel],
+    priority: str = "normal"
+) -> Callable[[ToolHandler], ToolHandler]:
+    """Register the decorated coroutine as a tool handler.
+
+    The handler receives the validated input model and returns the text
+    sent back to the client; errors are reported by ``handle_tool``.
+    """
+    def decorator(handler: ToolHandler) -> ToolHandler:
+        if name in TOOLS:
+            raise ValueError(f"Tool {name} is already registered")
+        TOOLS[name] = ToolSpec(name, description, model, handler, priority)
+        return handler
+    return decorator
+
+
+@tool(
+    name="list_records",
+    description="List records from an Airtable table with optional view and limit",
+    model=ListRecordsInput
+)
+async def list_records_tool(input_data: ListRecordsInput) -> str:
+    table_id = TABLES[input_data.table]
+
+    logger.info(f"Listing records from {input_data.table} (max: {input_data.max_records})")
+
+    local = local_replica_for(
+        table_id, input_data.no_cache, input_data.cursor, input_data.view
+    )
+    if local is not None:
+        records, next_offset = local.list(
+            table_id,
+            max_records=input_data.max_records,
+            offset=local_offset(input_data.cursor)
+        )
+        records = await expand_links(
+            input_data.table,
+            records,
+            input_data.expand,
+            input_data.expand_depth,
+            use_cache=not input_data.no_cache
+        )
+        result = render_records(
+            records,
+            input_data.output,
+            fields=input_data.fields,
+            next_cursor=local_cursor(next_offset),
+            source=describe_local_source(local, table_id)
+        )
+        return result
+
+    # Fetch records page by page
+    records, next_cursor = await active_base().client.collect_records(
+        table_id,
+        view=input_data.view,
+        max_records=input_data.max_records,
+        page_size=input_data.page_size,
+        offset=input_data.cursor,
+        fields=input_data.fields,
+        use_cache=not input_data.no_cache
+    )
+
+    records = await expand_links(
+        input_data.table,
+        records,
+        input_data.expand,
+        input_data.expand_depth,
+        use_cache=not input_data.no_cache
+    )
+    result = render_records(
+        records,
+        input_data.output,
+        fields=input_data.fields,
+        next_cursor=next_cursor
+    )
+    return result
+
+
+@tool(
+    name="get_record",
+    description="Get a specific record by ID from an Airtable table",
+    model=GetRecordInput,
+    priority="interactive"
+)
+async def get_record_tool(input_data: GetRecordInput) -> str:
+    table_id = TABLES[input_data.table]
+
+    logger.info(f"Getting record {input_data.record_id} from {input_data.table}")
+
+    local = local_replica_for(table_id, input_data.no_cache)
+    if local is not None:
+        record = local.get(table_id, input_data.record_id)
+        if record is not None:
+            [record] = await expand_links(
+                input_data.table,
+                [record],
+                input_data.expand,
+                input_data.expand_depth,
+                use_cache=not input_data.no_cache
+            )
+            result = render_record(
+                record,
+                input_data.output,
+                fields=input_data.fields,
+                source=describe_local_source(local, table_id)
+            )
+            return result
+
+    # Fetch record
+    record = await active_base().client.get_record(
+        table_id,
+        input_data.record_id,
+        use_cache=not input_data.no_cache
+    )
+
+    [record] = await expand_links(
+        input_data.table,
+        [record],
+        input_data.expand,
+        input_data.expand_depth,
+        use_cache=not input_data.no_cache
+    )
+    result = render_record(record, input_data.output, fields=input_data.fields)
+    return result
+
+
+@tool(
+    name="search_records",
+    description="Search records using Airtable filter formula (e.g., \"{email}='test@example.com'\")",
+    model=SearchRecordsInput
+)
+async def search_records_tool(input_data: SearchRecordsInput) -> str:
+    table_id = TABLES[input_data.table]
+
+    logger.info(f"Searching {input_data.table} with formula: {input_data.filter_formula}")
+
+    local = local_replica_for(table_id, input_data.no_cache, input_data.cursor)
+    if local is not None:
+        found = local.search(
+            table_id,
+            input_data.filter_formula,
+            max_records=input_data.max_records,
+            offset=local_offset(input_data.cursor)
+        )
+        if found is not None:
+            records, next_offset = found
+            records = await expand_links(
+                input_data.table,
+                records,
+                input_data.expand,
+                input_data.expand_depth,
+                use_cache=not input_data.no_cache
             )
+            result = render_records(
+                records,
+                input_data.output,
+                fields=input_data.fields,
+                next_cursor=local_cursor(next_offset),
+                source=describe_local_source(local, table_id)
+            )
+            return result
+        if input_data.cursor:
+            raise ValueError("This cursor can only be used with a formula the local replica supports")
 
-            result = f"✅ Record updated successfully!\n\n{format_record(record)}"
-            return [TextContent(type="text", text=result)]
+    # Search records page by page
+    records, next_cursor = await active_base().client.collect_records(
+        table_id,
+        filter_formula=input_data.filter_formula,
+        max_records=input_data.max_records,
+        page_size=input_data.page_size,
+        offset=input_data.cursor,
+        fields=input_data.fields,
+        use_cache=not input_data.no_cache
+    )
 
-        elif name == "delete_record":
-            # Validate input
-            input_data = DeleteRecordInput(**arguments)
-            table_id = TABLES[input_data.table]
+    records = await expand_links(
+        input_data.table,
+        records,
+        input_data.expand,
+        input_data.expand_depth,
+        use_cache=not input_data.no_cache
+    )
+    result = render_records(
+        records,
+        input_data.output,
+        fields=input_data.fields,
+        next_cursor=next_cursor
+    )
+    return result
 
-            logger.info(f"Deleting record {input_data.record_id} from {input_data.table}")
 
-            # Delete record
-            result_data = await airtable.delete_record(table_id, input_data.record_id)
+@tool(
+    name="create_record",
+    description="Create a new record in an Airtable table",
+    model=CreateRecordInput
+)
+async def create_record_tool(input_data: CreateRecordInput) -> str:
+    table_id = TABLES[input_data.table]
 
-            deleted_id = result_data.get("id", "Unknown")
-            result = f"✅ Record deleted successfully!\nDeleted ID: {deleted_id}"
-            return [TextContent(type="text", text=result)]
+    logger.info(f"Creating record in {input_data.table}")
 
-        else:
+    # Create record
+    fields = prepare_fields(input_data.table, input_data.fields, require=True)
+    record = await active_base().client.create_record(table_id, fields)
+
+    result = f"✅ Record created successfully!\n\n{format_record(record)}"
+    return result
+
+
+@tool(
+    name="update_record",
+    description="Update an existing record in an Airtable table",
+    model=UpdateRecordInput
+)
+async def update_record_tool(input_data: UpdateRecordInput) -> str:
+    base = active_base()
+    table_id = TABLES[input_data.table]
+
+    logger.info(f"Updating record {input_data.record_id} in {input_data.table}")
+
+    fields = prepare_fields(input_data.table, input_data.fields)
+    if base.write_behind is not None and not input_data.wait:
+        due_in = await base.write_behind.enqueue(table_id, input_data.record_id, fields)
+        result = (
+            f"✅ Update to {input_data.record_id} saved to the write-behind journal; "
+            f"it will be written to Airtable in about {due_in:.1f}s (use flush to write it now)"
+        )
+        return result
+
+    # Update record
+    if base.write_behind is not None:
+        record = await base.write_behind.write_now(table_id, input_data.record_id, fields)
+    else:
+        record = await base.client.update_record(table_id, input_data.record_id, fields)
+
+    result = f"✅ Record updated successfully!\n\n{format_record(record)}"
+    return result
+
+
+@tool(
+    name="delete_record",
+    description="Delete a record from an Airtable table",
+    model=DeleteRecordInput
+)
+async def delete_record_tool(input_data: DeleteRecordInput) -> str:
+    base = active_base()
+    table_id = TABLES[input_data.table]
+
+    logger.info(f"Deleting record {input_data.record_id} from {input_data.table}")
+
+    # Delete record
+    result_data = await base.client.delete_record(table_id, input_data.record_id)
+    if base.write_behind is not None:
+        await base.write_behind.discard(table_id, [input_data.record_id])
+
+    deleted_id = result_data.get("id", "Unknown")
+    result = f"✅ Record deleted successfully!\nDeleted ID: {deleted_id}"
+    return result
+
+
+@tool(
+    name="batch_create_records",
+    description="Create many records at once (sent 10 per request, concurrently)",
+    model=BatchCreateRecordsInput,
+    priority="bulk"
+)
+async def batch_create_records_tool(input_data: BatchCreateRecordsInput) -> str:
+    table_id = TABLES[input_data.table]
+
+    logger.info(f"Batch creating {len(input_data.records)} records in {input_data.table}")
+
+    records = [
+        prepare_batch_fields(input_data.table, index, fields, input_data.typecast, require=True)
+        for index, fields in enumerate(input_data.records)
+    ]
+    results = await active_base().client.batch_create_records(
+        table_id,
+        records,
+        typecast=input_data.typecast
+    )
+
+    result = format_batch_results("create", results)
+    return result
+
+
+@tool(
+    name="batch_update_records",
+    description="Update or upsert many records at once (sent 10 per request, concurrently)",
+    model=BatchUpdateRecordsInput,
+    priority="bulk"
+)
+async def batch_update_records_tool(input_data: BatchUpdateRecordsInput) -> str:
+    base = active_base()
+    table_id = TABLES[input_data.table]
+
+    logger.info(f"Batch updating {len(input_data.records)} records in {input_data.table}")
+
+    records = [
+        {
+            "id": record.id,
+            "fields": prepare_batch_fields(input_data.table, index, record.fields, input_data.typecast)
+        }
+        for index, record in enumerate(input_data.records)
+    ]
+    if base.write_behind is not None:
+        # Buffered updates to these records must land first
+        keys = [(table_id, record["id"]) for record in records if record["id"]]
+        await base.write_behind.flush(keys)
+
+    results = await base.client.batch_update_records(
+        table_id,
+        records,
+        fields_to_merge_on=schema.field_names(input_data.table, input_data.fields_to_merge_on),
+        typecast=input_data.typecast
+    )
+
+    result = format_batch_results("update", results)
+    return result
+
+
+@tool(
+    name="batch_delete_records",
+    description="Delete many records at once (sent 10 per request, concurrently)",
+    model=BatchDeleteRecordsInput,
+    priority="bulk"
+)
+async def batch_delete_records_tool(input_data: BatchDeleteRecordsInput) -> str:
+    base = active_base()
+    table_id = TABLES[input_data.table]
+
+    logger.info(f"Batch deleting {len(input_data.record_ids)} records from {input_data.table}")
+
+    results = await base.client.batch_delete_records(table_id, input_data.record_ids)
+    if base.write_behind is not None:
+        await base.write_behind.discard(table_id, [r["id"] for r in results if r["ok"]])
+
+    result = format_batch_results("delete", results)
+    return result
+
+
+@tool(
+    name="lookup_by_field",
+    description=(
+        "Find records whose field exactly equals a value (e.g. TENANTS by email, "
+        "TICKETS by tenant_email/status/unit). Uses in-memory indexes when the local replica is enabled"
+    ),
+    model=LookupByFieldInput,
+    priority="interactive"
+)
+async def lookup_by_field_tool(input_data: LookupByFieldInput) -> str:
+    table_id = TABLES[input_data.table]
+
+    logger.info(f"Looking up {input_data.table} where {input_data.field} = {input_data.value}")
+
+    local = local_replica_for(table_id, input_data.no_cache, input_data.cursor)
+    found = None
+    if local is not None:
+        found = local.lookup(
+            table_id,
+            input_data.field,
+            input_data.value,
+            max_records=input_data.max_records,
+            offset=local_offset(input_data.cursor)
+        )
+    if found is not None:
+        records, next_offset = found
+        records = await expand_links(
+            input_data.table,
+            records,
+            input_data.expand,
+            input_data.expand_depth,
+            use_cache=not input_data.no_cache
+        )
+        result = render_records(
+            records,
+            input_data.output,
+            fields=input_data.fields,
+            next_cursor=local_cursor(next_offset),
+            source=describe_local_source(local, table_id)
+        )
+        return result
+
+    escaped = input_data.value.replace("\\", "\\\\").replace("'", "\\'")
+    records, next_cursor = await active_base().client.collect_records(
+        table_id,
+        filter_formula=f"{{{input_data.field}}}='{escaped}'",
+        max_records=input_data.max_records,
+        offset=input_data.cursor,
+        fields=input_data.fields,
+        use_cache=not input_data.no_cache
+    )
+
+    records = await expand_links(
+        input_data.table,
+        records,
+        input_data.expand,
+        input_data.expand_depth,
+        use_cache=not input_data.no_cache
+    )
+    result = render_records(
+        records,
+        input_data.output,
+        fields=input_data.fields,
+        next_cursor=next_cursor
+    )
+    return result
+
+
+@tool(
+    name="aggregate_records",
+    description=(
+        "Count, sum, min, max or average records grouped by fields "
+        "(e.g. open tickets per residence and priority). The table is scanned "
+        "server-side and only the grouped result is returned"
+    ),
+    model=AggregateRecordsInput,
+    priority="bulk"
+)
+async def aggregate_records_tool(input_data: AggregateRecordsInput) -> str:
+    table_id = TABLES[input_data.table]
+    metrics = [(metric.op, metric.field) for metric in input_data.metrics]
+
+    logger.info(
+        f"Aggregating {input_data.table} by {input_data.group_by or 'nothing'} "
+        f"(filter: {input_data.filter_formula or 'none'})"
+    )
+
+    local = local_replica_for(table_id, input_data.no_cache, view=input_data.view)
+    if local is not None:
+        predicate = (
+            compile_formula(input_data.filter_formula, input_data.table)
+            if input_data.filter_formula else (lambda record: True)
+        )
+        if predicate is not None:
+            aggregator = Aggregator(input_data.group_by, metrics)
+            try:
+                for record in local.iter_table(table_id):
+                    if predicate(record):
+                        aggregator.add(record)
+            except UnsupportedFormula:
+                pass
+            else:
+                local.local_reads += 1
+                result = format_aggregate(
+                    input_data.table,
+                    aggregator,
+                    input_data.output,
+                    source=describe_local_source(local, table_id)
+                )
+                return result
+
+    # Only download the fields the aggregation reads
+    needed = list(dict.fromkeys(
+        input_data.group_by + [field for _, field in metrics if field]
+    ))
+    aggregator = Aggregator(input_data.group_by, metrics)
+    async for record in active_base().client.iter_records(
+        table_id,
+        view=input_data.view,
+        filter_formula=input_data.filter_formula,
+        fields=needed or [ID_SCAN_FIELDS[input_data.table]],
+        use_cache=not input_data.no_cache
+    ):
+        aggregator.add(record)
+
+    result = format_aggregate(input_data.table, aggregator, input_data.output)
+    return result
+
+
+@tool(
+    name="changes_since",
+    description=(
+        "Poll a table for records created or modified since a timestamp or the cursor of the "
+        "previous call. Records whose content did not change are skipped, so an idle poll "
+        "costs one request. Deleted records are not reported"
+    ),
+    model=ChangesSinceInput
+)
+async def changes_since_tool(input_data: ChangesSinceInput) -> str:
+    logger.info(f"Polling changes in {input_data.table} since {(input_data.since or 'now')[:32]}")
+    result = await changes_since(
+        input_data.table,
+        input_data.since,
+        max_records=input_data.max_records,
+        fields=input_data.fields
+    )
+    return format_changes(result, input_data.output)
+
+
+@tool(
+    name="sync_status",
+    description="Show how far behind Airtable the local SQLite replica is, optionally syncing first",
+    model=SyncStatusInput,
+    priority="interactive"
+)
+async def sync_status_tool(input_data: SyncStatusInput) -> str:
+    base = active_base()
+    table_names = [input_data.table] if input_data.table else TABLE_CHOICES
+
+    if input_data.refresh and base.replica is not None:
+        logger.info(f"Syncing local replica: {', '.join(table_names)}")
+        await asyncio.gather(*(base.replica.sync_table(TABLES[n]) for n in table_names))
+
+    return format_sync_status(table_names)
+
+
+@tool(
+    name="export_table",
+    description=(
+        "Export every record of a table (or all tables) to NDJSON, gzipped NDJSON or Parquet "
+        "files on the server, resuming an interrupted export where it stopped"
+    ),
+    model=ExportTableInput,
+    priority="bulk"
+)
+async def export_table_tool(input_data: ExportTableInput) -> str:
+    table_names = [input_data.table] if input_data.table else TABLE_CHOICES
+    directory = input_data.directory or default_export_dir()
+
+    logger.info(f"Exporting {', '.join(table_names)} to {directory} as {input_data.format}")
+
+    results = await export_tables(
+        table_names,
+        directory,
+        input_data.format,
+        fields=input_data.fields,
+        restart=input_data.restart
+    )
+    return format_export_results(directory, results)
+
+
+@tool(
+    name="import_records",
+    description=(
+        "Import a CSV or NDJSON file from the server into a table: rows are validated against "
+        "the table's fields and written 10 per request at the configured rate. Interrupted "
+        "imports resume where they stopped; dry_run only validates"
+    ),
+    model=ImportRecordsInput,
+    priority="bulk"
+)
+async def import_records_tool(input_data: ImportRecordsInput) -> str:
+    logger.info(
+        f"{'Validating' if input_data.dry_run else 'Importing'} {input_data.path} "
+        f"into {input_data.table}"
+    )
+
+    result = await import_records(
+        input_data.table,
+        input_data.path,
+        format=input_data.format,
+        dry_run=input_data.dry_run,
+        typecast=input_data.typecast,
+        merge_on=input_data.merge_on,
+        restart=input_data.restart
+    )
+    return format_import_report(result)
+
+
+@tool(
+    name="upload_attachment",
+    description=(
+        "Upload files from the server to Airtable and attach them to a record, e.g. ticket photos "
+        "in TICKETS.images_urls. Files are streamed a few at a time, identical files are only "
+        "uploaded once (SHA-256), and the record is updated with a single PATCH"
+    ),
+    model=UploadAttachmentInput
+)
+async def upload_attachment_tool(input_data: UploadAttachmentInput) -> str:
+    logger.info(
+        f"Attaching {len(input_data.paths)} file(s) to {input_data.table} "
+        f"{input_data.record_id} ({input_data.field})"
+    )
+    result = await active_base().uploads.attach(
+        input_data.table,
+        input_data.record_id,
+        input_data.field,
+        input_data.paths,
+        replace=input_data.replace
+    )
+    return format_attach_results(result)
+
+
+@tool(
+    name="flush",
+    description=(
+        "Write all updates buffered by write-behind mode to Airtable now, and list any "
+        "that Airtable rejected"
+    ),
+    model=FlushInput,
+    priority="interactive"
+)
+async def flush_tool(input_data: FlushInput) -> str:
+    base = active_base()
+    if base.write_behind is None:
+        result = "✅ Nothing to flush: write-behind mode is off, updates are written immediately"
+        return result
+
+    keys = None
+    if input_data.table:
+        keys = [key for key in base.write_behind.pending if key[0] == TABLES[input_data.table]]
+    logger.info(f"Flushing {len(base.write_behind.pending) if keys is None else len(keys)} buffered update(s)")
+
+    summary = await base.write_behind.flush(keys)
+    return format_flush_results(base.write_behind, summary)
+
+
+@tool(
+    name="describe_table",
+    description=(
+        "Show a table's fields with their fld IDs, types, select options and required fields. "
+        "Writes are checked against this schema before they reach Airtable"
+    ),
+    model=DescribeTableInput,
+    priority="interactive"
+)
+async def describe_table_tool(input_data: DescribeTableInput) -> str:
+    table_names = [input_data.table] if input_data.table else TABLE_CHOICES
+
+    if input_data.refresh:
+        logger.info("Reloading the base schema")
+        await load_schema()
+
+    return format_schema(table_names)
+
+
+@tool(
+    name="server_stats",
+    description=(
+        "Show server statistics: requests, retries, rate limiting, cache, and per-tool and "
+        "per-table latency broken down into validation, limiter wait, HTTP and formatting"
+    ),
+    model=ServerStatsInput,
+    priority="interactive"
+)
+async def server_stats_tool(input_data: ServerStatsInput) -> str:
+    if input_data.output != "text":
+        return metrics_registry.render(openmetrics=input_data.output == "openmetrics")
+    return format_stats()
+
+
+@lru_cache(maxsize=1)
+def tool_definitions() -> List["Tool"]:
+    """MCP tool list, built once from the registry."""
+    from mcp.types import Tool
+
+    tools = []
+    for spec in TOOLS.values():
+        # Every tool can declare the scheduling priority of its Airtable requests
+        input_schema = dict(spec.input_schema)
+        input_schema["properties"] = {
+            **spec.input_schema.get("properties", {}),
+            "priority": {
+                "type": "string",
+                "description": (
+                    f"Request priority lane (default: {spec.priority}). "
+                    "Interactive requests overtake queued bulk work"
+                ),
+                "enum": list(PRIORITY_LANES)
+            }
+        }
+        # ... and, when several bases are configured, which one it works on
+        if len(bases) > 1:
+            input_schema["properties"]["base"] = {
+                "type": "string",
+                "description": f"Airtable base (default: {DEFAULT_BASE})",
+                "enum": list(bases)
+            }
+        tools.append(Tool(name=spec.name, description=spec.description, inputSchema=input_schema))
+    return tools
+
+
+async def list_tools() -> List["Tool"]:
+    """List available MCP tools."""
+    return tool_definitions()
+
+
+async def call_tool(name: str, arguments: Any) -> List["TextContent"]:
+    """Handle tool calls, recording per-tool timings."""
+    trace = CallTrace(name)
+    trace_token = current_trace.set(trace)
+    try:
+        contents = await handle_tool(name, arguments)
+    finally:
+        current_trace.reset(trace_token)
+    trace.finish(contents)
+    return contents
+
+
+async def handle_tool(name: str, arguments: Any) -> List["TextContent"]:
+    """Run one tool call."""
+    from mcp.types import TextContent
+
+    spec = TOOLS.get(name)
+    arguments = dict(arguments or {})
+    priority = arguments.pop("priority", None) or (spec.priority if spec else "normal")
+    base_name = arguments.pop("base", None) or DEFAULT_BASE
+    priority_token = request_priority.set(priority)
+    base_token = current_base.set(base_name)
+    try:
+        if spec is None:
             raise ValueError(f"Unknown tool: {name}")
+        if priority not in PRIORITY_LANES:
+            raise ValueError(f"Invalid priority. Must be one of: {', '.join(PRIORITY_LANES)}")
+        if base_name not in bases:
+            raise ValueError(f"Invalid base. Must be one of: {', '.join(bases)}")
+
+        input_data = validate_input(spec.model, arguments)
+        return [TextContent(type="text", text=await spec.handler(input_data))]
 
     except ValueError as e:
         logger.error(f"Validation error: {e}")
@@ -602,27 +5818,390 @@ async def call_tool(name: str, arguments: Any) -> List[TextContent]:
         logger.error(f"Error in {name}: {e}", exc_info=True)
         return [TextContent(type="text", text=f"❌ Error: {str(e)}")]
 
+    finally:
+        request_priority.reset(priority_token)
+        current_base.reset(base_token)
+
+
+def create_server(limits: Optional["ClientLimits"] = None) -> "Server":
+    """Build the MCP server from the tool registry.
+
+    mcp is imported here rather than at module load: it is most of the
+    import time, and the export/import commands never need it. With
+    ``limits``, each client session's calls go through its own slots.
+    """
+    from mcp.server import Server
+
+    server = Server("airtable-mcp")
+    server.list_tools()(list_tools)
+    # Arguments are validated by each tool's input model, which the
+    # advertised schemas are generated from; mcp's own jsonschema pass
+    # would re-check them on every call and costs more than the rest of
+    # the dispatch
+    if limits is None:
+        server.call_tool(validate_input=False)(call_tool)
+    else:
+        async def call_tool_limited(name: str, arguments: Any) -> List["TextContent"]:
+            if limits.draining:
+                from mcp.types import TextContent
+
+                limits.metrics["refused"] += 1
+                return [TextContent(type="text", text="❌ Server is shutting down, retry in a moment")]
+            async with limits.slot(server.request_context.session):
+                return await call_tool(name, arguments)
+
+        server.call_tool(validate_input=False)(call_tool_limited)
+    tool_definitions()
+    return server
+
+
+# ============================================================================
+# HTTP TRANSPORT
+# ============================================================================
+
+# Once running tool calls have drained, seconds uvicorn waits for the
+# remaining connections (idle SSE streams) before closing them
+HTTP_CLOSE_GRACE = 1.0
+
+
+class ClientLimits:
+    """Per-client concurrency caps and shutdown drain for a shared server.
+
+    Each client session may run ``max_calls`` tool calls at once; further
+    calls wait for one of its slots, so one busy agent cannot take every
+    connection and rate-limit token from the others. ``drain()`` refuses
+    new calls and waits for the running ones.
+    """
+
+    def __init__(self, max_calls: int):
+        self.max_calls = max_calls
+        # Keyed by the mcp session, dropped when the session goes away
+        self._slots: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.in_flight = 0
+        self.draining = False
+        self.metrics = {"calls": 0, "waited": 0, "refused": 0}
+
+    @property
+    def clients(self) -> int:
+        return len(self._slots)
+
+    @asynccontextmanager
+    async def slot(self, client: Any) -> AsyncIterator[None]:
+        """Hold one of ``client``'s slots for the duration of a call."""
+        semaphore = self._slots.get(client)
+        if semaphore is None:
+            semaphore = self._slots[client] = asyncio.Semaphore(self.max_calls)
+        self.metrics["calls"] += 1
+        if semaphore.locked():
+            self.metrics["waited"] += 1
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            async with semaphore:
+                yield
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Refuse new calls and wait up to ``timeout`` for running ones; True if all finished."""
+        self.draining = True
+        if self.in_flight:
+            logger.info(f"Draining {self.in_flight} tool call(s), up to {timeout:g}s")
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Drain timed out with {self.in_flight} tool call(s) still running")
+            return False
+        return True
+
+
+# Set while serving over HTTP; reported by server_stats
+client_limits: Optional[ClientLimits] = None
+
+
+def require_bearer_token(app: Callable, token: str, open_paths: Tuple[str, ...] = ()) -> Callable:
+    """Wrap an ASGI app so HTTP requests need ``Authorization: Bearer <token>``."""
+    expected = f"Bearer {token}".encode()
+
+    async def guarded(scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] == "http" and scope["path"] not in open_paths:
+            supplied = dict(scope["headers"]).get(b"authorization", b"")
+            if not hmac.compare_digest(supplied, expected):
+                await send({
+                    "type": "http.response.start",
+                    "status": 401,
+                    "headers": [(b"content-type", b"application/json"), (b"www-authenticate", b"Bearer")],
+                })
+                await send({"type": "http.response.body", "body": b'{"error": "unauthorized"}'})
+                return
+        await app(scope, receive, send)
+
+    return guarded
+
+
+def create_http_app(server: "Server", limits: ClientLimits) -> Callable:
+    """ASGI app serving ``server`` over streamable HTTP (/mcp) and SSE (/sse).
+
+    Every client is served by this one process, so they share its warm
+    connection pools, read caches, replicas and, above all, each base's
+    single rate limiter instead of running one limiter per agent.
+    """
+    from mcp.server.sse import SseServerTransport
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Mount, Route
+
+    sessions = StreamableHTTPSessionManager(app=server)
+    sse = SseServerTransport("/messages/")
+
+    async def handle_sse(request):
+        async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+        return Response()
+
+    async def health(request):
+        return JSONResponse(
+            {
+                "status": "draining" if limits.draining else "ok",
+                "clients": limits.clients,
+                "in_flight": limits.in_flight,
+            },
+            status_code=503 if limits.draining else 200
+        )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with serving(), sessions.run():
+            yield
+
+    app = Starlette(
+        routes=[
+            Route("/healthz", health),
+            Mount("/mcp", app=sessions.handle_request),
+            Route("/sse", handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+        ],
+        lifespan=lifespan
+    )
+    if settings.http_auth_token:
+        return require_bearer_token(app, settings.http_auth_token, open_paths=("/healthz",))
+    return app
+
 
 # ============================================================================
 # MAIN
 # ============================================================================
 
-async def main():
-    """Run the MCP server."""
+async def write_metrics_periodically():
+    """Keep ``metrics_path`` up to date for a node exporter textfile collector."""
+    while True:
+        await asyncio.sleep(settings.metrics_interval)
+        try:
+            metrics_registry.write(settings.metrics_path, settings.metrics_format == "openmetrics")
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {settings.metrics_path}: {e}")
+
+
+@asynccontextmanager
+async def serving() -> AsyncIterator[None]:
+    """Run the background work of a server process around a transport.
+
+    Starts the metrics file, schema refresh, write-behind queues and
+    replica syncs; on exit, flushes buffered updates and closes every
+    connection. Shared by the stdio and HTTP transports.
+    """
     logger.info("Starting Airtable MCP Server...")
     logger.info(f"Base ID: {settings.airtable_base_id}")
     logger.info(f"Rate limit: {settings.rate_limit_per_sec} req/sec")
     logger.info(f"Tables: {', '.join(TABLES.keys())}")
+    for name, config in settings.bases.items():
+        logger.info(f"Extra base {name}: {config.base_id}")
+
+    configure_tracing()
+
+    metrics_task = None
+    if settings.metrics_path:
+        logger.info(f"Writing metrics to {settings.metrics_path} every {settings.metrics_interval:.0f}s")
+        metrics_task = asyncio.create_task(write_metrics_periodically())
+
+    schema_task = None
+    if settings.schema_source != "static":
+        schema_task = asyncio.create_task(refresh_schema_periodically())
+
+    replica_tasks: List["asyncio.Task[None]"] = []
+    for base in bases.values():
+        if base.write_behind is not None:
+            logger.info(f"Write-behind: {settings.write_behind_window:g}s window, journal {base.write_behind.path}")
+            base.write_behind.start()
+        if base.replica is not None:
+            logger.info(f"Local replica: {base.replica.path} (max staleness {settings.replica_max_staleness:.0f}s)")
+            replica_tasks.append(asyncio.create_task(base.replica.run()))
+
+    try:
+        yield
+    finally:
+        logger.info("Shutting down, closing Airtable connections...")
+        for base in bases.values():
+            if base.write_behind is not None:
+                try:
+                    await base.write_behind.close()
+                except Exception as e:
+                    logger.error(f"Could not flush buffered updates to base {base.name} ({e}); they will be replayed on restart")
+        for task in replica_tasks:
+            task.cancel()
+        await asyncio.gather(*replica_tasks, return_exceptions=True)
+        for base in bases.values():
+            if base.replica is not None:
+                base.replica.close()
+        if schema_task is not None:
+            schema_task.cancel()
+        if metrics_task is not None:
+            metrics_task.cancel()
+            metrics_registry.write(settings.metrics_path, settings.metrics_format == "openmetrics")
+        await close_clients()
+
 
+async def main():
+    """Run the MCP server over stdio, for a single client."""
     from mcp.server.stdio import stdio_server
 
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
+    server = create_server()
+    async with serving():
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+
+
+async def run_http(host: str, port: int):
+    """Serve many clients from this process over streamable HTTP and SSE."""
+    global client_limits
+    import uvicorn
+
+    client_limits = ClientLimits(settings.http_max_calls_per_client)
+    limits = client_limits
+    app = create_http_app(create_server(limits), limits)
+
+    class DrainingServer(uvicorn.Server):
+        async def shutdown(self, sockets=None):
+            # Stop accepting connections and let running tool calls finish
+            # (new ones are refused) before uvicorn closes what is left
+            for listener in self.servers:
+                listener.close()
+            await limits.drain(settings.http_drain_timeout)
+            await super().shutdown(sockets)
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        access_log=False,
+        timeout_graceful_shutdown=HTTP_CLOSE_GRACE
+    )
+    logger.info(
+        f"Serving MCP on http://{host}:{port}/mcp (SSE: /sse), "
+        f"{settings.http_max_calls_per_client} concurrent call(s) per client"
+    )
+    await DrainingServer(config).serve()
+
+
+async def close_clients():
+    """Close the pooled connections of every base."""
+    await asyncio.gather(*(base.client.aclose() for base in bases.values()))
+
+
+async def run_export(args: argparse.Namespace):
+    """``main.py export``: export tables from the command line."""
+    request_priority.set("bulk")
+    current_base.set(args.base)
+    table_names = args.tables or list(TABLES.keys())
+    directory = args.dir or default_export_dir()
+    try:
+        results = await export_tables(table_names, directory, args.format, args.fields, args.restart)
+    finally:
+        await close_clients()
+    print(format_export_results(directory, results))
+    if any(isinstance(result, Exception) for result in results):
+        raise SystemExit(1)
+
+
+async def run_import(args: argparse.Namespace):
+    """``main.py import``: import a CSV or NDJSON file from the command line."""
+    request_priority.set("bulk")
+    current_base.set(args.base)
+    try:
+        await load_schema()
+        report = await import_records(
+            args.table,
+            args.path,
+            format=args.format,
+            dry_run=args.dry_run,
+            typecast=args.typecast,
+            merge_on=args.merge_on,
+            restart=args.restart
         )
+    finally:
+        await close_clients()
+    print(format_import_report(report))
+    if report["invalid"] or report["failed"]:
+        raise SystemExit(1)
+
+
+def cli():
+    """Command line entry point. Without a command, runs the MCP server."""
+    parser = argparse.ArgumentParser(description="Airtable MCP server for the property management base")
+    commands = parser.add_subparsers(dest="command")
+    serve = commands.add_parser("serve", help="Run the MCP server (default)")
+    serve.add_argument(
+        "--transport",
+        choices=["stdio", "http"],
+        default=settings.transport,
+        help="stdio for one client, or streamable HTTP and SSE shared by many (default: AIRTABLE_TRANSPORT)"
+    )
+    serve.add_argument("--host", default=settings.http_host, help="HTTP listen address (default: AIRTABLE_HTTP_HOST)")
+    serve.add_argument("--port", type=int, default=settings.http_port, help="HTTP port (default: AIRTABLE_HTTP_PORT)")
+
+    export = commands.add_parser("export", help="Export tables to NDJSON, gzipped NDJSON or Parquet")
+    export.add_argument("tables", nargs="*", metavar="TABLE", help=f"Tables to export (default: all of {', '.join(TABLES)})")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson.gz")
+    export.add_argument("--dir", help="Output directory (default: AIRTABLE_EXPORT_DIR, a subdirectory per extra base)")
+    export.add_argument("--fields", nargs="+", help="Only export these fields")
+    export.add_argument("--restart", action="store_true", help="Ignore checkpoints and export from scratch")
+    export.add_argument("--base", choices=list(bases), default=DEFAULT_BASE, help="Base to export from")
+
+    import_ = commands.add_parser("import", help="Import a CSV or NDJSON file into a table")
+    import_.add_argument("table", choices=list(TABLES), metavar="TABLE", help=f"One of {', '.join(TABLES)}")
+    import_.add_argument("path", help="CSV, NDJSON or JSONL file, optionally gzipped")
+    import_.add_argument("--format", choices=IMPORT_FORMATS, help="File format (default: from the extension)")
+    import_.add_argument("--dry-run", action="store_true", help="Validate every row without writing")
+    import_.add_argument("--typecast", action="store_true", help="Let Airtable convert values")
+    import_.add_argument("--merge-on", nargs="+", metavar="FIELD", help="Upsert on these fields instead of creating")
+    import_.add_argument("--restart", action="store_true", help="Ignore checkpoints and import from the first row")
+    import_.add_argument("--base", choices=list(bases), default=DEFAULT_BASE, help="Base to import into")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        try:
+            asyncio.run(run_import(args))
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.command == "export":
+        unknown = [name for name in args.tables if name not in TABLES]
+        if unknown:
+            parser.error(f"unknown table(s): {', '.join(unknown)}")
+        asyncio.run(run_export(args))
+    elif getattr(args, "transport", settings.transport) == "http":
+        asyncio.run(run_http(getattr(args, "host", settings.http_host), getattr(args, "port", settings.http_port)))
+    else:
+        asyncio.run(main())
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    cli()
@@ -0,0 +1,9 @@
+"""Test setup: import the server module without a real Airtable token."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("AIRTABLE_AIRTABLE_API_TOKEN", "test-token")
+os.environ.setdefault("AIRTABLE_SCHEMA_SOURCE", "static")
@@ -0,0 +1,40 @@
+"""Aggregator reductions over records with mixed value types."""
+
+import main
+
+
+def aggregate(values, metrics):
+    aggregator = main.Aggregator([], metrics)
+    for value in values:
+        aggregator.add({"fields": {"total_units": value}})
+    [row] = aggregator.rows()
+    return row
+
+
+def test_min_max_over_mixed_ints_and_floats():
+    row = aggregate([2, 1.5, 7.25, 3], [("min", "total_units"), ("max", "total_units"), ("sum", "total_units")])
+    assert row["min(total_units)"] == 1.5
+    assert row["max(total_units)"] == 7.25
+    assert row["sum(total_units)"] == 13.75
+
+
+def test_min_max_keep_ints_as_ints():
+    row = aggregate([3.5, 10, 2], [("min", "total_units"), ("max", "total_units")])
+    assert row["min(total_units)"] == 2 and isinstance(row["min(total_units)"], int)
+    assert row["max(total_units)"] == 10 and isinstance(row["max(total_units)"], int)
+
+
+def test_min_max_over_text_dates():
+    row = aggregate(
+        ["2026-03-01T00:00:00.000Z", "2025-12-31T23:00:00.000Z", None, "2026-01-15T08:00:00.000Z"],
+        [("min", "total_units"), ("max", "total_units"), ("count", "total_units")]
+    )
+    assert row["min(total_units)"] == "2025-12-31T23:00:00.000Z"
+    assert row["max(total_units)"] == "2026-03-01T00:00:00.000Z"
+    assert row["count(total_units)"] == 3
+
+
+def test_avg_skips_text_and_blanks():
+    row = aggregate([1, "n/a", None, 2.5], [("avg", "total_units"), ("count", None)])
+    assert row["avg(total_units)"] == 1.75
+    assert row["count"] == 4
@@ -0,0 +1,84 @@
+"""Equality indexes answer only where they match Airtable's '='."""
+
+import pytest
+
+import main
+
+TICKETS = [
+    {"id": "recT1", "createdTime": "2026-01-05T09:00:00.000Z", "fields": {
+        "status": "open", "tenant_email": "a@example.com", "PROFESSIONALS": ["recP1"],
+        "email (from PROFESSIONALS)": ["pro@example.com"]}},
+    {"id": "recT2", "createdTime": "2026-01-06T09:00:00.000Z", "fields": {
+        "status": "closed", "tenant_email": "b@example.com"}},
+]
+
+
+class _OfflineClient:
+    write_hooks = []
+
+
+@pytest.fixture
+def replica(tmp_path):
+    replica = main.LocalReplica(
+        _OfflineClient(),
+        path=str(tmp_path / "replica.sqlite3"),
+        tables=main.TABLES,
+        max_staleness=3600,
+        sync_interval=3600,
+        reconcile_interval=3600
+    )
+    replica._upsert(main.TABLES["TICKETS"], TICKETS)
+    replica.db.commit()
+    replica.build_indexes(main.TABLES["TICKETS"])
+    yield replica
+    replica.close()
+
+
+TABLE_ID = main.TABLES["TICKETS"]
+
+
+def test_plain_field_lookup_and_search(replica):
+    records, next_offset = replica.lookup(TABLE_ID, "status", "open")
+    assert [r["id"] for r in records] == ["recT1"] and next_offset is None
+    records, _ = replica.search(TABLE_ID, "{tenant_email}='b@example.com'")
+    assert [r["id"] for r in records] == ["recT2"]
+    assert replica.index_lookups == 2
+
+
+@pytest.mark.parametrize("field, value", [
+    ("PROFESSIONALS", "recP1"),
+    ("email (from PROFESSIONALS)", "pro@example.com"),
+    ("nosuchfield", "open"),
+])
+def test_unindexable_fields_fall_back(replica, field, value):
+    assert replica.lookup(TABLE_ID, field, value) is None
+    assert field not in replica._indexes.get(TABLE_ID, {})
+
+
+def test_link_index_is_never_used_by_search(replica):
+    # Even an index built directly must not answer link-field formulas
+    replica.index(TABLE_ID, "PROFESSIONALS")
+    assert replica.search(TABLE_ID, "{PROFESSIONALS}='recP1'") is None
+    assert replica.index_lookups == 0
+
+
+def test_unknown_field_search_falls_back(replica):
+    assert replica.search(TABLE_ID, "{nosuchfield}='open'") is None
+
+
+def test_attachment_field_falls_back(replica, monkeypatch):
+    tables = dict(main.schema.tables)
+    tables["TICKETS"] = {**tables["TICKETS"], "photos": {"id": "fldPhotos", "type": "attachments"}}
+    monkeypatch.setattr(main, "schema", main.BaseSchema(tables, "test"))
+    assert replica.lookup(TABLE_ID, "photos", "a.png") is None
+
+
+def test_lookup_input_rejects_unknown_field_with_metadata_schema(monkeypatch):
+    arguments = {"table": "TICKETS", "field": "nosuchfield", "value": "open"}
+    # A guessed schema may lack real fields, so Airtable decides
+    assert main.validate_input(main.LookupByFieldInput, arguments).field == "nosuchfield"
+
+    monkeypatch.setattr(main, "schema", main.BaseSchema(main.FIELD_SCHEMAS, "metadata API", authoritative=True))
+    with pytest.raises(ValueError, match="Unknown field 'nosuchfield'"):
+        main.validate_input(main.LookupByFieldInput, arguments)
+    assert main.validate_input(main.LookupByFieldInput, {**arguments, "field": "status"}).field == "status"
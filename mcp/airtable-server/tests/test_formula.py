@@ -0,0 +1,133 @@
+"""Local formula evaluation must match Airtable or defer to it."""
+
+import pytest
+
+import main
+
+TICKETS = [
+    {"id": "recT1", "createdTime": "2026-01-05T09:00:00.000Z", "fields": {
+        "title": "Leak", "status": "open", "priority": "high", "category": "plomberie",
+        "tenant_email": "user@example.com", "PROFESSIONALS": ["recP1"]}},
+    {"id": "recT2", "createdTime": "2026-01-06T09:00:00.000Z", "fields": {
+        "title": "No power", "status": "open", "priority": "low", "category": "électricité"}},
+    {"id": "recT3", "createdTime": "2026-01-07T09:00:00.000Z", "fields": {
+        "title": "Door", "status": "resolved", "priority": "high", "category": "concierge"}},
+    {"id": "recT4", "createdTime": "2026-01-08T09:00:00.000Z", "fields": {
+        "title": "Boiler", "status": "closed", "category": "plomberie"}},
+]
+TENANTS = [
+    {"id": "recA1", "fields": {"email": "user@example.com", "first_name": "Ana"}},
+    {"id": "recA2", "fields": {"email": "tenant@example.com", "first_name": "Ben"}},
+    {"id": "recA3", "fields": {"first_name": "Cleo"}},
+]
+RECORDS = {"TICKETS": TICKETS, "TENANTS": TENANTS}
+
+
+def matching(table, formula):
+    predicate = main.compile_formula(formula, table)
+    assert predicate is not None, formula
+    return [record["id"] for record in RECORDS[table] if predicate(record)]
+
+
+# Every formula shown in README.md, with the records Airtable returns for it
+@pytest.mark.parametrize("table, formula, expected", [
+    ("TENANTS", "{email}='user@example.com'", ["recA1"]),
+    ("TENANTS", "{email}='tenant@example.com'", ["recA2"]),
+    ("TICKETS", "{status}='open'", ["recT1", "recT2"]),
+    ("TICKETS", "AND({priority}='high', {status}='open')", ["recT1"]),
+    ("TICKETS", "OR({category}='plomberie', {category}='électricité')", ["recT1", "recT2", "recT4"]),
+    ("TICKETS", "OR(RECORD_ID()='recT2', RECORD_ID()='recT3')", ["recT2", "recT3"]),
+])
+def test_readme_examples(table, formula, expected):
+    assert matching(table, formula) == expected
+
+
+@pytest.mark.parametrize("formula, expected", [
+    ("{priority}=''", ["recT4"]),
+    ("{priority}=BLANK()", ["recT4"]),
+    ("NOT({priority}='high')", ["recT2", "recT4"]),
+    ("FIND('o', LOWER({title}))", ["recT2", "recT3", "recT4"]),
+    ("SEARCH('LEAK', {title})", ["recT1"]),
+    ("LEN({title})>4", ["recT2", "recT4"]),
+    ("IS_AFTER(CREATED_TIME(), '2026-01-06T12:00:00Z')", ["recT3", "recT4"]),
+    ("IF({status}='open', {priority}='high', TRUE())", ["recT1", "recT3", "recT4"]),
+    ("{status}&'-'&{priority}='open-low'", ["recT2"]),
+])
+def test_supported_subset(formula, expected):
+    assert matching("TICKETS", formula) == expected
+
+
+@pytest.mark.parametrize("formula", [
+    "REGEX_MATCH({title}, 'L.*')",
+    "DATETIME_DIFF(NOW(), {created_at}, 'days')>7",
+    "{status}='open",
+    "{status} ~ 'open'",
+])
+def test_unsupported_syntax_falls_back(formula):
+    assert main.compile_formula(formula, "TICKETS") is None
+
+
+@pytest.mark.parametrize("formula", [
+    "{typo}='open'",
+    "{typo}=''",
+    "OR({status}='open', {statuss}='open')",
+])
+def test_unknown_field_falls_back(formula):
+    # Airtable answers these with a 422, never with an empty or full result
+    assert main.compile_formula(formula, "TICKETS") is None
+
+
+@pytest.mark.parametrize("table, formula", [
+    ("TICKETS", "{PROFESSIONALS}='recP1'"),
+    ("TICKETS", "{PROFESSIONALS}=''"),
+    ("TENANTS", "FIND('rec', {TICKETS})"),
+])
+def test_link_fields_fall_back(table, formula):
+    assert main.compile_formula(formula, table) is None
+
+
+def test_attachment_fields_fall_back(monkeypatch):
+    tables = dict(main.schema.tables)
+    tables["TICKETS"] = {**tables["TICKETS"], "photos": {"id": "fldPhotos", "type": "attachments"}}
+    monkeypatch.setattr(main, "schema", main.BaseSchema(tables, "test"))
+    assert main.compile_formula("{photos}=''", "TICKETS") is None
+
+
+def test_linked_values_raise_without_schema():
+    # Without a table the check happens per record
+    predicate = main.compile_formula("{PROFESSIONALS}='recP1'")
+    with pytest.raises(main.UnsupportedFormula):
+        predicate(TICKETS[0])
+    attachment = {"id": "recX", "fields": {"photos": [{"id": "att1", "filename": "a.png"}]}}
+    with pytest.raises(main.UnsupportedFormula):
+        main.compile_formula("{photos}=''")(attachment)
+
+
+class _OfflineClient:
+    write_hooks = []
+
+
+@pytest.fixture
+def replica(tmp_path):
+    replica = main.LocalReplica(
+        _OfflineClient(),
+        path=str(tmp_path / "replica.sqlite3"),
+        tables=main.TABLES,
+        max_staleness=3600,
+        sync_interval=3600,
+        reconcile_interval=3600
+    )
+    replica._upsert(main.TABLES["TICKETS"], TICKETS)
+    replica.db.commit()
+    yield replica
+    replica.close()
+
+
+def test_replica_search_matches_and_defers(replica):
+    table_id = main.TABLES["TICKETS"]
+    records, next_offset = replica.search(table_id, "{status}='open'")
+    assert [record["id"] for record in records] == ["recT1", "recT2"]
+    assert next_offset is None
+    assert replica.search(table_id, "{typo}='open'") is None
+    assert replica.search(table_id, "{typo}=''") is None
+    assert replica.search(table_id, "{PROFESSIONALS}=''") is None
@@ -0,0 +1,18 @@
+"""Static checks over the server and benchmark sources."""
+
+import glob
+import os
+
+import pytest
+
+from conftest import ROOT
+
+pyflakes_api = pytest.importorskip("pyflakes.api")
+pyflakes_reporter = pytest.importorskip("pyflakes.reporter")
+
+
+def test_pyflakes_clean(capsys):
+    paths = [os.path.join(ROOT, "main.py")] + sorted(glob.glob(os.path.join(ROOT, "benchmarks", "*.py")))
+    reporter = pyflakes_reporter._makeDefaultReporter()
+    warnings = sum(pyflakes_api.checkPath(path, reporter) for path in paths)
+    assert warnings == 0, capsys.readouterr().out
@@ -0,0 +1,162 @@
+"""RateLimiter driven by a fake clock: no test here waits in real time."""
+
+import asyncio
+
+import pytest
+
+import main
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the limiter sleeps.
+
+    Tests use rates that are powers of two so every interval is exact in
+    binary floating point and the limiter never sleeps for a rounding error.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        # Let every runnable task go first, as a real sleep would
+        await asyncio.sleep(0)
+        self.now += seconds
+
+
+def make_limiter(clock, **kwargs):
+    return main.RateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+async def grant_times(limiter, clock, lanes):
+    """Acquire (and release) once per lane; returns (lane, grant time) in grant order."""
+    granted = []
+
+    async def request(lane):
+        async with limiter.slot(lane):
+            granted.append((lane, clock()))
+
+    await asyncio.gather(*(request(lane) for lane in lanes))
+    return granted
+
+
+def test_sustained_rate():
+    async def scenario():
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=4, burst=1)
+        return await grant_times(limiter, clock, ["normal"] * 11)
+
+    times = [at for _, at in asyncio.run(scenario())]
+    assert times == pytest.approx([i * 0.25 for i in range(11)])
+
+
+def test_burst_then_rate():
+    async def scenario():
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=4, burst=3)
+        return await grant_times(limiter, clock, ["normal"] * 6)
+
+    times = [at for _, at in asyncio.run(scenario())]
+    assert times == pytest.approx([0.0, 0.0, 0.0, 0.25, 0.5, 0.75])
+
+
+def test_burst_refills_while_idle():
+    async def scenario():
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=4, burst=3)
+        await grant_times(limiter, clock, ["normal"] * 3)
+        clock.now += 10
+        return await grant_times(limiter, clock, ["normal"] * 4)
+
+    times = [at for _, at in asyncio.run(scenario())]
+    # Never more than burst tokens, however long the pause
+    assert times == pytest.approx([10.0, 10.0, 10.0, 10.25])
+
+
+def test_in_flight_cap():
+    async def scenario():
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=100, burst=10, max_in_flight=2)
+        assert await limiter.acquire("normal") == 0.0
+        assert await limiter.acquire("normal") == 0.0
+
+        third = asyncio.ensure_future(limiter.acquire("normal"))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert not third.done()
+        assert limiter.queue_depth("normal") == 1
+
+        limiter.release()
+        await third
+        assert limiter._active == 2
+        limiter.release()
+        limiter.release()
+        assert limiter._active == 0
+
+    asyncio.run(scenario())
+
+
+def test_interactive_overtakes_queued_bulk():
+    async def scenario():
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=4, weights={"interactive": 6.0, "normal": 3.0, "bulk": 1.0})
+        await limiter.acquire("bulk")
+        limiter.release()
+        return await grant_times(limiter, clock, ["bulk"] * 3 + ["interactive"] * 3)
+
+    lanes = [lane for lane, _ in asyncio.run(scenario())]
+    assert lanes == ["interactive"] * 3 + ["bulk"] * 3
+
+
+def test_bulk_is_not_starved():
+    async def scenario():
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=4, weights={"interactive": 4.0, "normal": 2.0, "bulk": 1.0})
+        await limiter.acquire("interactive")
+        limiter.release()
+        return await grant_times(limiter, clock, ["bulk"] * 4 + ["interactive"] * 16)
+
+    lanes = [lane for lane, _ in asyncio.run(scenario())]
+    # Weighted 4:1, bulk gets one grant in every five while both lanes wait
+    for window in range(0, 20, 5):
+        assert lanes[window:window + 5].count("bulk") == 1
+
+
+def test_penalize_pauses_and_halves_rate():
+    async def scenario():
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate=4, burst=1)
+        await limiter.acquire("normal")
+        limiter.release()
+
+        limiter.penalize(10)
+        limiter.penalize(10)  # same window: the rate is halved once
+        assert limiter.rate == 2.0
+
+        waited = await limiter.acquire("normal")
+        limiter.release()
+        return waited
+
+    # Paused for the 10s window, then one token at the halved rate
+    assert asyncio.run(scenario()) == pytest.approx(10.5)
+
+
+def test_penalize_floor_and_recover():
+    clock = FakeClock()
+    limiter = make_limiter(clock, rate=8, burst=1)
+    for _ in range(6):
+        clock.now += 100  # each 429 in its own penalty window
+        limiter.penalize(1)
+    assert limiter.rate == limiter.min_rate == 1.0
+
+    recoveries = 0
+    while limiter.rate < limiter.max_rate:
+        limiter.recover()
+        recoveries += 1
+    # Back to the configured rate in steps of max_rate / 20, never above it
+    assert limiter.rate == 8.0
+    assert recoveries == 18
+    limiter.recover()
+    assert limiter.rate == 8.0
@@ -0,0 +1,68 @@
+"""Write validation is strict only against a schema from the metadata API."""
+
+import pytest
+
+import main
+
+METADATA = {
+    "tables": [{
+        "id": main.TABLES["TICKETS"],
+        "fields": [
+            {"id": "fldTitle", "name": "title", "type": "singleLineText"},
+            {"id": "fldStatus", "name": "status", "type": "singleSelect",
+             "options": {"choices": [{"name": "open"}, {"name": "closed"}]}},
+            {"id": "fldCount", "name": "visits", "type": "number"},
+            {"id": "fldCreated", "name": "created_at", "type": "createdTime"},
+        ],
+    }],
+}
+
+
+@pytest.fixture
+def metadata_schema(monkeypatch):
+    monkeypatch.setattr(main, "schema", main.BaseSchema.from_metadata(METADATA, "metadata API", authoritative=True))
+
+
+@pytest.fixture
+def static_schema(monkeypatch):
+    monkeypatch.setattr(main, "schema", main.BaseSchema(main.FIELD_SCHEMAS, "built-in"))
+
+
+def test_metadata_schema_refuses_bad_writes(metadata_schema):
+    with pytest.raises(ValueError, match="unknown field 'colour'"):
+        main.prepare_fields("TICKETS", {"title": "Leak", "colour": "red"})
+    with pytest.raises(ValueError, match="computed"):
+        main.prepare_fields("TICKETS", {"created_at": "2026-01-01T00:00:00Z"})
+    with pytest.raises(ValueError, match="not one of"):
+        main.prepare_fields("TICKETS", {"status": "pending"})
+
+
+def test_metadata_schema_coerces_and_translates_ids(metadata_schema):
+    assert main.prepare_fields("TICKETS", {"fldCount": "3", "fldStatus": "open"}) == {"visits": 3, "status": "open"}
+
+
+def test_static_schema_only_warns(static_schema, caplog):
+    fields = {"title": "Leak", "colour": "red", "status": "pending", "email (from PROFESSIONALS)": ["a@b.c"]}
+    with caplog.at_level("WARNING", logger="airtable-mcp"):
+        assert main.prepare_fields("TICKETS", fields, require=True) == fields
+    assert "unknown field 'colour'" in caplog.text
+    assert "missing required field(s)" in caplog.text
+
+
+def test_static_schema_still_coerces(static_schema):
+    assert main.prepare_fields("RESIDENCES", {"total_units": "12"}) == {"total_units": 12}
+
+
+def test_required_fields_only_refused_with_metadata(static_schema, monkeypatch):
+    _, errors, warnings = main.validate_fields("TICKETS", {"title": "Leak"})
+    assert errors == [] and any("missing required" in w for w in warnings)
+
+    monkeypatch.setattr(main.schema, "authoritative", True)
+    _, errors, _ = main.validate_fields("TICKETS", {"title": "Leak"})
+    assert any("missing required" in e for e in errors)
+
+
+def test_create_record_not_refused_on_static_schema(static_schema):
+    # The built-in schema has no 'floor' field; Airtable decides
+    model = main.validate_input(main.CreateRecordInput, {"table": "TENANTS", "fields": {"floor": 3}})
+    assert main.prepare_fields(model.table, model.fields, require=False) == {"floor": 3}
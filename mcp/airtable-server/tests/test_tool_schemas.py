@@ -0,0 +1,136 @@
+"""Advertised tool schemas must agree with the input models that validate calls.
+
+mcp's own per-call JSON Schema check is off (see create_server), so the
+input models are the only validation; these tests keep the schemas
+clients see from promising anything the models would reject.
+"""
+
+import asyncio
+
+import jsonschema
+import pytest
+from pydantic_core import to_jsonable_python
+
+import main
+
+VALID = {
+    "list_records": {"table": "TICKETS", "max_records": 5, "fields": ["title"], "expand": ["PROFESSIONALS"]},
+    "get_record": {"table": "TICKETS", "record_id": "rec123", "output": "json"},
+    "search_records": {"table": "TICKETS", "filter_formula": "{status}='open'", "page_size": 10},
+    "create_record": {"table": "TICKETS", "fields": {"title": "Leak"}},
+    "update_record": {"table": "TICKETS", "record_id": "rec123", "fields": {"status": "open"}, "wait": True},
+    "delete_record": {"table": "TICKETS", "record_id": "rec123"},
+    "batch_create_records": {"table": "TICKETS", "records": [{"title": "Leak"}], "typecast": True},
+    "batch_update_records": {
+        "table": "TENANTS", "records": [{"fields": {"email": "a@example.com"}}], "fields_to_merge_on": ["email"]
+    },
+    "batch_delete_records": {"table": "TICKETS", "record_ids": ["rec1", "rec2"]},
+    "lookup_by_field": {"table": "TENANTS", "field": "email", "value": "a@example.com"},
+    "aggregate_records": {
+        "table": "TICKETS", "group_by": ["status"], "metrics": [{"op": "count"}, {"op": "max", "field": "created_at"}]
+    },
+    "changes_since": {"table": "TICKETS", "since": "2026-01-01T00:00:00Z"},
+    "sync_status": {},
+    "export_table": {"table": "TICKETS", "format": "ndjson"},
+    "import_records": {"table": "TENANTS", "path": "tenants.csv", "merge_on": ["email"]},
+    "upload_attachment": {"record_id": "rec123", "paths": ["photo.jpg"]},
+    "flush": {"table": "TICKETS"},
+    "describe_table": {"refresh": True},
+    "server_stats": {"output": "prometheus"},
+}
+
+INVALID = [
+    ("list_records", {}),
+    ("list_records", {"table": "NOPE"}),
+    ("list_records", {"table": "TICKETS", "max_records": 0}),
+    ("list_records", {"table": "TICKETS", "page_size": 101}),
+    ("list_records", {"table": "TICKETS", "fields": []}),
+    ("list_records", {"table": "TICKETS", "expand": ["title"]}),
+    ("list_records", {"table": "TICKETS", "expand_depth": 4}),
+    ("get_record", {"table": "TICKETS"}),
+    ("get_record", {"table": "TICKETS", "record_id": ""}),
+    ("get_record", {"table": "TICKETS", "record_id": "rec1", "output": "xml"}),
+    ("search_records", {"table": "TICKETS", "filter_formula": ""}),
+    ("create_record", {"table": "TICKETS", "fields": ["title"]}),
+    ("batch_create_records", {"table": "TICKETS", "records": []}),
+    ("batch_update_records", {"table": "TICKETS", "records": [{"id": "rec1"}]}),
+    ("batch_update_records", {"table": "TICKETS", "records": [{"id": "rec1", "fields": {}}],
+                              "fields_to_merge_on": ["a", "b", "c", "d"]}),
+    ("batch_delete_records", {"table": "TICKETS", "record_ids": []}),
+    ("lookup_by_field", {"table": "TENANTS", "field": "email"}),
+    ("aggregate_records", {"table": "TICKETS", "metrics": [{"op": "median"}]}),
+    ("aggregate_records", {"table": "TICKETS", "group_by": ["a", "b", "c", "d", "e", "f"]}),
+    ("changes_since", {"table": "TICKETS", "since": ""}),
+    ("sync_status", {"table": "NOPE"}),
+    ("export_table", {"format": "csv"}),
+    ("import_records", {"table": "TENANTS", "path": "a.csv", "format": "xlsx"}),
+    ("upload_attachment", {"record_id": "rec1", "paths": []}),
+    ("flush", {"table": "NOPE"}),
+    ("server_stats", {"output": "json"}),
+]
+
+
+def schema_accepts(name, arguments):
+    try:
+        jsonschema.validate(arguments, main.TOOLS[name].input_schema)
+    except jsonschema.ValidationError:
+        return False
+    return True
+
+
+def model_accepts(name, arguments):
+    try:
+        main.validate_input(main.TOOLS[name].model, arguments)
+    except ValueError:
+        return False
+    return True
+
+
+def test_every_tool_has_examples():
+    assert set(VALID) == set(main.TOOLS)
+
+
+@pytest.mark.parametrize("name", list(main.TOOLS))
+def test_schema_is_valid_json_schema(name):
+    jsonschema.Draft202012Validator.check_schema(main.TOOLS[name].input_schema)
+
+
+@pytest.mark.parametrize("name", list(main.TOOLS))
+def test_schema_matches_model_fields(name):
+    spec = main.TOOLS[name]
+    model_fields = spec.model.model_fields
+    assert set(spec.input_schema["properties"]) == set(model_fields)
+    required = {field for field, info in model_fields.items() if info.is_required()}
+    assert set(spec.input_schema.get("required", [])) == required
+    for field, prop in spec.input_schema["properties"].items():
+        if "default" in prop:
+            assert prop["default"] == to_jsonable_python(model_fields[field].get_default())
+
+
+@pytest.mark.parametrize("name", list(main.TOOLS))
+def test_valid_examples_pass_both(name):
+    assert schema_accepts(name, VALID[name])
+    assert model_accepts(name, VALID[name])
+
+
+@pytest.mark.parametrize("name, arguments", INVALID)
+def test_schema_rejections_are_model_rejections(name, arguments):
+    assert not schema_accepts(name, arguments)
+    assert not model_accepts(name, arguments)
+
+
+def test_server_builds_with_generated_schemas():
+    assert main.create_server() is not None
+
+
+def test_tool_definitions_add_priority():
+    tools = {tool.name: tool for tool in main.tool_definitions()}
+    assert set(tools) == set(main.TOOLS)
+    schema = tools["get_record"].inputSchema
+    assert schema["properties"]["priority"]["enum"] == list(main.PRIORITY_LANES)
+    assert "priority" not in main.TOOLS["get_record"].input_schema["properties"]
+
+
+def test_unvalidated_dispatch_still_rejects_bad_arguments():
+    [content] = asyncio.run(main.call_tool("list_records", {"table": "TICKETS", "max_records": 0}))
+    assert content.text.startswith("❌ Validation error")
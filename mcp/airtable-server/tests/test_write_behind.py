@@ -0,0 +1,53 @@
+"""flush tool with write-behind enabled on the default base."""
+
+import asyncio
+
+import main
+
+
+def test_flush_reports_queue_state(tmp_path, monkeypatch):
+    base = main.bases[main.DEFAULT_BASE]
+    queue = main.WriteBehindQueue(base.client, path=str(tmp_path / "journal.jsonl"), window=0.1)
+    monkeypatch.setattr(base, "write_behind", queue)
+
+    result = asyncio.run(main.call_tool("flush", {}))
+
+    assert "Flushed 0 record update(s) in 0 request(s)" in result[0].text
+    assert "0 still pending" in result[0].text
+
+
+class _RejectingClient:
+    """Accepts every update except those to ``bad`` records."""
+
+    def __init__(self, bad):
+        self.bad = bad
+
+    async def batch_update_records(self, table_id, records):
+        return [
+            {"ok": False, "error": "Airtable API error: INVALID_VALUE_FOR_COLUMN"}
+            if record["id"] in self.bad else {"ok": True}
+            for record in records
+        ]
+
+
+def test_flush_reports_only_its_own_rejections(tmp_path):
+    async def scenario():
+        table_id = main.TABLES["TICKETS"]
+        queue = main.WriteBehindQueue(
+            _RejectingClient({"recBad1", "recBad2"}), path=str(tmp_path / "journal.jsonl"), window=60
+        )
+        await queue.enqueue(table_id, "recBad1", {"status": "nope"})
+        await queue.flush()
+
+        await queue.enqueue(table_id, "recOk", {"status": "open"})
+        await queue.enqueue(table_id, "recBad2", {"status": "nope"})
+        summary = await queue.flush()
+        await queue.close()
+        return main.format_flush_results(queue, summary)
+
+    report = asyncio.run(scenario())
+    current, earlier = report.split("rejected by earlier flushes")
+    assert "Flushed 1 record update(s)" in current
+    assert "1 update(s) rejected by Airtable" in current
+    assert "recBad2" in current and "recBad1" not in current
+    assert "recBad1" in earlier and "recBad2" not in earlier